@@ -0,0 +1,195 @@
+"""Compiled app-name classifier.
+
+Attribution asks the same questions about app names over and over: what is the canonical
+name, is it a browser/IDE/chat app, is it our own process, should it be ignored. The
+classifier compiles every keyword into one regex and memoizes results per raw name, so
+each distinct name is scanned once.
+
+Users can extend it from settings:
+
+- ``app_aliases``: ``{"substring": "Canonical Name"}``, consulted before the built-in map
+- ``app_categories``: ``{"browser": ["arc"], "ignored": ["screensaver"], ...}``
+"""
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from clipboard_manager import settings
+from clipboard_manager.utils import LRUCache
+
+# substring -> canonical name; the first matching entry wins
+DEFAULT_ALIASES: List[Tuple[str, str]] = [
+    ("visual studio code", "Visual Studio Code"),
+    ("code -", "Visual Studio Code"),
+    ("code", "Visual Studio Code"),
+    ("pycharm", "PyCharm"),
+    ("brave", "Brave Browser"),
+    ("chrome", "Chrome"),
+    ("safari", "Safari"),
+    ("firefox", "Firefox"),
+    ("discord", "Discord"),
+    ("notion", "Notion"),
+    ("outlook", "Microsoft Outlook"),
+    ("whatsapp", "WhatsApp"),
+    ("slack", "Slack"),
+    ("teams", "Microsoft Teams"),
+]
+
+# checked in this order when picking an app's single category
+CATEGORY_ORDER = ('self', 'browser', 'ide', 'comm')
+
+DEFAULT_CATEGORIES: Dict[str, List[str]] = {
+    'browser': ['brave', 'chrome', 'safari', 'firefox', 'edge', 'opera'],
+    'comm': ['discord', 'slack', 'teams', 'whatsapp', 'notion', 'outlook'],
+    'ide': ['pycharm', 'intellij', 'idea', 'webstorm', 'goland', 'clion', 'rider', 'vscode',
+            'visual studio code', 'sublime', 'atom'],
+    'self': ['clipboard', 'copy-paste-tool', 'python', 'python3', 'terminal', 'iterm'],
+    'ignored': ['window server', 'grace', 'displaylink', 'display link', 'control center', 'grizzly',
+                'grap', 'grm', 'gr', 'dock', 'fontd', 'kernel_task'],
+}
+
+CLASSIFY_CACHE_SIZE = 4096
+
+
+class KeywordMatcher:
+    """Report which keywords occur as substrings of a text, in a single regex pass.
+
+    The pattern is a zero-width lookahead over all keywords (longest first), so it yields
+    the longest keyword starting at each position. Keywords contained in that match are
+    added from a precomputed substring closure, which makes the result identical to
+    testing ``k in text`` for every keyword.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        kws = sorted({k.lower() for k in keywords if k}, key=lambda k: (-len(k), k))
+        self.keywords = kws
+        self._closure = {k: frozenset(o for o in kws if o in k) for k in kws}
+        self._rx = re.compile('(?=(%s))' % '|'.join(re.escape(k) for k in kws)) if kws else None
+
+    def find(self, text: str) -> set:
+        if self._rx is None or not text:
+            return set()
+        hits = set()
+        for m in self._rx.finditer(text):
+            hits |= self._closure[m.group(1)]
+        return hits
+
+
+class AppClass:
+    """Result of classifying one app name."""
+
+    __slots__ = ('canonical', 'lower', 'category', 'tags', 'ignored')
+
+    def __init__(self, canonical: str, category: str, tags: frozenset, ignored: bool):
+        self.canonical = canonical
+        self.lower = canonical.lower()
+        self.category = category
+        self.tags = tags
+        self.ignored = ignored
+
+    @property
+    def is_browser(self) -> bool:
+        return 'browser' in self.tags
+
+    @property
+    def is_ide(self) -> bool:
+        return 'ide' in self.tags
+
+    @property
+    def is_comm(self) -> bool:
+        return 'comm' in self.tags
+
+    @property
+    def is_self(self) -> bool:
+        return 'self' in self.tags
+
+    def __repr__(self):
+        return 'AppClass(%r, %r, ignored=%r)' % (self.canonical, self.category, self.ignored)
+
+
+class AppClassifier:
+    def __init__(self, aliases: Optional[Iterable[Tuple[str, str]]] = None,
+                 categories: Optional[Dict[str, Iterable[str]]] = None, cache_size: int = CLASSIFY_CACHE_SIZE):
+        self.aliases = [(k.lower(), v) for k, v in (DEFAULT_ALIASES if aliases is None else aliases) if k]
+        cats = DEFAULT_CATEGORIES if categories is None else categories
+        self._alias_rank = {}
+        for i, (k, v) in enumerate(self.aliases):
+            self._alias_rank.setdefault(k, (i, v))
+        self._kw_tags = {}
+        for cat, kws in cats.items():
+            for k in kws:
+                if k:
+                    self._kw_tags.setdefault(k.lower(), set()).add(cat)
+        self._matcher = KeywordMatcher(list(self._alias_rank) + list(self._kw_tags))
+        self._cache = LRUCache(cache_size)
+
+    def classify(self, name: str) -> AppClass:
+        res = self._cache.get(name)
+        if res is not None:
+            return res
+        n = (name or '').strip()
+        hits = self._matcher.find(n.lower())
+        ranked = [self._alias_rank[h] for h in hits if h in self._alias_rank]
+        canonical = min(ranked)[1] if ranked else n
+        if canonical != n:
+            # tags also apply to the canonical name (e.g. "code - x.py" -> an IDE)
+            hits |= self._matcher.find(canonical.lower())
+        tags = set()
+        for h in hits:
+            tags |= self._kw_tags.get(h, frozenset())
+        category = next((c for c in CATEGORY_ORDER if c in tags), 'other')
+        res = AppClass(canonical, category, frozenset(tags), 'ignored' in tags)
+        self._cache.put(name, res)
+        return res
+
+    def canonical(self, name: str) -> str:
+        if not name:
+            return name
+        return self.classify(name).canonical
+
+
+def build_from_settings() -> AppClassifier:
+    """Built-in keywords extended by the `app_aliases` / `app_categories` settings."""
+    aliases = []
+    user_aliases = settings.get('app_aliases', {}) or {}
+    if isinstance(user_aliases, dict):
+        aliases.extend((str(k), str(v)) for k, v in user_aliases.items())
+    aliases.extend(DEFAULT_ALIASES)
+    cats = {k: list(v) for k, v in DEFAULT_CATEGORIES.items()}
+    user_cats = settings.get('app_categories', {}) or {}
+    if isinstance(user_cats, dict):
+        for cat, kws in user_cats.items():
+            if isinstance(kws, str):
+                kws = [kws]
+            cats.setdefault(str(cat), []).extend(str(k) for k in kws)
+    return AppClassifier(aliases, cats)
+
+
+_classifier = None
+_classifier_src = None
+_lock = threading.Lock()
+
+
+def _on_setting_changed(key, value):
+    global _classifier
+    if key in ('app_aliases', 'app_categories'):
+        _classifier = None
+
+
+def get_classifier() -> AppClassifier:
+    """Shared classifier, rebuilt when the alias/category settings change."""
+    global _classifier, _classifier_src
+    src = (id(settings.get('app_aliases')), id(settings.get('app_categories')))
+    c = _classifier
+    if c is not None and src == _classifier_src:
+        return c
+    with _lock:
+        if _classifier is None or src != _classifier_src:
+            settings.register_callback(_on_setting_changed)
+            _classifier = build_from_settings()
+            _classifier_src = src
+        return _classifier
+
+
+def classify(name: str) -> AppClass:
+    return get_classifier().classify(name)
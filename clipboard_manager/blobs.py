@@ -0,0 +1,124 @@
+"""Content-addressed storage for binary clipboard payloads (images, rich text, ...).
+
+Payloads are keyed by their SHA-256 hex digest, so identical copies share one blob. With a
+root directory blobs live in ``<root>/<2 hex>/<digest>`` and are written by a background
+thread; until a write lands, reads are served from the pending buffer. Without a root
+the store is purely in memory.
+"""
+import hashlib
+import os
+import queue
+import threading
+from typing import Optional
+
+
+def blob_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore:
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.abspath(root) if root else None
+        self._mem = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._queue = None
+        self._writer = None
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def path(self, digest: str) -> Optional[str]:
+        """On-disk location of a blob (None for in-memory stores or blobs not yet written)."""
+        if not self.root:
+            return None
+        p = self._path(digest)
+        return p if os.path.exists(p) else None
+
+    def put(self, data: bytes) -> str:
+        data = bytes(data)
+        digest = blob_digest(data)
+        with self._lock:
+            if not self.root:
+                self._mem[digest] = data
+                return digest
+            if digest in self._pending or os.path.exists(self._path(digest)):
+                return digest
+            self._pending[digest] = data
+            if self._writer is None or not self._writer.is_alive():
+                self._queue = queue.Queue()
+                self._writer = threading.Thread(target=self._write_loop, args=(self._queue,), name='blob-writer', daemon=True)
+                self._writer.start()
+            self._queue.put(digest)
+        return digest
+
+    def _write_loop(self, q):
+        while True:
+            digest = q.get()
+            try:
+                if digest is None:
+                    return
+                with self._lock:
+                    data = self._pending.get(digest)
+                if data is not None:
+                    p = self._path(digest)
+                    os.makedirs(os.path.dirname(p), exist_ok=True)
+                    tmp = p + '.tmp'
+                    with open(tmp, 'wb') as f:
+                        f.write(data)
+                    os.replace(tmp, p)
+                with self._lock:
+                    deleted = self._pending.pop(digest, None) is None
+                if data is not None and deleted:
+                    # delete() ran while the write was in flight
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+            except Exception:
+                # keep the payload in memory; a failed write must not lose the copy
+                pass
+            finally:
+                q.task_done()
+
+    def get(self, digest: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._mem.get(digest)
+            if data is None:
+                data = self._pending.get(digest)
+        if data is not None or not self.root:
+            return data
+        try:
+            with open(self._path(digest), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            if digest in self._mem or digest in self._pending:
+                return True
+        return bool(self.root) and os.path.exists(self._path(digest))
+
+    def delete(self, digest: str) -> None:
+        with self._lock:
+            self._mem.pop(digest, None)
+            self._pending.pop(digest, None)
+        if self.root:
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+
+    def flush(self) -> None:
+        """Block until queued writes have reached disk."""
+        q = self._queue
+        if q is not None:
+            q.join()
+
+    def close(self) -> None:
+        q, w = self._queue, self._writer
+        if q is not None and w is not None and w.is_alive():
+            q.put(None)
+            w.join(timeout=2.0)
+        self._writer = None
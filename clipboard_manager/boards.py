@@ -1,7 +1,19 @@
 import re
-from typing import Optional, List, Dict, Any, Pattern
+from collections import deque
+from itertools import islice
+from typing import Optional, List, Dict, Any, Pattern, Iterable, Iterator, Tuple, Callable
 from enum import Enum
 
+from clipboard_manager import content_analysis
+
+# routing looks at most this many characters of an item's content
+MAX_ROUTE_SCAN = 64 * 1024
+# app name -> app-predicate results, kept per compiled plan
+APP_CACHE_SIZE = 512
+# route_many: rows per chunk, and chunks in flight per worker process
+ROUTE_CHUNK_SIZE = 2048
+CHUNKS_PER_WORKER = 2
+
 class Board(Enum):
     LINKS = "links"
     CODE = "code"
@@ -22,7 +34,10 @@ class _Predicate:
             except Exception:
                 self._compiled = None
 
-    def matches(self, app: Optional[str], content: Optional[str]) -> bool:
+    def matches(self, app: Optional[str], content: Optional[str], analysis=None) -> bool:
+        if self.type in ('content_kind', 'content_language'):
+            analysis = analysis or content_analysis.analyze(content or '')
+            return (analysis.kind if self.type == 'content_kind' else analysis.language) == self.value
         app = (app or '').strip()
         content = (content or '').strip()
         typ = self.type
@@ -56,10 +71,190 @@ class _Rule:
         else:
             self.board = Board.OTHER
 
-    def matches(self, app: Optional[str], content: Optional[str]) -> bool:
+    def matches(self, app: Optional[str], content: Optional[str], analysis=None) -> bool:
         if not self.predicates:
             return False
-        return all(p.matches(app, content) for p in self.predicates)
+        return all(p.matches(app, content, analysis) for p in self.predicates)
+
+def _literal_prefix(pattern: str) -> Optional[str]:
+    """Lower-cased literal every match of `pattern` starts with, if simple to tell."""
+    if '|' in pattern:
+        return None
+    m = re.match(r'[A-Za-z0-9_ ]+', pattern)
+    if not m:
+        return None
+    lit = m.group()
+    if pattern[m.end():m.end() + 1] in ('?', '*', '{'):
+        lit = lit[:-1]
+    return lit.lower() if len(lit) >= 2 else None
+
+
+class _Plan:
+    """Rule specs compiled into a decision plan.
+
+    - Each item is normalized once: the app is stripped, and the content is stripped, cut
+      to `max_scan` characters and lower-cased on first use. Before, every predicate did
+      this again.
+    - App predicates are deduplicated across rules and evaluated together once per app
+      name. The steps that remain for that app are cached, so rules for other apps cost
+      nothing per item.
+    - Content predicates are deduplicated too, and each is evaluated at most once per item.
+      Literals are ``in`` checks on the lower-cased content. For a case-insensitive regex
+      with a literal prefix (``https?://`` -> ``http``) in ASCII content, the search
+      starts at the prefix's first occurrence and is skipped when there is none. Python's
+      regex engine drops its literal fast path for IGNORECASE patterns.
+    - Rules are tried in order and the first match wins, as before.
+    """
+
+    def __init__(self, rules: List[_Rule], max_scan: int = MAX_ROUTE_SCAN):
+        self.max_scan = max_scan
+        self._app_preds = []      # (kind, arg) evaluated on the app name
+        self._content_preds = []  # (kind, arg) evaluated on the content
+        app_index, content_index = {}, {}
+        self.steps = []  # (board, app predicate indexes, content predicate indexes)
+        for rule in rules:
+            step = self._compile_rule(rule, app_index, content_index)
+            if step is not None:
+                self.steps.append(step)
+        # a case-insensitive regex can be skipped when its literal prefix is absent
+        self._content_prefixes = [
+            _literal_prefix(arg.pattern) if kind == 'search' and arg.flags & re.IGNORECASE else None
+            for kind, arg in self._content_preds]
+        self._app_cache: Dict[str, tuple] = {}
+
+    def _compile_rule(self, rule, app_index, content_index):
+        """(board, app ids, content ids), or None for a rule that can never match."""
+        if not rule.predicates:
+            return None
+        app_ids, content_ids = [], []
+        for p in rule.predicates:
+            typ = p.type
+            if typ == 'always':
+                continue
+            if typ in ('app_contains', 'content_contains', 'startswith') and not isinstance(p.value, str):
+                return None
+            if typ in ('app_regex', 'content_regex') and p._compiled is None:
+                return None
+            if typ == 'app_contains':
+                app_ids.append(self._intern(self._app_preds, app_index, 'contains', p.value.lower()))
+            elif typ == 'app_regex':
+                app_ids.append(self._intern(self._app_preds, app_index, 'search', p._compiled))
+            elif typ == 'content_contains':
+                content_ids.append(self._intern(self._content_preds, content_index, 'contains', p.value.lower()))
+            elif typ == 'content_regex':
+                content_ids.append(self._intern(self._content_preds, content_index, 'search', p._compiled))
+            elif typ == 'startswith' and p.field == 'app':
+                app_ids.append(self._intern(self._app_preds, app_index, 'startswith', p.value))
+            elif typ == 'startswith':
+                content_ids.append(self._intern(self._content_preds, content_index, 'startswith', p.value))
+            elif typ == 'content_kind':
+                content_ids.append(self._intern(self._content_preds, content_index, 'kind', p.value))
+            elif typ == 'content_language':
+                content_ids.append(self._intern(self._content_preds, content_index, 'language', p.value))
+            else:
+                return None
+        return rule.board, tuple(app_ids), tuple(content_ids)
+
+    @staticmethod
+    def _intern(preds, index, kind, arg) -> int:
+        # identical predicates in different rules are evaluated once
+        ident = (kind, arg.pattern if kind == 'search' else arg)
+        if ident not in index:
+            index[ident] = len(preds)
+            preds.append((kind, arg))
+        return index[ident]
+
+    def _app_steps(self, app: str) -> tuple:
+        """The steps whose app predicates hold for `app`, as (board, content ids); cached."""
+        hit = self._app_cache.get(app)
+        if hit is not None:
+            return hit
+        lowered = app.lower()
+        ok = []
+        for kind, arg in self._app_preds:
+            if kind == 'contains':
+                ok.append(arg in lowered)
+            elif kind == 'search':
+                ok.append(arg.search(app) is not None)
+            else:
+                ok.append(app.startswith(arg))
+        steps = []
+        for board, app_ids, content_ids in self.steps:
+            if all(ok[i] for i in app_ids):
+                steps.append((board, content_ids))
+                if not content_ids:
+                    break  # always matches; later steps are unreachable
+        steps = tuple(steps)
+        if len(self._app_cache) >= APP_CACHE_SIZE:
+            self._app_cache = {}
+        self._app_cache[app] = steps
+        return steps
+
+    def route(self, app_name: Optional[str], content: Optional[str], analysis=None) -> Optional[Board]:
+        item = None
+        for board, content_ids in self._app_steps((app_name or '').strip()):
+            if not content_ids:
+                return board
+            if item is None:
+                item = _Item(content, self.max_scan, analysis)
+            for i in content_ids:
+                if not item.check(self, i):
+                    break
+            else:
+                return board
+        return None
+
+
+class _Item:
+    """One item's normalized content plus the content predicate results computed so far."""
+
+    __slots__ = ('content', 'text', '_lowered', '_results', '_analysis')
+
+    def __init__(self, content: Optional[str], max_scan: int, analysis=None):
+        self.content = content = content or ''
+        if len(content) > max_scan:
+            content = content[:max_scan]
+        self.text = content.strip()
+        self._lowered = None
+        self._results = {}
+        self._analysis = analysis
+
+    @property
+    def analysis(self):
+        if self._analysis is None:
+            self._analysis = content_analysis.analyze(self.content)
+        return self._analysis
+
+    @property
+    def lowered(self) -> str:
+        if self._lowered is None:
+            self._lowered = self.text.lower()
+        return self._lowered
+
+    def check(self, plan: _Plan, i: int) -> bool:
+        hit = self._results.get(i)
+        if hit is None:
+            kind, arg = plan._content_preds[i]
+            if kind == 'contains':
+                hit = arg in self.lowered
+            elif kind == 'search':
+                prefix = plan._content_prefixes[i]
+                if prefix and self.text.isascii():
+                    # every match starts with the prefix: skip straight to its first occurrence
+                    pos = self.lowered.find(prefix)
+                    hit = pos >= 0 and arg.search(self.text, pos) is not None
+                else:
+                    hit = arg.search(self.text) is not None
+            elif kind == 'kind':
+                hit = self.analysis.kind == arg
+            elif kind == 'language':
+                hit = self.analysis.language == arg
+            else:
+                hit = self.text.startswith(arg)
+            self._results[i] = hit
+        return hit
+
+
 
 class BoardRouter:
     _default_rules_spec = [
@@ -97,24 +292,64 @@ class BoardRouter:
         {'predicates':[{'type':'always','value':True}], 'board':'NOTES'}
     ]
 
-    def __init__(self, rules_spec: Optional[List[Dict[str, Any]]] = None):
+    def __init__(self, rules_spec: Optional[List[Dict[str, Any]]] = None, max_scan: int = MAX_ROUTE_SCAN):
         specs = rules_spec if rules_spec is not None else self._default_rules_spec
+        self.max_scan = max_scan
         self.set_rules(specs)
 
     def set_rules(self, rules_spec: List[Dict[str, Any]]):
         self._rules = [_Rule(s) for s in rules_spec]
+        self._plan = _Plan(self._rules, self.max_scan)
 
-    def route(self, app_name: Optional[str], content: Optional[str]) -> Board:
-        for r in self._rules:
-            try:
-                if r.matches(app_name, content):
-                    return r.board
-            except Exception:
-                continue
-        return Board.OTHER
+    def route(self, app_name: Optional[str], content: Optional[str], analysis=None) -> Board:
+        """Board for a copy; `analysis` (the item's ContentAnalysis) serves content_kind/content_language predicates."""
+        try:
+            board = self._plan.route(app_name, content, analysis)
+        except Exception:
+            board = None
+        return board if board is not None else Board.OTHER
 
     def assign_board_to_item(self, item) -> None:
-        item.board = self.route(getattr(item, 'source_app', None), getattr(item, 'content', None))
+        item.board = self.route(getattr(item, 'source_app', None), getattr(item, 'content', None),
+                                getattr(item, 'analysis', None))
+
+    def assign_boards_to_items(self, items: Iterable, workers: int = 0) -> None:
+        key = lambda it: (getattr(it, 'source_app', None), getattr(it, 'content', None))
+        for item, board in self.route_many(items, key=key, workers=workers):
+            item.board = board
+
+    def route_many(self, rows: Iterable, key: Optional[Callable[[Any], Tuple[Optional[str], Optional[str]]]] = None,
+                   workers: int = 0, chunk_size: int = ROUTE_CHUNK_SIZE) -> Iterator[Tuple[Any, Board]]:
+        """Route many rows lazily, yielding ``(row, board)`` in input order.
+
+        `key` maps a row to its ``(app, content)`` pair (default: the row is that pair).
+        Rows are consumed `chunk_size` at a time. With ``workers > 1`` chunks are routed in
+        a process pool with at most ``workers * CHUNKS_PER_WORKER`` chunks in flight, so
+        memory stays bounded however long `rows` is.
+        """
+        key = key or (lambda row: row)
+        it = iter(rows)
+        if workers <= 1:
+            for row in it:
+                app, content = key(row)
+                yield row, self.route(app, content)
+            return
+        from concurrent.futures import ProcessPoolExecutor
+        boards = {b.name: b for b in Board}
+        with ProcessPoolExecutor(workers, initializer=_init_route_worker,
+                                 initargs=(self.rules_as_spec(), self.max_scan)) as pool:
+            pending = deque()
+            while True:
+                while len(pending) < workers * CHUNKS_PER_WORKER:
+                    chunk = list(islice(it, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append((chunk, pool.submit(_route_chunk, [key(row) for row in chunk])))
+                if not pending:
+                    return
+                chunk, future = pending.popleft()
+                for row, name in zip(chunk, future.result()):
+                    yield row, boards[name]
 
     def rules_as_spec(self) -> List[Dict[str, Any]]:
         out = []
@@ -129,3 +364,15 @@ class BoardRouter:
                 spec['predicates'].append(ps)
             out.append(spec)
         return out
+
+
+_worker_router: Optional[BoardRouter] = None
+
+
+def _init_route_worker(rules_spec, max_scan):
+    global _worker_router
+    _worker_router = BoardRouter(rules_spec, max_scan=max_scan)
+
+
+def _route_chunk(pairs) -> List[str]:
+    return [_worker_router.route(app, content).name for app, content in pairs]
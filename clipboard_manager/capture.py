@@ -0,0 +1,190 @@
+"""MIME-aware clipboard capture.
+
+Capture is split in two so the GUI thread does as little as possible with large payloads:
+
+- `snapshot_mime()` runs on the GUI thread, right when the clipboard changes, because the
+  clipboard can only be read there. Each `mime.data(fmt)` fetches that payload from the
+  system clipboard, and the platform may convert it on the way (e.g. TIFF to PNG on
+  macOS). So it reads only the formats we keep: at most one HTML, one RTF and one image
+  format. It never calls `imageData()`, which would also decode the image.
+- `build_capture()` runs on a worker. It turns the payloads into bytes, writes them to a
+  `BlobStore` and decides the item's kind and searchable text.
+
+Blobs are recorded per item as ``{mime format: digest}`` so the exact formats can be put
+back on the clipboard later.
+"""
+import re
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+from clipboard_manager.blobs import BlobStore
+
+HTML_FORMAT = 'text/html'
+RTF_FORMATS = ('text/rtf', 'application/rtf', 'public.rtf', 'text/richtext')
+# encoded image formats we can store as-is, most preferred first
+IMAGE_FORMATS = ('image/png', 'image/jpeg', 'image/gif', 'image/webp', 'image/bmp', 'image/tiff')
+URI_LIST_FORMAT = 'text/uri-list'
+
+KIND_TEXT = 'text'
+KIND_RICH = 'rich'
+KIND_IMAGE = 'image'
+KIND_FILES = 'files'
+
+
+class MimeSnapshot:
+    """Formats pulled out of a QMimeData; payloads are unconverted QByteArray references."""
+
+    __slots__ = ('text', 'html', 'rtf_format', 'rtf', 'image_format', 'image', 'files')
+
+    def __init__(self, text: str = '', html=None, rtf_format: Optional[str] = None, rtf=None,
+                 image_format: Optional[str] = None, image=None, files: Optional[List[str]] = None):
+        self.text = text or ''
+        self.html = html
+        self.rtf_format = rtf_format
+        self.rtf = rtf
+        self.image_format = image_format
+        self.image = image
+        self.files = files or []
+
+    def is_rich(self) -> bool:
+        return bool(self.html is not None or self.rtf is not None or self.image is not None or self.files)
+
+    def same_payload(self, other: 'MimeSnapshot') -> bool:
+        """True when both snapshots carry the same formats and data (compared without copying)."""
+        for name in self.__slots__:
+            a, b = getattr(self, name), getattr(other, name)
+            if a is b:
+                continue
+            if a is None or b is None or a != b:
+                return False
+        return True
+
+
+def _first_format(formats, wanted):
+    for fmt in wanted:
+        if fmt in formats:
+            return fmt
+    return None
+
+
+def snapshot_mime(mime) -> Optional[MimeSnapshot]:
+    """Collect the formats we keep from `mime`: one fetch per kept format, no image decoding."""
+    if mime is None:
+        return None
+    formats = set(mime.formats())
+    snap = MimeSnapshot(mime.text() if mime.hasText() else '')
+    if HTML_FORMAT in formats:
+        snap.html = mime.data(HTML_FORMAT)
+    fmt = _first_format(formats, RTF_FORMATS)
+    if fmt:
+        snap.rtf_format, snap.rtf = fmt, mime.data(fmt)
+    fmt = _first_format(formats, IMAGE_FORMATS)
+    if fmt is None:
+        fmt = next((f for f in sorted(formats) if f.startswith('image/')), None)
+    if fmt:
+        snap.image_format, snap.image = fmt, mime.data(fmt)
+    if mime.hasUrls():
+        snap.files = [u.toLocalFile() for u in mime.urls() if u.isLocalFile()]
+    return snap
+
+
+class CaptureResult:
+    __slots__ = ('kind', 'content', 'blobs', 'size')
+
+    def __init__(self, kind: str, content: str, blobs: Dict[str, str], size: int = 0):
+        self.kind = kind
+        self.content = content
+        self.blobs = blobs
+        self.size = size
+
+    def __repr__(self):
+        return 'CaptureResult(%r, %r, blobs=%r)' % (self.kind, self.content[:40], sorted(self.blobs))
+
+
+def _human_size(n: int) -> str:
+    if n < 1024:
+        return '%d B' % n
+    if n < 1024 * 1024:
+        return '%d KB' % round(n / 1024.0)
+    return '%.1f MB' % (n / (1024.0 * 1024.0))
+
+
+_IMAGE_LABEL_RE = re.compile(r'^Image \([^,()]+, [\d.]+ (?:B|KB|MB)\)$')
+
+
+def image_label(fmt: str, size: int) -> str:
+    """Placeholder text for image-only items, e.g. 'Image (PNG, 12 KB)'."""
+    name = (fmt or 'image').split('/')[-1].upper()
+    return 'Image (%s, %s)' % (name, _human_size(size))
+
+
+def is_image_label(text: str) -> bool:
+    return bool(text) and _IMAGE_LABEL_RE.match(text) is not None
+
+
+def _to_bytes(payload) -> bytes:
+    if isinstance(payload, bytes):
+        return payload
+    if isinstance(payload, str):
+        return payload.encode('utf-8')
+    return bytes(payload)
+
+
+def _decode_html(data: bytes) -> bytes:
+    # some platforms hand over UTF-16 HTML; store it as UTF-8
+    if data[:2] in (b'\xff\xfe', b'\xfe\xff'):
+        try:
+            return data.decode('utf-16').encode('utf-8')
+        except Exception:
+            pass
+    return data
+
+
+def build_capture(snap: MimeSnapshot, store: BlobStore) -> Optional[CaptureResult]:
+    """Write the snapshot's payloads to `store` and classify the copy (worker thread).
+
+    Kind precedence is files, image, rich text, text. Returns None when nothing usable
+    was copied.
+    """
+    blobs = {}
+    size = 0
+    if snap.html is not None:
+        data = _decode_html(_to_bytes(snap.html))
+        if data:
+            blobs[HTML_FORMAT] = store.put(data)
+            size += len(data)
+    if snap.rtf is not None:
+        data = _to_bytes(snap.rtf)
+        if data:
+            blobs[snap.rtf_format] = store.put(data)
+            size += len(data)
+    image_size = 0
+    if snap.image is not None:
+        data = _to_bytes(snap.image)
+        if data:
+            blobs[snap.image_format] = store.put(data)
+            image_size = len(data)
+            size += image_size
+
+    text = snap.text
+    if snap.files:
+        uri_list = '\r\n'.join('file://' + quote(p) for p in snap.files).encode('utf-8')
+        blobs[URI_LIST_FORMAT] = store.put(uri_list)
+        return CaptureResult(KIND_FILES, '\n'.join(snap.files), blobs, size + len(uri_list))
+    if snap.image_format in blobs:
+        return CaptureResult(KIND_IMAGE, text or image_label(snap.image_format, image_size), blobs, size)
+    if blobs:
+        if not text:
+            return None
+        return CaptureResult(KIND_RICH, text, blobs, size)
+    if text:
+        return CaptureResult(KIND_TEXT, text, {}, len(text))
+    return None
+
+
+def image_digest(blobs: Dict[str, str]) -> Optional[str]:
+    """Digest of the image blob among an item's blobs, if any."""
+    for fmt, digest in (blobs or {}).items():
+        if fmt.startswith('image/'):
+            return digest
+    return None
@@ -0,0 +1,45 @@
+"""Compiled capture pre-filter: per-app capture toggles plus the secret-safe blocklist.
+
+`CaptureFilter` is an immutable snapshot. The blocklist substrings are compiled into one
+regex, so checking an app name is a single pass over the name instead of a loop over
+every entry. `HistoryStore` builds a new filter (with a new version number) whenever the
+blocklist, the toggles or secret-safe mode change and swaps it in with one assignment;
+readers never take a lock.
+"""
+import re
+from typing import Dict, Iterable, Optional
+
+ALLOWED = None
+DISABLED = 'disabled'
+BLOCKED = 'blocked'
+
+
+class CaptureFilter:
+    __slots__ = ('version', 'blocklist', 'toggles', 'secret_safe', '_rx')
+
+    def __init__(self, blocklist: Iterable[str] = (), toggles: Optional[Dict[str, bool]] = None,
+                 secret_safe: bool = True, version: int = 0):
+        self.version = version
+        self.blocklist = frozenset(e.strip().lower() for e in blocklist if e and e.strip())
+        self.toggles = dict(toggles or {})
+        self.secret_safe = bool(secret_safe)
+        entries = sorted(self.blocklist, key=lambda e: (-len(e), e))
+        self._rx = re.compile('|'.join(re.escape(e) for e in entries)) if entries else None
+
+    def is_enabled(self, app_name: str) -> bool:
+        if not app_name:
+            return True
+        return self.toggles.get(app_name, True)
+
+    def is_blocked(self, app_name: str) -> bool:
+        if not app_name or not self.secret_safe or self._rx is None:
+            return False
+        return self._rx.search(app_name.lower()) is not None
+
+    def decide(self, app_name: str) -> Optional[str]:
+        """ALLOWED (None), DISABLED (per-app toggle off) or BLOCKED (secret-safe blocklist)."""
+        if not self.is_enabled(app_name):
+            return DISABLED
+        if self.is_blocked(app_name):
+            return BLOCKED
+        return ALLOWED
@@ -0,0 +1,210 @@
+"""Bounded queue between the clipboard watcher and the history store.
+
+The watcher only enqueues; a worker thread runs the ingest pipeline (building rich
+captures, hashing, dedupe, SQLite writes) so bursts of clipboard writes never pile up on
+the GUI thread.
+
+- Consecutive identical captures still waiting in the queue are coalesced into one.
+- When the queue is full the overflow policy decides what gives:
+
+  - ``drop_oldest``: discard the oldest waiting capture (default)
+  - ``drop_newest``: discard the incoming capture
+  - ``merge``: the incoming capture replaces the newest waiting one, so a tool that
+    rewrites the clipboard in a loop costs one slot
+
+Size and policy come from the ``capture_queue_size`` / ``capture_overflow_policy``
+settings. `stats()` reports depth and the drop/coalesce counters; queue wait, ingest time
+and end-to-end capture latency go to `metrics`.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from clipboard_manager import metrics
+from clipboard_manager.log import get_logger
+from clipboard_manager import settings
+
+DEFAULT_MAXSIZE = 64
+POLICIES = ('drop_oldest', 'drop_newest', 'merge')
+
+_log = get_logger('capture')
+
+
+class CaptureRequest:
+    """One clipboard change: plain text, or a MimeSnapshot to be built by the worker."""
+
+    __slots__ = ('content', 'source_app', 'timestamp', 'snapshot', 'queued_at')
+
+    def __init__(self, content: str, source_app: str, timestamp: float, snapshot=None):
+        self.content = content
+        self.source_app = source_app
+        self.timestamp = timestamp
+        self.snapshot = snapshot
+        self.queued_at = None
+
+    def same_capture(self, other: 'CaptureRequest') -> bool:
+        if self.source_app != other.source_app or self.content != other.content:
+            return False
+        a, b = self.snapshot, other.snapshot
+        if a is None or b is None:
+            return a is b
+        return a.same_payload(b)
+
+    def __repr__(self):
+        return 'CaptureRequest(%r, app=%r, rich=%r)' % ((self.content or '')[:40], self.source_app, self.snapshot is not None)
+
+
+def make_ingest(history, store=None) -> Callable[[CaptureRequest], object]:
+    """Ingest pipeline for `history`: build rich captures into `store`, then add_item."""
+    from clipboard_manager.capture import build_capture
+    from clipboard_manager.capture_filter import ALLOWED
+    blob_store = store if store is not None else getattr(history, 'blobs', None)
+
+    def ingest(req: CaptureRequest):
+        if req.snapshot is None:
+            return history.add_item(req.content, source_app=req.source_app, timestamp=req.timestamp)
+        # blocked and capture-disabled apps must not leave payloads in the blob store
+        decide = getattr(history, 'capture_decision', None)
+        if decide is not None and decide(req.source_app) is not ALLOWED:
+            return None
+        result = build_capture(req.snapshot, blob_store)
+        if result is None:
+            return None
+        item = None
+        try:
+            item = history.add_item(result.content, source_app=req.source_app, timestamp=req.timestamp,
+                                    kind=result.kind, blobs=result.blobs)
+        finally:
+            if item is None and blob_store is getattr(history, 'blobs', None):
+                release = getattr(history, 'release_blobs', None)
+                if release is not None:
+                    release(result.blobs)
+        return item
+    return ingest
+
+
+def _policy_from(value) -> str:
+    value = str(value or '').strip().lower()
+    return value if value in POLICIES else POLICIES[0]
+
+
+class CaptureQueue:
+    def __init__(self, ingest: Callable[[CaptureRequest], object], on_result: Optional[Callable] = None,
+                 maxsize: Optional[int] = None, policy: Optional[str] = None):
+        self._ingest = ingest
+        self._on_result = on_result
+        self._fixed_maxsize = maxsize is not None
+        self._fixed_policy = policy is not None
+        self.maxsize = max(1, int(maxsize if maxsize is not None else settings.get('capture_queue_size', DEFAULT_MAXSIZE)))
+        self.policy = _policy_from(policy if policy is not None else settings.get('capture_overflow_policy'))
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._stopping = False
+        self._thread = None
+        self._stats = dict.fromkeys(('submitted', 'processed', 'coalesced', 'dropped', 'merged', 'errors', 'max_depth'), 0)
+        try:
+            settings.register_callback(self._on_setting_changed)
+        except Exception:
+            pass
+
+    def _on_setting_changed(self, key, value):
+        try:
+            if key == 'capture_queue_size' and not self._fixed_maxsize:
+                with self._cond:
+                    self.maxsize = max(1, int(value))
+            elif key == 'capture_overflow_policy' and not self._fixed_policy:
+                self.policy = _policy_from(value)
+        except Exception:
+            pass
+
+    def submit(self, req: CaptureRequest) -> bool:
+        """Enqueue a capture; returns False when it was coalesced or dropped."""
+        req.queued_at = time.perf_counter()
+        with self._cond:
+            self._stats['submitted'] += 1
+            q = self._queue
+            if q and q[-1].same_capture(req):
+                self._stats['coalesced'] += 1
+                return False
+            if len(q) >= self.maxsize:
+                if self.policy == 'drop_newest':
+                    self._stats['dropped'] += 1
+                    return False
+                if self.policy == 'merge':
+                    q[-1] = req
+                    self._stats['merged'] += 1
+                    self._ensure_worker_locked()
+                    self._cond.notify()
+                    return True
+                while len(q) >= self.maxsize:
+                    q.popleft()
+                    self._stats['dropped'] += 1
+            q.append(req)
+            if len(q) > self._stats['max_depth']:
+                self._stats['max_depth'] = len(q)
+            self._ensure_worker_locked()
+            self._cond.notify()
+            return True
+
+    def _ensure_worker_locked(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='capture-queue', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if self._stopping and not self._queue:
+                    return
+                req = self._queue.popleft()
+                self._busy = True
+            try:
+                if req.queued_at is not None:
+                    metrics.observe('capture.queue_wait', time.perf_counter() - req.queued_at)
+                with metrics.timer('capture.ingest'):
+                    result = self._ingest(req)
+                if result is not None and req.timestamp:
+                    metrics.observe('capture.latency', time.time() - req.timestamp)
+                if self._on_result is not None:
+                    self._on_result(req, result)
+            except Exception:
+                _log.debug('ingest failed for %r', req, exc_info=True)
+                with self._cond:
+                    self._stats['errors'] += 1
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._stats['processed'] += 1
+                    self._cond.notify_all()
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def stats(self) -> dict:
+        with self._cond:
+            out = dict(self._stats)
+            out['depth'] = len(self._queue)
+            out['maxsize'] = self.maxsize
+            out['policy'] = self.policy
+            return out
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued capture has been ingested; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Finish queued captures and stop the worker; a later submit starts it again."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            t = self._thread
+        if t is not None and t is not threading.current_thread():
+            t.join(timeout)
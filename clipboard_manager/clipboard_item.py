@@ -1,8 +1,15 @@
 from datetime import datetime
 import uuid
+from clipboard_manager.utils import make_preview
+from clipboard_manager import content_analysis
+
+# list rows never show more than this much of an item; the detail pane shows the rest
+PREVIEW_MAX_LINES = 6
+PREVIEW_MAX_CHARS = 400
 
 class ClipboardItem:
-    def __init__(self, content, source_app="Unknown App", board=None, is_temporary: bool = False, expire_at: float = None, pinned: bool = False):
+    def __init__(self, content, source_app="Unknown App", board=None, is_temporary: bool = False, expire_at: float = None, pinned: bool = False,
+                 kind: str = 'text', blobs=None):
         self.id = uuid.uuid4().hex
         self.content = content
         self.source_app = source_app
@@ -11,6 +18,37 @@ class ClipboardItem:
         self.is_temporary = is_temporary
         self.expire_at = expire_at
         self.pinned = pinned
+        # 'text', 'rich', 'image' or 'files'; binary payloads live in the blob store as {mime format: digest}
+        self.kind = kind or 'text'
+        self.blobs = dict(blobs) if blobs else {}
+        self._preview = None
+        self._analysis = None
+
+    @property
+    def preview(self):
+        """Bounded, line-limited head of the content, computed once."""
+        if self._preview is None:
+            self._preview = make_preview(self.content or '', PREVIEW_MAX_LINES, PREVIEW_MAX_CHARS)
+        return self._preview[0]
+
+    @property
+    def preview_truncated(self) -> bool:
+        self.preview
+        return self._preview[1]
+
+    @property
+    def analysis(self):
+        """Cached ContentAnalysis of the text (set by HistoryStore on capture, else computed on first use)."""
+        if self._analysis is None:
+            if self.kind in ('text', 'rich'):
+                self._analysis = content_analysis.analyze(self.content or '')
+            else:
+                self._analysis = content_analysis.ContentAnalysis(content_analysis.TEXT, None, 0.0)
+        return self._analysis
+
+    @analysis.setter
+    def analysis(self, value):
+        self._analysis = value
 
     def __repr__(self):
         return "<ClipboardItem id={} app={} time={} board={} temporary={} pinned={}>".format(self.id, self.source_app, self.timestamp, self.board, self.is_temporary, self.pinned)
@@ -0,0 +1,158 @@
+"""What a copy looks like: URL, code, shell command, JSON or plain text, plus a language guess.
+
+`analyze(text)` is memoized in a bounded LRU, so the watcher (attribution), `HistoryStore`
+(the item's `analysis` and `kind:`/`lang:` search filters) and `BoardRouter`
+(``content_kind`` predicates) share one result per unique copy.
+
+Only the first `ANALYZE_MAX_CHARS` characters are looked at; JSON is parsed in full only
+up to `JSON_MAX_CHARS`. The cache key (`analysis_key`) hashes just what the result depends
+on, so a multi-MB copy costs a hash of its first `ANALYZE_MAX_CHARS` characters.
+"""
+import hashlib
+import json
+import re
+from typing import Optional
+
+from clipboard_manager.utils import LRUCache
+
+CACHE_SIZE = 1024
+ANALYZE_MAX_CHARS = 8 * 1024
+JSON_MAX_CHARS = 256 * 1024
+
+URL, CODE, COMMAND, JSON, TEXT = 'url', 'code', 'command', 'json', 'text'
+KINDS = (URL, CODE, COMMAND, JSON, TEXT)
+
+_URL_RE = re.compile(r'(?:[a-z][a-z0-9+.-]*://|www\.)\S+\Z', re.IGNORECASE)
+_COMMANDS = frozenset((
+    'apt', 'brew', 'cargo', 'cat', 'cd', 'chmod', 'cp', 'curl', 'docker', 'echo', 'export', 'find', 'git',
+    'go', 'grep', 'kubectl', 'ls', 'make', 'mkdir', 'mv', 'npm', 'npx', 'pip', 'pip3', 'python', 'python3',
+    'rm', 'ssh', 'sudo', 'tail', 'tar', 'wget', 'yarn',
+))
+_PROMPT_RE = re.compile(r'^\s*(?:\$|%|>|#)\s+\S')
+# per-language line signals; the language with the most hits wins
+_LANGUAGES = (
+    ('python', re.compile(r'^\s*(?:def \w+\(.*\)\s*(?:->.*)?:|class \w+.*:|(?:from \S+ )?import \w+|elif .*:|'
+                          r'if __name__ ==|@\w+|\w+ = .*self\.)', re.MULTILINE)),
+    ('javascript', re.compile(r'^\s*(?:(?:const|let|var) \w+ =|function\s*\w*\(|export (?:default )?\w+|'
+                              r'import .* from [\'"]|.*=>\s*\{?$|console\.log\()', re.MULTILINE)),
+    ('java', re.compile(r'^\s*(?:(?:public|private|protected)(?: static)?(?: final)? [\w<>\[\]]+ \w+|'
+                        r'package [\w.]+;|import [\w.]+;|System\.out\.)', re.MULTILINE)),
+    ('c', re.compile(r'^\s*(?:#include\s*[<"]|#define \w+|(?:int|void|char|static) \w+\(.*\)\s*\{?$|'
+                     r'printf\()', re.MULTILINE)),
+    ('go', re.compile(r'^\s*(?:func (?:\(.*\) )?\w+\(|package \w+$|\w+ := |fmt\.)', re.MULTILINE)),
+    ('rust', re.compile(r'^\s*(?:(?:pub )?fn \w+|let mut \w+|impl\b|use \w+::|println!\()', re.MULTILINE)),
+    ('sql', re.compile(r'^\s*(?:SELECT .* FROM|INSERT INTO|UPDATE \w+ SET|CREATE TABLE|DELETE FROM)',
+                       re.MULTILINE | re.IGNORECASE)),
+)
+# language-neutral code signals: lines ending in a brace/semicolon, or indented statements
+_CODE_LINE_RE = re.compile(r'(?:[{};]|\)\s*:)\s*$|^\s*[}\])]', re.MULTILINE)
+
+
+class ContentAnalysis:
+    __slots__ = ('kind', 'language', 'confidence')
+
+    def __init__(self, kind: str = TEXT, language: Optional[str] = None, confidence: float = 0.5):
+        self.kind = kind
+        self.language = language
+        self.confidence = confidence
+
+    @property
+    def code_like(self) -> bool:
+        return self.kind in (CODE, JSON)
+
+    def __eq__(self, other):
+        return isinstance(other, ContentAnalysis) and (self.kind, self.language, self.confidence) == (
+            other.kind, other.language, other.confidence)
+
+    def __repr__(self):
+        return 'ContentAnalysis(%r, language=%r, confidence=%.2f)' % (self.kind, self.language, self.confidence)
+
+
+def content_digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def analysis_key(text: str) -> str:
+    """Cache key covering every character `classify(text)` can depend on, and no more."""
+    head = text[:ANALYZE_MAX_CHARS]
+    if len(text) > len(head) and (len(text) > JSON_MAX_CHARS or head.lstrip()[:1] not in ('{', '[')):
+        # past the head only a full JSON parse looks, and that needs a short JSON-looking text
+        return 'head:%s' % content_digest(head)
+    return content_digest(text)
+
+
+def _looks_like_command(first: str, lines: int) -> bool:
+    if _PROMPT_RE.match(first):
+        return True
+    word = first.split(None, 1)[0] if first.strip() else ''
+    return lines <= 5 and word in _COMMANDS
+
+
+def classify(text: str) -> ContentAnalysis:
+    """Analyze `text` without the cache."""
+    stripped = (text or '')[:ANALYZE_MAX_CHARS].strip()
+    if not stripped:
+        return ContentAnalysis(TEXT, None, 0.0)
+    if '\n' not in stripped and _URL_RE.match(stripped):
+        return ContentAnalysis(URL, None, 0.95)
+    if stripped[0] in '{[' and len(text) <= JSON_MAX_CHARS:
+        try:
+            json.loads(text)
+            return ContentAnalysis(JSON, 'json', 0.95)
+        except Exception:
+            pass
+    lines = stripped.splitlines()
+    if _looks_like_command(lines[0], len(lines)):
+        return ContentAnalysis(COMMAND, 'shell', 0.8 if _PROMPT_RE.match(lines[0]) else 0.6)
+    best, hits = None, 0
+    for language, rx in _LANGUAGES:
+        n = len(rx.findall(stripped))
+        if n > hits:
+            best, hits = language, n
+    generic = len(_CODE_LINE_RE.findall(stripped))
+    # share of lines that look like code, boosted by language-specific hits
+    score = (generic + 2 * hits) / float(max(1, len(lines)))
+    if hits and score >= 0.3:
+        return ContentAnalysis(CODE, best, round(min(0.95, 0.5 + score / 2), 2))
+    if generic >= 2 and generic >= len(lines) * 0.4:
+        return ContentAnalysis(CODE, None, 0.5)
+    return ContentAnalysis(TEXT, None, 0.6)
+
+
+class ContentAnalyzer:
+    """Bounded LRU of analyses keyed by `analysis_key`; safe to share between threads."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self._cache = LRUCache(maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._cache.maxsize
+
+    def analyze(self, text: str) -> ContentAnalysis:
+        key = analysis_key(text or '')
+        hit = self._cache.get(key)
+        if hit is not None:
+            self.hits += 1
+            return hit
+        self.misses += 1
+        result = classify(text)
+        self._cache.put(key, result)
+        return result
+
+    def clear(self):
+        self._cache.clear()
+
+
+_analyzer = ContentAnalyzer()
+
+
+def get_analyzer() -> ContentAnalyzer:
+    return _analyzer
+
+
+def analyze(text: str) -> ContentAnalysis:
+    """Cached analysis of `text`."""
+    return _analyzer.analyze(text)
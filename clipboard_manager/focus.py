@@ -0,0 +1,400 @@
+import bisect
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+# polling interval bounds: back off from the minimum while focus stays put
+POLL_MIN_INTERVAL = 0.15
+POLL_MAX_INTERVAL = 2.0
+POLL_BACKOFF = 1.5
+FOCUS_BUFFER = 256
+
+
+def _default_probe() -> Optional[str]:
+    from clipboard_manager import utils
+    return utils.get_frontmost_app()
+
+
+class FocusSource:
+    """Produces focus-change events into a timestamped ring buffer.
+
+    Subclasses call `record()` when the frontmost app changes; only changes are kept.
+    Readers never block on the OS: they take a snapshot with `events_since()`.
+    """
+
+    name = 'base'
+
+    def __init__(self, maxlen: int = FOCUS_BUFFER):
+        self._events = deque(maxlen=int(maxlen))
+        self._lock = threading.Lock()
+        self._last = None
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def is_running(self) -> bool:
+        return False
+
+    def poke(self):
+        """Something focus-sensitive just happened (a copy); polling sources catch up soon. Never blocks."""
+        pass
+
+    def record(self, name: str, ts: Optional[float] = None) -> bool:
+        """Buffer a focus change; returns False for empty names and repeats."""
+        if not name or name == 'Unknown App':
+            return False
+        ts = time.time() if ts is None else float(ts)
+        with self._lock:
+            if name == self._last:
+                return False
+            self._last = name
+            self._events.append((ts, name))
+        return True
+
+    def latest(self) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            return self._events[-1] if self._events else None
+
+    def events_since(self, ts: float) -> List[Tuple[float, str]]:
+        """Return buffered (timestamp, app) events newer than `ts`, oldest first."""
+        with self._lock:
+            out = []
+            for ev in reversed(self._events):
+                if ev[0] <= ts:
+                    break
+                out.append(ev)
+        out.reverse()
+        return out
+
+
+class ManualFocusSource(FocusSource):
+    """Focus source driven by the caller (tests, replays): `emit()` records an event."""
+
+    name = 'manual'
+
+    def emit(self, name: str, ts: Optional[float] = None) -> bool:
+        return self.record(name, ts)
+
+
+class PollingFocusSource(FocusSource):
+    """Fallback source: probes the frontmost app on a background thread.
+
+    Only changes are recorded. While focus stays put the interval grows by POLL_BACKOFF up
+    to `max_interval`; a change or a `poke()` snaps it back to `min_interval`.
+    """
+
+    name = 'poll'
+
+    def __init__(self, probe: Optional[Callable[[], Optional[str]]] = None, min_interval: float = POLL_MIN_INTERVAL,
+                 max_interval: float = POLL_MAX_INTERVAL, maxlen: int = FOCUS_BUFFER):
+        super().__init__(maxlen)
+        self._probe = probe or _default_probe
+        self.min_interval = float(min_interval)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.interval = self.min_interval
+        self.samples = 0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._run, name='focus-poll', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample_once()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def poke(self):
+        """Wake the poll thread and poll at `min_interval` again; never probes on the caller's thread."""
+        self.interval = self.min_interval
+        self._wake.set()
+
+    def sample_once(self) -> Optional[str]:
+        self.samples += 1
+        try:
+            name = self._probe()
+        except Exception:
+            name = None
+        if self.record(name):
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * POLL_BACKOFF, self.max_interval)
+        return name if name and name != 'Unknown App' else None
+
+
+class AppKitFocusSource(FocusSource):
+    """Event-driven source for macOS: NSWorkspace application-activation notifications."""
+
+    name = 'appkit'
+
+    def __init__(self, maxlen: int = FOCUS_BUFFER):
+        super().__init__(maxlen)
+        self._observer = None
+
+    def start(self):
+        if self._observer is not None:
+            return
+        from AppKit import NSWorkspace, NSWorkspaceDidActivateApplicationNotification
+        from Foundation import NSObject
+        import objc
+
+        source = self
+
+        class _AppkitObserver(NSObject):
+            def appActivated_(self, notification):
+                try:
+                    info = notification.userInfo()
+                    app = info.get('NSWorkspaceApplicationKey') if info else None
+                    if app is not None:
+                        name = app.localizedName()
+                        if name:
+                            source.record(str(name))
+                except Exception:
+                    pass
+
+        self._observer = _AppkitObserver.alloc().init()
+        nc = NSWorkspace.sharedWorkspace().notificationCenter()
+        nc.addObserver_selector_name_object_(self._observer, 'appActivated:', NSWorkspaceDidActivateApplicationNotification, None)
+        try:
+            front = NSWorkspace.sharedWorkspace().frontmostApplication()
+            if front is not None and front.localizedName():
+                self.record(str(front.localizedName()))
+        except Exception:
+            pass
+
+    def stop(self):
+        if self._observer is None:
+            return
+        try:
+            from AppKit import NSWorkspace
+            NSWorkspace.sharedWorkspace().notificationCenter().removeObserver_(self._observer)
+        except Exception:
+            pass
+        self._observer = None
+
+    def is_running(self) -> bool:
+        return self._observer is not None
+
+
+_XPROP_WINDOW_RE = re.compile(r'window id # (0x[0-9a-fA-F]+)')
+_XPROP_CLASS_RE = re.compile(r'"([^"]*)"')
+
+
+def _xprop_window_class(window_id: str) -> Optional[str]:
+    res = subprocess.run(['xprop', '-id', window_id, 'WM_CLASS'], capture_output=True, text=True, timeout=0.5)
+    names = _XPROP_CLASS_RE.findall(res.stdout or '')
+    return names[-1] if names else None
+
+
+class XpropFocusSource(FocusSource):
+    """Event-driven source for X11: `xprop -spy` prints a line whenever the active window changes.
+
+    Each change costs one `xprop -id` lookup of the window class; nothing runs while idle.
+    """
+
+    name = 'xprop'
+
+    def __init__(self, cmd: Optional[List[str]] = None, resolve: Optional[Callable[[str], Optional[str]]] = None,
+                 maxlen: int = FOCUS_BUFFER):
+        super().__init__(maxlen)
+        self.cmd = list(cmd) if cmd else ['xprop', '-root', '-spy', '_NET_ACTIVE_WINDOW']
+        self._resolve = resolve or _xprop_window_class
+        self._proc = None
+        self._thread = None
+
+    @staticmethod
+    def available() -> bool:
+        return bool(os.environ.get('DISPLAY')) and shutil.which('xprop') is not None
+
+    def start(self):
+        if self.is_running():
+            return
+        self._proc = subprocess.Popen(self.cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1)
+        self._thread = threading.Thread(target=self._read_loop, args=(self._proc,), name='focus-xprop', daemon=True)
+        self._thread.start()
+
+    def _read_loop(self, proc):
+        try:
+            for line in proc.stdout:
+                m = _XPROP_WINDOW_RE.search(line)
+                if not m or int(m.group(1), 16) == 0:
+                    continue
+                try:
+                    name = self._resolve(m.group(1))
+                except Exception:
+                    name = None
+                if name:
+                    self.record(name)
+        except Exception:
+            pass
+
+    def stop(self, timeout: float = 1.0):
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            try:
+                proc.terminate()
+                proc.wait(timeout=timeout)
+            except Exception:
+                try:
+                    proc.kill()
+                except Exception:
+                    pass
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+
+def _pick_source_kind() -> str:
+    kind = (os.environ.get('CLIP_FOCUS_SOURCE') or 'auto').lower()
+    if kind != 'auto':
+        return kind
+    if sys.platform == 'darwin':
+        from clipboard_manager.utils import is_pyobjc_available
+        return 'appkit' if is_pyobjc_available() else 'poll'
+    if sys.platform.startswith('linux') and XpropFocusSource.available():
+        return 'xprop'
+    return 'none'
+
+
+_source = None
+_source_lock = threading.Lock()
+
+
+def get_focus_source() -> Optional[FocusSource]:
+    """Return the shared, started focus source, or None where none applies.
+
+    CLIP_FOCUS_SOURCE picks one explicitly: appkit, xprop, poll, or none (default auto:
+    AppKit notifications on macOS with pyobjc, polling on macOS without, xprop on X11).
+    """
+    global _source
+    with _source_lock:
+        if _source is not None:
+            return _source
+        kind = _pick_source_kind()
+        factories = {'appkit': AppKitFocusSource, 'xprop': XpropFocusSource, 'poll': PollingFocusSource}
+        if kind not in factories:
+            return None
+        src = factories[kind]()
+        try:
+            src.start()
+        except Exception:
+            # the event-driven source is unavailable; polling only helps where probes exist
+            if kind == 'poll' or sys.platform != 'darwin':
+                return None
+            src = PollingFocusSource()
+            src.start()
+        _source = src
+        return _source
+
+
+class FocusInfo:
+    """Classification of an app name, computed once per distinct name."""
+
+    __slots__ = ('name', 'lower', 'is_ide', 'is_browser', 'is_comm', 'is_self', 'ignored', 'own', 'weight')
+
+    def __init__(self, name: str, lower: str = None, is_ide: bool = False, is_browser: bool = False,
+                 is_comm: bool = False, is_self: bool = False, ignored: bool = False, own: bool = False,
+                 weight: float = 0.0):
+        self.name = name
+        self.lower = name.lower() if lower is None else lower
+        self.is_ide = is_ide
+        self.is_browser = is_browser
+        self.is_comm = is_comm
+        self.is_self = is_self
+        self.ignored = ignored
+        self.own = own
+        self.weight = weight
+
+
+class FocusHistory:
+    """Time-ordered ring buffer of focus events with bisect-based window queries.
+
+    Behaves like the `deque` of `(ts, name)` tuples it replaces (`append`, iteration,
+    `reversed`, `len`), but also classifies each name once on insert through `classify`
+    and answers `window(start, end)` in O(log n + k).
+    """
+
+    def __init__(self, maxlen: int = 80, classify: Optional[Callable[[str], FocusInfo]] = None):
+        self.maxlen = int(maxlen)
+        self._classify = classify or FocusInfo
+        self._info_cache = {}
+        self._ts = []
+        self._names = []
+        self._infos = []
+        self._start = 0
+
+    def info(self, name: str) -> FocusInfo:
+        info = self._info_cache.get(name)
+        if info is None:
+            if len(self._info_cache) >= 1024:
+                self._info_cache.clear()
+            info = self._info_cache[name] = self._classify(name)
+        return info
+
+    def append(self, event: Tuple[float, str]) -> None:
+        self.add(event[0], event[1])
+
+    def add(self, ts: float, name: str) -> None:
+        ts = float(ts)
+        info = self.info(name)
+        if self._ts and ts < self._ts[-1]:
+            i = bisect.bisect_right(self._ts, ts, self._start)
+            self._ts.insert(i, ts)
+            self._names.insert(i, name)
+            self._infos.insert(i, info)
+        else:
+            self._ts.append(ts)
+            self._names.append(name)
+            self._infos.append(info)
+        if len(self._ts) - self._start > self.maxlen:
+            self._start += 1
+            if self._start >= self.maxlen:
+                del self._ts[:self._start], self._names[:self._start], self._infos[:self._start]
+                self._start = 0
+
+    def clear(self) -> None:
+        self._ts, self._names, self._infos, self._start = [], [], [], 0
+
+    def __len__(self) -> int:
+        return len(self._ts) - self._start
+
+    def __iter__(self):
+        return zip(self._ts[self._start:], self._names[self._start:])
+
+    def __reversed__(self):
+        return reversed(list(self))
+
+    def window(self, start: float, end: float = float('inf')) -> List[Tuple[float, str, FocusInfo]]:
+        """Events with start <= ts <= end, oldest first, as (ts, name, info)."""
+        lo = bisect.bisect_left(self._ts, start, self._start)
+        hi = bisect.bisect_right(self._ts, end, lo)
+        return list(zip(self._ts[lo:hi], self._names[lo:hi], self._infos[lo:hi]))
@@ -1,14 +1,216 @@
 from PyQt6.QtWidgets import QMainWindow, QListWidget, QVBoxLayout, QWidget, QComboBox, QMenu, QApplication
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QLabel, QSpinBox, QHBoxLayout, QCheckBox, QPushButton, QDialog, QTextEdit, QDialogButtonBox, QFormLayout, QLineEdit
-from PyQt6.QtGui import QShortcut, QKeySequence
+from PyQt6.QtWidgets import QPlainTextEdit, QSplitter
+from PyQt6.QtGui import QShortcut, QKeySequence, QTextCursor, QImageReader, QPixmap
 from clipboard_manager.history import History
 from clipboard_manager.watcher import ClipboardWatcher
-from clipboard_manager.utils import trim_whitespace, copy_one_line, extract_urls_text, json_escape, to_camel_case, to_snake_case, fuzzy_score, highlight_match
-from PyQt6.QtCore import QTimer
-import os
+from clipboard_manager.utils import trim_whitespace, copy_one_line, extract_urls_text, json_escape, to_camel_case, to_snake_case, fuzzy_score, highlight_match, LRUCache
+from PyQt6.QtCore import QTimer, QObject, pyqtSignal, QThreadPool, QBuffer, QByteArray, QIODevice
+from clipboard_manager.blobs import BlobStore
+from clipboard_manager.capture import image_digest, is_image_label
+from clipboard_manager.capture_queue import CaptureQueue, CaptureRequest, make_ingest
+from PyQt6.QtGui import QPalette
+from collections import deque
+import time
+from clipboard_manager import metrics
+from clipboard_manager.log import get_logger
 from clipboard_manager import settings
 
+_log = get_logger('gui')
+
+# rows render at most this many characters of an item, centred on the search match
+ROW_PREVIEW_CHARS = 400
+ROW_CACHE_SIZE = 2000
+# the detail pane appends content in chunks of this many characters per event-loop tick
+DETAIL_CHUNK_CHARS = 64 * 1024
+# above this size the detail pane disables line wrapping so Qt never lays out one giant paragraph
+DETAIL_NOWRAP_CHARS = 256 * 1024
+# the UI scheduler flushes at most once per frame and spends at most UI_BUDGET_MS per flush
+UI_FRAME_MS = 16
+UI_BUDGET_MS = 8
+# image rows show a thumbnail this many pixels square; decoded thumbnails are kept in an LRU
+THUMB_SIZE = 48
+THUMB_CACHE_SIZE = 256
+
+
+class ContentDetailView(QPlainTextEdit):
+    """Read-only pane that streams an item's full content in chunks.
+
+    QPlainTextEdit lays out blocks lazily, so only the visible lines cost anything;
+    loading in DETAIL_CHUNK_CHARS slices keeps huge clips from blocking the GUI thread.
+    """
+
+    def __init__(self, parent=None):
+        super(ContentDetailView, self).__init__(parent)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self._item_id = None
+        self._content = ''
+        self._offset = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._load_next_chunk)
+
+    def item_id(self):
+        return self._item_id
+
+    def is_loading(self):
+        return self._timer.isActive()
+
+    def show_item(self, item):
+        self._timer.stop()
+        self.clear()
+        self._item_id = getattr(item, 'id', None)
+        self._content = (getattr(item, 'content', None) or '') if item is not None else ''
+        self._offset = 0
+        if len(self._content) > DETAIL_NOWRAP_CHARS:
+            self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        else:
+            self.setLineWrapMode(QPlainTextEdit.LineWrapMode.WidgetWidth)
+        if self._content:
+            self._load_next_chunk()
+            if self._offset < len(self._content):
+                self._timer.start()
+
+    def _load_next_chunk(self):
+        chunk = self._content[self._offset:self._offset + DETAIL_CHUNK_CHARS]
+        if chunk:
+            cursor = QTextCursor(self.document())
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(chunk)
+            self._offset += len(chunk)
+        if self._offset >= len(self._content):
+            self._timer.stop()
+            self._content = ''
+            if self._offset:
+                self.moveCursor(QTextCursor.MoveOperation.Start)
+
+
+class UiUpdateScheduler(QObject):
+    """Collect dirty flags from anywhere and flush them together, at most once per frame.
+
+    `handlers` maps a flag to a callable taking the flush deadline (perf_counter seconds)
+    and returning True when its work is complete; unfinished flags stay dirty and are
+    retried on the next tick so floods of changes never monopolize the event loop.
+    `mark()` is safe to call from any thread.
+    """
+
+    _requested = pyqtSignal(object)
+
+    def __init__(self, handlers, order, parent=None, frame_ms=UI_FRAME_MS, budget_ms=UI_BUDGET_MS):
+        super(UiUpdateScheduler, self).__init__(parent)
+        self._handlers = dict(handlers)
+        self._order = list(order)
+        self._dirty = set()
+        self._budget = float(budget_ms) / 1000.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(int(frame_ms))
+        self._timer.timeout.connect(self.flush)
+        self._requested.connect(self._mark_now)
+
+    def mark(self, *flags):
+        try:
+            self._requested.emit(flags)
+        except RuntimeError:
+            pass
+
+    def _mark_now(self, flags):
+        self._dirty.update(f for f in flags if f in self._handlers)
+        if self._dirty and not self._timer.isActive():
+            self._timer.start()
+
+    def is_dirty(self, flag=None):
+        return bool(self._dirty) if flag is None else flag in self._dirty
+
+    def flush(self, budget=None):
+        """Run dirty handlers in order until done or the budget is spent; reschedule leftovers."""
+        budget = self._budget if budget is None else budget
+        deadline = time.perf_counter() + budget
+        for flag in self._order:
+            if flag not in self._dirty:
+                continue
+            self._dirty.discard(flag)
+            try:
+                with metrics.timer('ui.flush.' + flag):
+                    done = self._handlers[flag](deadline)
+            except Exception:
+                done = True
+            if not done:
+                self._dirty.add(flag)
+            if time.perf_counter() >= deadline:
+                break
+        if self._dirty and not self._timer.isActive():
+            self._timer.start()
+
+
+def decode_thumbnail(data, size=THUMB_SIZE):
+    """Decode encoded image bytes straight into a thumbnail-sized QImage (None on failure).
+
+    QImageReader scales while decoding, so a huge screenshot never exists at full size.
+    """
+    if not data:
+        return None
+    buf = QBuffer()
+    buf.setData(QByteArray(data))
+    if not buf.open(QIODevice.OpenModeFlag.ReadOnly):
+        return None
+    reader = QImageReader(buf)
+    full = reader.size()
+    if full.isValid() and (full.width() > size or full.height() > size):
+        reader.setScaledSize(full.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    buf.close()
+    return None if image.isNull() else image
+
+
+class ThumbnailLoader(QObject):
+    """Lazily build image thumbnails: decode on a worker, convert to QPixmap on the GUI thread.
+
+    `pixmap(digest)` returns the cached thumbnail or None after queueing a decode;
+    `loaded(digest)` fires once it is available.
+    """
+
+    loaded = pyqtSignal(str)
+    _decoded = pyqtSignal(str, object)
+
+    def __init__(self, store, size=THUMB_SIZE, parent=None):
+        super(ThumbnailLoader, self).__init__(parent)
+        self._store = store
+        self._size = int(size)
+        self._cache = LRUCache(THUMB_CACHE_SIZE)
+        self._pending = set()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+        self._decoded.connect(self._on_decoded)
+
+    def pixmap(self, digest):
+        pm = self._cache.get(digest)
+        if pm is not None:
+            return None if pm.isNull() else pm
+        if digest and digest not in self._pending:
+            self._pending.add(digest)
+            self._pool.start(lambda: self._decode(digest))
+        return None
+
+    def _decode(self, digest):
+        try:
+            image = decode_thumbnail(self._store.get(digest), self._size)
+        except Exception:
+            image = None
+        self._decoded.emit(digest, image)
+
+    def _on_decoded(self, digest, image):
+        self._pending.discard(digest)
+        # failures are cached as a null pixmap so broken blobs are not decoded again
+        self._cache.put(digest, QPixmap.fromImage(image) if image is not None else QPixmap())
+        if image is not None:
+            self.loaded.emit(digest)
+
+    def wait(self, ms=-1):
+        return self._pool.waitForDone(ms)
+
 
 class BlocklistEditor(QDialog):
     def __init__(self, parent=None, initial_blocklist=None):
@@ -123,15 +325,6 @@ class SettingsDialog(QDialog):
             self._pending_blocklist = entries
 
     def _on_apply(self):
-        # Apply settings immediately and keep dialog open
-        settings.set_('pause_after_set_ms', int(self.pause_spin.value()))
-        settings.set_('secret_safe_mode', bool(self.secret_safe_chk.isChecked()))
-        settings.set_('persistence_enabled', bool(self.persistence_chk.isChecked()))
-        # apply pending blocklist
-        settings.set_('blocklist_apps', list(self._pending_blocklist or []))
-        # advanced settings
-        settings.set_('dedupe_lru_size', int(self.dedupe_lru_spin.value()))
-        settings.set_('dedupe_per_app_window_s', int(self.dedupe_per_app_spin.value()))
         # per-app capture parsing
         pam = {}
         try:
@@ -143,10 +336,19 @@ class SettingsDialog(QDialog):
                     pam[k] = bool(int(v))
         except Exception:
             pam = settings.get('per_app_capture_toggle', {}) or {}
-        settings.set_('per_app_capture_toggle', pam)
+        # Apply settings immediately and keep dialog open; listeners see one change set
+        with settings.batch():
+            settings.set_('pause_after_set_ms', int(self.pause_spin.value()))
+            settings.set_('secret_safe_mode', bool(self.secret_safe_chk.isChecked()))
+            settings.set_('persistence_enabled', bool(self.persistence_chk.isChecked()))
+            # apply pending blocklist
+            settings.set_('blocklist_apps', list(self._pending_blocklist or []))
+            # advanced settings
+            settings.set_('dedupe_lru_size', int(self.dedupe_lru_spin.value()))
+            settings.set_('dedupe_per_app_window_s', int(self.dedupe_per_app_spin.value()))
+            settings.set_('per_app_capture_toggle', pam)
         # commit to disk immediately since user explicitly applied
         settings.save_settings()
-        # notify user via callbacks (callbacks already invoked by set_)
         # do not close the dialog on Apply; user can Close when done
 
     def _on_reset(self):
@@ -174,6 +376,9 @@ class SettingsDialog(QDialog):
 
 
 class MainWindow(QMainWindow):
+    # (CaptureRequest, item or None) from the capture worker, delivered on the GUI thread
+    _capture_ingested = pyqtSignal(object, object)
+
     def __init__(self, history=None):
         super(MainWindow, self).__init__()
         self.setWindowTitle('App-Aware Clipboard Manager')
@@ -182,7 +387,21 @@ class MainWindow(QMainWindow):
         self.history = history or History()
         self._pause_ms = int(settings.get('pause_after_set_ms', 300))
 
-        self._history_listener = lambda: QTimer.singleShot(0, self._on_history_changed)
+        self._row_cache = LRUCache(ROW_CACHE_SIZE)
+        self._apps_version = None
+
+        self._pending_rows = deque()
+        self._pending_filter = ''
+        self._pending_select_app = None
+        self._pending_scroll_id = None
+        self._ui = UiUpdateScheduler(
+            {'apps': self._flush_apps, 'list': self._flush_list, 'rows': self._flush_rows, 'status': self._flush_status},
+            ('apps', 'list', 'rows', 'status'), parent=self)
+        self._pause_hide_timer = QTimer(self)
+        self._pause_hide_timer.setSingleShot(True)
+        self._pause_hide_timer.timeout.connect(lambda: self._ui.mark('status'))
+
+        self._history_listener = lambda: self._ui.mark('apps', 'list', 'status')
         self.history.add_change_listener(self._history_listener)
 
         ss_layout = QHBoxLayout()
@@ -199,7 +418,7 @@ class MainWindow(QMainWindow):
         ss_layout.addWidget(self.settings_btn)
 
         self.app_dropdown = QComboBox()
-        self.app_dropdown.currentIndexChanged.connect(self.update_list)
+        self.app_dropdown.currentIndexChanged.connect(lambda _idx: self._ui.mark('list', 'status'))
         self.app_capture_checkbox = QCheckBox('Capture for this app')
         self.app_capture_checkbox.stateChanged.connect(self._on_app_capture_toggled)
 
@@ -209,7 +428,7 @@ class MainWindow(QMainWindow):
 
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText('Search current app/board...')
-        self.search_box.textChanged.connect(self.update_list)
+        self.search_box.textChanged.connect(lambda _text: self._ui.mark('list'))
 
         layout = QVBoxLayout()
         pause_layout = QHBoxLayout()
@@ -230,7 +449,14 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.app_dropdown)
         layout.addWidget(self.app_capture_checkbox)
         layout.addWidget(self.search_box)
-        layout.addWidget(self.list_widget)
+        self.detail_view = ContentDetailView()
+        self.list_widget.currentItemChanged.connect(self._on_current_row_changed)
+        self.splitter = QSplitter(Qt.Orientation.Vertical)
+        self.splitter.addWidget(self.list_widget)
+        self.splitter.addWidget(self.detail_view)
+        self.splitter.setStretchFactor(0, 3)
+        self.splitter.setStretchFactor(1, 1)
+        layout.addWidget(self.splitter)
         container = QWidget()
         container.setLayout(layout)
         self.setCentralWidget(container)
@@ -238,38 +464,41 @@ class MainWindow(QMainWindow):
         shortcut = QShortcut(QKeySequence('Ctrl+`'), self)
         shortcut.activated.connect(self._on_hotkey_open)
 
+        store = getattr(self.history, 'blobs', None) or BlobStore()
+        # captures are ingested (hash, dedupe, blob and SQLite writes) on the queue's worker
+        self.capture_queue = CaptureQueue(make_ingest(self.history, store), on_result=self._emit_ingested)
+        self._capture_ingested.connect(self._on_capture_ingested)
+        self._thumbs = ThumbnailLoader(store, parent=self)
+        self._thumbs.loaded.connect(self._on_thumbnail_loaded)
+        # digest -> thumbnail labels of the current rows still waiting for their pixmap
+        self._thumb_labels = {}
+
         self.watcher = ClipboardWatcher()
         self.watcher.clipboard_changed.connect(self._on_clipboard_event)
+        self.watcher.rich_clipboard_changed.connect(self._on_rich_clipboard_event)
 
     def _on_clipboard_event(self, content: str, source_app: str, timestamp: float):
-        if os.environ.get('CLIP_DEBUG') == '2':
-            try:
-                preview = (content or '')[:200].replace('\n','\\n')
-            except Exception:
-                preview = ''
-            print('[clip-debug] gui._on_clipboard_event received preview="%s" source_app=%s ts=%s' % (preview, source_app, timestamp))
-        item = self.history.add_item(content, source_app=source_app, timestamp=timestamp)
+        _log.debug('clipboard event app=%s ts=%.3f preview=%.200r', source_app, timestamp, content)
+        self.capture_queue.submit(CaptureRequest(content, source_app, timestamp))
+
+    def _on_rich_clipboard_event(self, snap, source_app: str, timestamp: float):
+        self.capture_queue.submit(CaptureRequest(snap.text, source_app, timestamp, snapshot=snap))
+
+    def _emit_ingested(self, req, item):
+        try:
+            self._capture_ingested.emit(req, item)
+        except RuntimeError:
+            # the window was destroyed while the capture was in flight
+            pass
+
+    def _on_capture_ingested(self, req, item):
         if item is not None:
-            if os.environ.get('CLIP_DEBUG') == '2':
-                print('[clip-debug] gui: history.add_item returned id=%s' % (item.id,))
-            self.update_apps_dropdown()
-            try:
-                self.app_dropdown.setCurrentText(item.source_app)
-            except Exception:
-                pass
-            self.update_list()
-            try:
-                from PyQt6.QtWidgets import QListWidgetItem
-                for i in range(self.list_widget.count()):
-                    lw = self.list_widget.item(i)
-                    try:
-                        if lw and lw.data(int(Qt.ItemDataRole.UserRole)) == item.id:
-                            self.list_widget.scrollToItem(lw)
-                            break
-                    except Exception:
-                        continue
-            except Exception:
-                pass
+            _log.debug('ingested item id=%s app=%s', item.id, item.source_app)
+            # select the capturing app and reveal the item on the next flush; add_item's
+            # change notification has already marked the list dirty
+            self._pending_select_app = item.source_app
+            self._pending_scroll_id = item.id
+            self._ui.mark('apps', 'list')
 
     def _on_pause_spin_changed(self, value: int):
         self._pause_ms = int(value)
@@ -280,64 +509,227 @@ class MainWindow(QMainWindow):
             pass
 
     def update_apps_dropdown(self):
-        apps = self.history.get_apps()
-        current_app = self.app_dropdown.currentText()
+        """Sync the app combo with the history's app registry.
+
+        Rows are only rebuilt (ordered by recency) when an app appears or disappears;
+        otherwise the per-app counts are refreshed in place.
+        """
+        stats = self.history.get_app_stats()
+        version = self.history.get_apps_version()
+        current_app = self._current_app()
         self.app_dropdown.blockSignals(True)
-        self.app_dropdown.clear()
-        self.app_dropdown.addItems(apps)
-        if current_app in apps:
-            self.app_dropdown.setCurrentText(current_app)
+        if version != self._apps_version or self.app_dropdown.count() != len(stats):
+            self._apps_version = version
+            self.app_dropdown.clear()
+            for app, count, _last_used in stats:
+                self.app_dropdown.addItem(self._app_label(app, count), app)
+            if current_app:
+                self._select_app(current_app)
+        else:
+            counts = {app: count for app, count, _last_used in stats}
+            for i in range(self.app_dropdown.count()):
+                app = self.app_dropdown.itemData(i)
+                label = self._app_label(app, counts.get(app, 0))
+                if self.app_dropdown.itemText(i) != label:
+                    self.app_dropdown.setItemText(i, label)
         self.app_dropdown.blockSignals(False)
-        sel = self.app_dropdown.currentText()
+        sel = self._current_app()
         enabled = self.history.is_app_capture_enabled(sel)
         self.app_capture_checkbox.blockSignals(True)
         self.app_capture_checkbox.setChecked(enabled)
         self.app_capture_checkbox.blockSignals(False)
 
-    def _on_history_changed(self):
+    @staticmethod
+    def _app_label(app, count):
+        return '%s (%d)' % (app, count)
+
+    def _current_app(self):
+        app = self.app_dropdown.currentData()
+        return app if app is not None else ''
+
+    def _select_app(self, app):
+        idx = self.app_dropdown.findData(app)
+        if idx >= 0:
+            self.app_dropdown.setCurrentIndex(idx)
+
+    def _flush_apps(self, deadline):
         self.update_apps_dropdown()
-        self.update_list()
+        if self._pending_select_app:
+            app, self._pending_select_app = self._pending_select_app, None
+            self.app_dropdown.blockSignals(True)
+            try:
+                self._select_app(app)
+            finally:
+                self.app_dropdown.blockSignals(False)
+            self._ui.mark('list', 'status')
+        return True
+
+    def _flush_list(self, deadline):
+        self._begin_list_render()
+        self._ui.mark('rows')
+        return True
+
+    def _flush_rows(self, deadline):
+        return self._render_pending_rows(deadline)
+
+    def _flush_status(self, deadline):
+        enabled = self.history.is_app_capture_enabled(self._current_app())
+        if self.app_capture_checkbox.isChecked() != enabled:
+            self.app_capture_checkbox.blockSignals(True)
+            self.app_capture_checkbox.setChecked(enabled)
+            self.app_capture_checkbox.blockSignals(False)
+        safe = self.history.get_secret_safe_enabled()
+        if self.secret_safe_checkbox.isChecked() != safe:
+            self.secret_safe_checkbox.blockSignals(True)
+            self.secret_safe_checkbox.setChecked(safe)
+            self.secret_safe_checkbox.blockSignals(False)
+        if self.pause_status_label.isVisible() and not self._pause_hide_timer.isActive():
+            self.pause_status_label.setVisible(False)
+        return True
 
     def closeEvent(self, event):
         try:
             self.history.remove_change_listener(self._history_listener)
         except Exception:
             pass
+        try:
+            self.capture_queue.stop()
+        except Exception:
+            pass
         return super(MainWindow, self).closeEvent(event)
 
     def update_list(self):
+        """Rebuild the whole list synchronously."""
+        self._begin_list_render()
+        self._render_pending_rows(None)
+
+    def _begin_list_render(self):
         self.list_widget.clear()
-        selected_app = self.app_dropdown.currentText()
+        self._pending_rows = deque()
+        self._thumb_labels = {}
+        selected_app = self._current_app()
         if not selected_app:
             return
         filter_text = self.search_box.text().strip()
-        from PyQt6.QtWidgets import QListWidgetItem
-        items = self.history.get_items_by_app(selected_app)
+        # exact substring hits come straight from the history's trigram index and go first
+        # (pinned, then by time); the app's other items follow ranked by fuzzy score
+        literal = self.history.search(filter_text, source_app=selected_app)
+        literal.sort(key=lambda it: (not getattr(it, 'pinned', False), it.timestamp))
         scored = []
-        for item in items:
-            if not filter_text:
-                score = 100
-            else:
+        if filter_text:
+            seen = set(it.id for it in literal)
+            for item in self.history.get_items_by_app(selected_app):
+                if item.id in seen:
+                    continue
                 score = fuzzy_score(item.content, filter_text)
-            if score <= 0:
-                continue
-            scored.append((score, item))
-        scored.sort(key=lambda x: (-x[0], not getattr(x[1], 'pinned', False), x[1].timestamp),)
-        for score, item in scored:
-            label_html = highlight_match(item.content, filter_text)
-            timestamp = item.timestamp.strftime('%H:%M:%S')
-            board = getattr(item.board, 'value', 'other')
-            html = '<span style="color: gray; font-size: 10px">%s</span> - <span style="font-weight: bold;">[%s]</span> %s' % (timestamp, board, label_html)
+                if score <= 0:
+                    continue
+                scored.append((score, item))
+            scored.sort(key=lambda x: (-x[0], not getattr(x[1], 'pinned', False), x[1].timestamp),)
+        self._pending_rows = deque(literal)
+        self._pending_rows.extend(item for _score, item in scored)
+        self._pending_filter = filter_text
+
+    def _render_pending_rows(self, deadline):
+        """Append queued rows until `deadline` (None means no limit); return True when all are shown."""
+        from PyQt6.QtWidgets import QListWidgetItem
+        theme = self._theme_key()
+        filter_text = self._pending_filter
+        rows = self._pending_rows
+        while rows:
+            item = rows.popleft()
+            html = self._row_html(item, filter_text, theme)
             list_item = QListWidgetItem()
             list_item.setData(int(Qt.ItemDataRole.UserRole), item.id)
-            if getattr(item, 'pinned', False):
-                html = '<span style="color: green; font-weight: bold;">[PIN]</span> ' + html
             self.list_widget.addItem(list_item)
             label_widget = QLabel()
             label_widget.setTextFormat(Qt.TextFormat.RichText)
             label_widget.setText(html)
             label_widget.setWordWrap(True)
-            self.list_widget.setItemWidget(list_item, label_widget)
+            digest = image_digest(item.blobs) if getattr(item, 'kind', 'text') == 'image' else None
+            if digest:
+                row_widget = self._image_row_widget(digest, label_widget)
+                list_item.setSizeHint(row_widget.sizeHint())
+                self.list_widget.setItemWidget(list_item, row_widget)
+            else:
+                self.list_widget.setItemWidget(list_item, label_widget)
+            if item.id == self._pending_scroll_id:
+                self._pending_scroll_id = None
+                self.list_widget.scrollToItem(list_item)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return not rows
+
+    def _image_row_widget(self, digest, label_widget):
+        thumb = QLabel()
+        thumb.setFixedSize(THUMB_SIZE, THUMB_SIZE)
+        thumb.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        pm = self._thumbs.pixmap(digest)
+        if pm is not None:
+            thumb.setPixmap(pm)
+        else:
+            self._thumb_labels.setdefault(digest, []).append(thumb)
+        row = QWidget()
+        row_layout = QHBoxLayout(row)
+        row_layout.setContentsMargins(0, 0, 0, 0)
+        row_layout.addWidget(thumb)
+        row_layout.addWidget(label_widget, 1)
+        return row
+
+    def _on_thumbnail_loaded(self, digest):
+        labels = self._thumb_labels.pop(digest, ())
+        pm = self._thumbs.pixmap(digest) if labels else None
+        if pm is None:
+            return
+        for thumb in labels:
+            try:
+                thumb.setPixmap(pm)
+            except RuntimeError:
+                # the row was cleared before the thumbnail arrived
+                pass
+
+    def _theme_key(self):
+        try:
+            return self.palette().color(QPalette.ColorRole.Window).name()
+        except Exception:
+            return ''
+
+    def _row_html(self, item, filter_text, theme):
+        """Return the rich-text label for a list row, reusing the cached copy when nothing changed."""
+        pinned = bool(getattr(item, 'pinned', False))
+        board = getattr(item.board, 'value', 'other')
+        key = (item.id, filter_text, theme, pinned, board)
+        html = self._row_cache.get(key)
+        if html is not None:
+            return html
+        preview = item.preview
+        if not filter_text or filter_text.lower() in preview.lower():
+            label_html = highlight_match(preview, filter_text).replace('\n', '<br>')
+            if item.preview_truncated:
+                label_html += '\u2026'
+        else:
+            label_html = highlight_match(item.content, filter_text, window=ROW_PREVIEW_CHARS)
+        timestamp = item.timestamp.strftime('%H:%M:%S')
+        html = '<span style="color: gray; font-size: 10px">%s</span> - <span style="font-weight: bold;">[%s]</span> %s' % (timestamp, board, label_html)
+        kind = getattr(item, 'kind', 'text')
+        if kind != 'text':
+            html = '<span style="color: gray;">[%s]</span> ' % (kind,) + html
+        if pinned:
+            html = '<span style="color: green; font-weight: bold;">[PIN]</span> ' + html
+        self._row_cache.put(key, html)
+        return html
+
+    def _on_current_row_changed(self, current, previous=None):
+        if current is None:
+            # the list is being rebuilt; keep showing the item unless it left the history
+            shown = self.detail_view.item_id()
+            if shown is not None and self.history.get_item_by_id(shown) is None:
+                self.detail_view.show_item(None)
+            return
+        item_id = current.data(int(Qt.ItemDataRole.UserRole))
+        if item_id == self.detail_view.item_id():
+            return
+        self.detail_view.show_item(self.history.get_item_by_id(item_id))
 
     def show_context_menu(self, position):
         item = self.list_widget.itemAt(position)
@@ -391,26 +783,29 @@ class MainWindow(QMainWindow):
             else:
                 out = original
 
+            # pin/unpin notify the history listeners, which schedule the list refresh
             if action == pin_action:
                 self.history.pin_item(item_id)
-                self.update_list()
                 return
             if action == unpin_action:
                 self.history.unpin_item(item_id)
-                self.update_list()
                 return
 
             self.pause_status_label.setText('Paused (%d ms)' % (self._pause_ms,))
             self.pause_status_label.setVisible(True)
-            self.watcher.set_text(out, pause_ms=self._pause_ms)
-            try:
-                QTimer.singleShot(self._pause_ms, lambda: self.pause_status_label.setVisible(False))
-            except Exception:
-                self.pause_status_label.setVisible(False)
+            if action == copy_action and getattr(item_obj, 'blobs', None):
+                # put the original formats back (image, HTML/RTF, file URLs), not just the text
+                formats = {fmt: self.history.blobs.get(d) for fmt, d in item_obj.blobs.items()}
+                text = None if item_obj.kind == 'image' and is_image_label(original) else original
+                self.watcher.set_mime_data(formats, text=text, pause_ms=self._pause_ms)
+            else:
+                self.watcher.set_text(out, pause_ms=self._pause_ms)
+            self._pause_hide_timer.start(max(0, int(self._pause_ms)))
 
     def _on_secret_safe_toggled(self, state: int):
         enabled = (state == Qt.CheckState.Checked)
         self.history.set_secret_safe_enabled(enabled)
+        settings.save_debounced()
 
     def _on_edit_blocklist(self):
         initial_blocklist = self.history.get_blocklist()
@@ -418,7 +813,6 @@ class MainWindow(QMainWindow):
         if editor.exec() == QDialog.DialogCode.Accepted:
             entries = editor.get_entries()
             self.history.set_blocklist(entries)
-            settings.set_('blocklist_apps', entries)
             settings.save_debounced()
 
     def _open_settings_dialog(self):
@@ -482,6 +876,8 @@ class MainWindow(QMainWindow):
 
     def _on_app_capture_toggled(self, state: int):
         enabled = (state == Qt.CheckState.Checked)
-        current_app = self.app_dropdown.currentText()
+        current_app = self._current_app()
         if current_app:
+            # writes the per_app_capture_toggle setting the Settings dialog edits
             self.history.set_app_capture_enabled(current_app, enabled)
+            settings.save_debounced()
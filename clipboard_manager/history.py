@@ -1,37 +1,95 @@
 from clipboard_manager.clipboard_item import ClipboardItem
+from clipboard_manager.search_index import TrigramIndex
+from clipboard_manager.blobs import BlobStore
+from clipboard_manager import secret_scan
+from clipboard_manager import content_analysis
+from clipboard_manager import metrics
+from clipboard_manager.log import get_logger
+from clipboard_manager.capture_filter import CaptureFilter, DISABLED, BLOCKED
 from collections import OrderedDict
 import hashlib
 import time
 from datetime import datetime
 import threading
-import re
 import os
 from clipboard_manager import settings
 
+_log = get_logger('history')
+
 MAX_RECENT_HASHES = 200
 APP_DEDUPE_SECONDS = 30
 TEMPORARY_TOKEN_SECONDS = 30
-BLOCKLIST_DEFAULTS = {
-    '1password', '1password 8', 'lastpass', 'bitwarden', 'dashlane', 'keepassxc', 'keepass', 'google authenticator', 'authy', 'keychain', 'password manager'
-}
+# per-app capture decisions remembered between filter rebuilds
+DECISION_CACHE_SIZE = 1024
+BLOCKLIST_DEFAULTS = frozenset(settings.DEFAULTS['blocklist_apps'])
+
+
+def _blocklist_entries(value):
+    # the setting might be a list or a newline string
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return value
+    if isinstance(value, str):
+        return value.split('\n')
+    return []
+
+
+def _split_filters(query):
+    """Pull ``kind:`` / ``lang:`` terms out of a lower-cased query."""
+    if ':' not in query:
+        return query, None, None
+    kinds, langs, rest = set(), set(), []
+    for term in query.split():
+        if term.startswith('kind:') and len(term) > 5:
+            kinds.add(term[5:])
+        elif term.startswith('lang:') and len(term) > 5:
+            langs.add(term[5:])
+        else:
+            rest.append(term)
+    if not kinds and not langs:
+        return query, None, None
+    return ' '.join(rest), kinds or None, langs or None
 
-_JWT_RE = re.compile(r"^[A-Za-z0-9-_]+\.[A-Za-z0-9-_]+\.[A-Za-z0-9-_]+$")
-_LONG_BASE64_RE = re.compile(r"^[A-Za-z0-9-_]{40,}$")
 
 class HistoryStore:
-    def __init__(self, persistence=None):
+    def __init__(self, persistence=None, blobs=None):
         self.items = []
         self._recent_hashes = OrderedDict()
         self._last_seen_by_app = {}
         self._items_by_id = {}
+        self._search_index = TrigramIndex()
+        # app -> [item count, last-used epoch]; _apps_version bumps only when an app appears or disappears
+        self._app_stats = {}
+        self._apps_version = 0
         self._lock = threading.RLock()
         self._cleanup_thread = None
         self._cleanup_event = threading.Event()
-        self.secret_safe_enabled = True
-        self.blocklist_apps = set(BLOCKLIST_DEFAULTS)
+        # blocklist, per-app toggles and secret-safe mode are compiled into an immutable
+        # CaptureFilter; the capture path reads it without locking
+        # seeded from settings, the single source for these values
+        self._secret_safe_enabled = True
+        self._blocklist_apps = set(BLOCKLIST_DEFAULTS)
         self._app_capture_enabled = {}
+        try:
+            self._apply_secret_safe_locked(settings.get('secret_safe_mode', True))
+            self._apply_blocklist_locked(_blocklist_entries(settings.get('blocklist_apps', sorted(BLOCKLIST_DEFAULTS))))
+        except Exception:
+            pass
+        try:
+            toggles = settings.get('per_app_capture_toggle', {}) or {}
+            if isinstance(toggles, dict):
+                self._app_capture_enabled = {str(k): bool(v) for k, v in toggles.items() if k}
+        except Exception:
+            pass
+        self._filter = CaptureFilter(self._blocklist_apps, self._app_capture_enabled, True, 0)
+        self._decisions = {}
         self._change_listeners = []
         self._persistence = persistence
+        # binary payloads (images, rich text) live next to the database, or in memory without one
+        if blobs is None:
+            db_path = getattr(persistence, 'db_path', None)
+            blobs = BlobStore(os.path.join(os.path.dirname(db_path), 'blobs') if isinstance(db_path, str) else None)
+        self.blobs = blobs
+        self._blob_refs = {}
         if self._persistence:
             try:
                 self._load_from_persistence()
@@ -39,38 +97,37 @@ class HistoryStore:
                 pass
 
         try:
-            settings.register_callback(self._on_setting_changed)
+            settings.register_change_callback(self._on_settings_changed)
         except Exception:
             pass
 
     def _on_setting_changed(self, key, value):
+        self._on_settings_changed({key: value})
+
+    def _on_settings_changed(self, changes):
+        """Apply one settings change set: one filter rebuild and a single change notification."""
+        dirty = False
         try:
-            if key == 'secret_safe_mode':
-                self.set_secret_safe_enabled(bool(value))
-            if key == 'blocklist_apps':
-                # value might be list or newline string
-                if isinstance(value, (list, tuple)):
-                    entries = value
-                elif isinstance(value, str):
-                    entries = [s.strip() for s in value.split('\n') if s.strip()]
-                else:
-                    entries = []
-                self.set_blocklist(entries)
+            with self._lock:
+                if 'secret_safe_mode' in changes:
+                    dirty |= self._apply_secret_safe_locked(changes['secret_safe_mode'])
+                if 'blocklist_apps' in changes:
+                    dirty |= self._apply_blocklist_locked(_blocklist_entries(changes['blocklist_apps']))
+                toggles = changes.get('per_app_capture_toggle')
+                if isinstance(toggles, dict):
+                    dirty |= self._apply_app_capture_map_locked(toggles)
+                if dirty:
+                    self._rebuild_filter_locked()
         except Exception:
             pass
+        if dirty:
+            self._notify_change()
 
     def _load_from_persistence(self):
-        data = self._persistence.load_settings()
-        if data.get('secret_safe_enabled') in ('0', 'False', 'false', None):
-            self.secret_safe_enabled = False
-        elif data.get('secret_safe_enabled') in ('1', 'True', 'true'):
-            self.secret_safe_enabled = True
-        bl = data.get('blocklist_apps')
-        if bl:
-            try:
-                self.blocklist_apps = set(x.strip().lower() for x in bl.split('\n') if x.strip())
-            except Exception:
-                pass
+        # databases written before settings had one backend still hold secret-safe/blocklist rows
+        migrated = settings.migrate_legacy_settings(self._persistence)
+        if migrated:
+            self._on_settings_changed(migrated)
 
         items = self._persistence.load_items()
         for r in items:
@@ -91,8 +148,13 @@ class HistoryStore:
                 item.is_temporary = bool(r.get('is_temporary'))
                 item.expire_at = r.get('expire_at')
                 item.pinned = bool(r.get('pinned'))
+                item.kind = r.get('kind') or 'text'
+                item.blobs = dict(r.get('blobs') or {})
+                self._ref_blobs_locked(item, 1)
                 self.items.append(item)
                 self._items_by_id[item.id] = item
+                self._search_index.add(item.id, item.content)
+                self._count_app_locked(item.source_app, 1, self._item_epoch(item))
             except Exception:
                 pass
 
@@ -114,11 +176,84 @@ class HistoryStore:
         listeners = []
         with self._lock:
             listeners = list(self._change_listeners)
-        for cb in listeners:
-            try:
-                cb()
-            except Exception:
-                pass
+        with metrics.timer('history.notify'):
+            for cb in listeners:
+                try:
+                    cb()
+                except Exception:
+                    pass
+
+    @property
+    def secret_safe_enabled(self) -> bool:
+        return self._secret_safe_enabled
+
+    @secret_safe_enabled.setter
+    def secret_safe_enabled(self, value):
+        with self._lock:
+            self._secret_safe_enabled = bool(value)
+            self._rebuild_filter_locked()
+
+    @property
+    def blocklist_apps(self):
+        return self._blocklist_apps
+
+    @blocklist_apps.setter
+    def blocklist_apps(self, value):
+        with self._lock:
+            self._blocklist_apps = set(value)
+            self._rebuild_filter_locked()
+
+    def _rebuild_filter_locked(self):
+        self._filter = CaptureFilter(self._blocklist_apps, self._app_capture_enabled,
+                                     self._secret_safe_enabled, self._filter.version + 1)
+
+    def _capture_decision(self, app_name):
+        """Cached CaptureFilter decision for an app; entries from older filter versions are ignored."""
+        f = self._filter
+        hit = self._decisions.get(app_name)
+        if hit is not None and hit[0] == f.version:
+            return hit[1]
+        decision = f.decide(app_name)
+        if len(self._decisions) >= DECISION_CACHE_SIZE:
+            self._decisions = {}
+        self._decisions[app_name] = (f.version, decision)
+        return decision
+
+    def capture_decision(self, app_name):
+        """ALLOWED (None), DISABLED or BLOCKED for a copy from `app_name`, before anything is stored."""
+        return self._capture_decision(app_name)
+
+    def release_blobs(self, blobs):
+        """Delete blobs written for a capture that was not kept, unless an item still uses them."""
+        with self._lock:
+            for digest in set((blobs or {}).values()):
+                if digest in self._blob_refs:
+                    continue
+                try:
+                    self.blobs.delete(digest)
+                except Exception:
+                    pass
+
+    def _apply_secret_safe_locked(self, enabled) -> bool:
+        enabled = bool(enabled)
+        if enabled == self._secret_safe_enabled:
+            return False
+        self._secret_safe_enabled = enabled
+        return True
+
+    def _apply_blocklist_locked(self, entries) -> bool:
+        new = set(e.strip().lower() for e in entries if e and e.strip())
+        if new == self._blocklist_apps:
+            return False
+        self._blocklist_apps = new
+        return True
+
+    def _apply_app_capture_map_locked(self, toggles) -> bool:
+        new = {str(k): bool(v) for k, v in dict(toggles or {}).items() if k}
+        if new == self._app_capture_enabled:
+            return False
+        self._app_capture_enabled = new
+        return True
 
     def get_blocklist(self):
         """Return a sorted list copy of configured blocklist substrings."""
@@ -126,36 +261,42 @@ class HistoryStore:
             return sorted(self.blocklist_apps)
 
     def set_blocklist(self, entries):
-        """Replace blocklist with an iterable of strings."""
+        """Replace blocklist with an iterable of strings (stored in the ``blocklist_apps`` setting)."""
         with self._lock:
-            self.blocklist_apps = set(e.strip().lower() for e in entries if e and e.strip())
-        if self._persistence:
-            try:
-                self._persistence.save_setting('blocklist_apps', '\n'.join(sorted(self.blocklist_apps)))
-            except Exception:
-                pass
+            if self._apply_blocklist_locked(entries):
+                self._rebuild_filter_locked()
+            value = sorted(self._blocklist_apps)
+        settings.set_('blocklist_apps', value)
         self._notify_change()
 
     def set_app_capture_enabled(self, app_name: str, enabled: bool):
+        """Toggle capture for one app (stored in the ``per_app_capture_toggle`` setting)."""
+        if not app_name:
+            return
         with self._lock:
-            if app_name:
-                self._app_capture_enabled[app_name] = bool(enabled)
+            self._app_capture_enabled[app_name] = bool(enabled)
+            self._rebuild_filter_locked()
+            value = dict(self._app_capture_enabled)
+        settings.set_('per_app_capture_toggle', value)
         self._notify_change()
 
-    def is_app_capture_enabled(self, app_name: str) -> bool:
+    def set_app_capture_map(self, toggles):
+        """Replace all per-app capture toggles with an `{app: enabled}` mapping (stored in settings)."""
         with self._lock:
-            if not app_name:
-                return True
-            return self._app_capture_enabled.get(app_name, True)
+            if self._apply_app_capture_map_locked(toggles):
+                self._rebuild_filter_locked()
+            value = dict(self._app_capture_enabled)
+        settings.set_('per_app_capture_toggle', value)
+        self._notify_change()
+
+    def is_app_capture_enabled(self, app_name: str) -> bool:
+        return self._filter.is_enabled(app_name)
 
     def set_secret_safe_enabled(self, enabled: bool):
         with self._lock:
-            self.secret_safe_enabled = bool(enabled)
-        if self._persistence:
-            try:
-                self._persistence.save_setting('secret_safe_enabled', '1' if self.secret_safe_enabled else '0')
-            except Exception:
-                pass
+            if self._apply_secret_safe_locked(enabled):
+                self._rebuild_filter_locked()
+        settings.set_('secret_safe_mode', bool(enabled))
         self._notify_change()
 
     def get_secret_safe_enabled(self) -> bool:
@@ -178,15 +319,7 @@ class HistoryStore:
                 for it in self.items:
                     if getattr(it, 'is_temporary', False) and getattr(it, 'expire_at', None) is not None:
                         if now >= it.expire_at:
-                            try:
-                                del self._items_by_id[it.id]
-                            except Exception:
-                                pass
-                            if self._persistence:
-                                try:
-                                    self._persistence.delete_item(it.id)
-                                except Exception:
-                                    pass
+                            self._discard_item_locked(it)
                             removed = True
                             continue
                     new_items.append(it)
@@ -195,31 +328,71 @@ class HistoryStore:
             if removed:
                 self._notify_change()
 
+    def _discard_item_locked(self, it):
+        """Drop an item from the lookup structures and persistence; caller rebuilds `self.items`."""
+        try:
+            del self._items_by_id[it.id]
+        except Exception:
+            pass
+        try:
+            self._search_index.remove(it.id, it.content)
+        except Exception:
+            pass
+        self._count_app_locked(it.source_app, -1)
+        self._ref_blobs_locked(it, -1)
+        if self._persistence:
+            try:
+                self._persistence.delete_item(it.id)
+            except Exception:
+                pass
+
+    def _ref_blobs_locked(self, item, delta):
+        """Track how many items use each blob; drop a blob from the store once unused."""
+        for digest in (getattr(item, 'blobs', None) or {}).values():
+            n = self._blob_refs.get(digest, 0) + delta
+            if n > 0:
+                self._blob_refs[digest] = n
+                continue
+            self._blob_refs.pop(digest, None)
+            try:
+                self.blobs.delete(digest)
+            except Exception:
+                pass
+
+    def _count_app_locked(self, app, delta, when=None):
+        stats = self._app_stats.get(app)
+        if stats is None:
+            if delta <= 0:
+                return
+            stats = self._app_stats[app] = [0, 0.0]
+            self._apps_version += 1
+        stats[0] += delta
+        if when is not None and when > stats[1]:
+            stats[1] = when
+        if stats[0] <= 0:
+            del self._app_stats[app]
+            self._apps_version += 1
+
+    @staticmethod
+    def _item_epoch(item):
+        try:
+            return item.timestamp.timestamp()
+        except Exception:
+            return time.time()
+
     def stop_cleanup(self):
         self._cleanup_event.set()
         if self._cleanup_thread is not None:
             self._cleanup_thread.join(timeout=1.0)
 
     def _looks_like_token(self, text: str) -> bool:
+        """True when the text contains a secret (see secret_scan; bounded, stops at the first hit)."""
         if not text:
             return False
-        t = text.strip()
-        if _JWT_RE.match(t):
-            return True
-        if _LONG_BASE64_RE.match(t):
-            return True
-        return False
+        return secret_scan.contains_secret(text)
 
     def _is_blocked_app(self, app_name: str) -> bool:
-        if not app_name:
-            return False
-        if not bool(self.secret_safe_enabled):
-            return False
-        n = app_name.lower()
-        for bad in self.blocklist_apps:
-            if bad in n:
-                return True
-        return False
+        return self._filter.is_blocked(app_name)
 
     def _first_non_pinned_index(self):
         idx = 0
@@ -227,51 +400,66 @@ class HistoryStore:
             idx += 1
         return idx
 
-    def add_item(self, content, source_app="Unknown App", timestamp=None):
-        if not content:
-            return None
-
-        if not self.is_app_capture_enabled(source_app):
-            if int(os.environ.get('CLIP_DEBUG', '0') or '0') >= 2:
-                print('[clip-debug] history.add_item: capture disabled for app=%s' % (source_app,))
-            return None
-
-        if self._is_blocked_app(source_app):
-            if int(os.environ.get('CLIP_DEBUG', '0') or '0') >= 2:
-                print('[clip-debug] history.add_item: blocked app=%s (secret-safe)' % (source_app,))
-            return None
-
-        source_app = self._normalize_source_app(source_app)
-
-        h = hashlib.sha256(content.encode('utf-8')).hexdigest()
-        now = time.time()
-
-        with self._lock:
+    def _find_duplicate_locked(self, content, source_app, blobs, h, now):
+        """The existing item a copy dedupes into (global LRU, then the per-app window), or None."""
+        with metrics.timer('history.dedupe'):
             if h in self._recent_hashes:
                 for it in self.items:
-                    if it.content == content and it.source_app == source_app:
+                    if it.content == content and it.source_app == source_app and it.blobs == blobs:
                         try:
                             self._recent_hashes.move_to_end(h, last=False)
                         except Exception:
                             pass
-                        if int(os.environ.get('CLIP_DEBUG', '0') or '0') >= 2:
-                            print('[clip-debug] history.add_item: deduped per-app app=%s' % (source_app,))
+                        self._count_app_locked(source_app, 0, now)
+                        _log.debug('deduped per-app app=%s', source_app)
                         return it
-                if int(os.environ.get('CLIP_DEBUG', '0') or '0') >= 2:
-                    print('[clip-debug] history.add_item: seen content global but no per-app match; will add new item (app=%s)' % (source_app,))
+                _log.debug('seen content global but no per-app match; will add new item (app=%s)', source_app)
 
             last_seen = self._last_seen_by_app.get((source_app, h))
             if last_seen is not None and (now - last_seen) <= APP_DEDUPE_SECONDS:
                 for it in self.items:
-                    if it.content == content and it.source_app == source_app:
+                    if it.content == content and it.source_app == source_app and it.blobs == blobs:
                         self._last_seen_by_app[(source_app, h)] = now
-                        if int(os.environ.get('CLIP_DEBUG', '0') or '0') >= 2:
-                            print('[clip-debug] history.add_item: suppressed duplicate within APP_DEDUPE_SECONDS for app=%s' % (source_app,))
+                        self._count_app_locked(source_app, 0, now)
+                        _log.debug('suppressed duplicate within APP_DEDUPE_SECONDS for app=%s', source_app)
                         return it
                 self._last_seen_by_app[(source_app, h)] = now
-                if int(os.environ.get('CLIP_DEBUG', '0') or '0') >= 2:
-                    print('[clip-debug] history.add_item: recent same-app copy seen (no existing item), will add new item for app=%s' % (source_app,))
+                _log.debug('recent same-app copy seen (no existing item), will add new item for app=%s', source_app)
+            return None
+
+    def add_item(self, content, source_app="Unknown App", timestamp=None, kind='text', blobs=None):
+        """Add a copy. Non-text captures pass their `kind` and `{mime format: digest}` blobs."""
+        if not content:
+            return None
+
+        decision = self._capture_decision(source_app)
+        if decision == DISABLED:
+            metrics.incr('history.skipped')
+            _log.debug('capture disabled for app=%s', source_app)
+            return None
+
+        if decision == BLOCKED:
+            metrics.incr('history.skipped')
+            _log.debug('blocked app=%s (secret-safe)', source_app)
+            return None
 
+        source_app = self._normalize_source_app(source_app)
+
+        blobs = dict(blobs) if blobs else {}
+        with metrics.timer('history.hash'):
+            hasher = hashlib.sha256(content.encode('utf-8'))
+            for fmt in sorted(blobs):
+                hasher.update(('\0%s=%s' % (fmt, blobs[fmt])).encode('utf-8'))
+            h = hasher.hexdigest()
+        now = time.time()
+        # cached by content, so the analysis the watcher made for attribution is reused
+        analysis = content_analysis.analyze(content) if kind in ('text', 'rich') else None
+
+        with self._lock:
+            dup = self._find_duplicate_locked(content, source_app, blobs, h, now)
+            if dup is not None:
+                metrics.incr('history.deduped')
+                return dup
             is_temp = False
             expire_at = None
 
@@ -279,8 +467,9 @@ class HistoryStore:
                 is_temp = True
                 expire_at = now + TEMPORARY_TOKEN_SECONDS
 
-            item = ClipboardItem(content, source_app, is_temporary=is_temp, expire_at=expire_at)
-            pass
+            item = ClipboardItem(content, source_app, is_temporary=is_temp, expire_at=expire_at, kind=kind, blobs=blobs)
+            if analysis is not None:
+                item.analysis = analysis
 
             if timestamp is not None:
                 try:
@@ -292,8 +481,11 @@ class HistoryStore:
             self.items.insert(idx, item)
             try:
                 self._items_by_id[item.id] = item
+                self._search_index.add(item.id, content)
             except Exception:
                 pass
+            self._count_app_locked(source_app, 1, self._item_epoch(item))
+            self._ref_blobs_locked(item, 1)
 
             try:
                 if h in self._recent_hashes:
@@ -311,12 +503,13 @@ class HistoryStore:
 
             if self._persistence:
                 try:
-                    self._persistence.save_item(item)
+                    with metrics.timer('storage.save_item'):
+                        self._persistence.save_item(item)
                 except Exception:
                     pass
 
-        if int(os.environ.get('CLIP_DEBUG', '0') or '0') >= 2:
-            print('[clip-debug] history.add_item: added item id=%s app=%s preview="%s"' % (item.id, source_app, (content or '')[:80].replace('\n','\\n')))
+        metrics.incr('history.added')
+        _log.debug('added item id=%s app=%s preview=%.80r', item.id, source_app, content)
         self._notify_change()
         return item
 
@@ -326,12 +519,53 @@ class HistoryStore:
 
     def get_apps(self):
         with self._lock:
-            return sorted(set(item.source_app for item in self.items))
+            return sorted(self._app_stats)
+
+    def get_app_stats(self):
+        """Return (app, item_count, last_used_epoch) tuples, most recently used first."""
+        with self._lock:
+            stats = [(app, s[0], s[1]) for app, s in self._app_stats.items()]
+        stats.sort(key=lambda x: (-x[2], x[0]))
+        return stats
+
+    def get_apps_version(self) -> int:
+        """Counter that changes whenever an app gains its first item or loses its last one."""
+        with self._lock:
+            return self._apps_version
 
     def get_items_by_app(self, app_name):
         with self._lock:
             return [item for item in self.items if item.source_app == app_name]
 
+    def search(self, query, source_app=None):
+        """Return items containing `query` (case-insensitive), pinned first then newest first.
+
+        ``kind:<k>`` and ``lang:<l>`` terms filter by the item kind (image, files, rich) or
+        its content analysis (url, code, command, json, text; python, javascript, ...).
+        The trigram index shortlists candidates; each candidate is then verified exactly.
+        Analyses missing for the kind/lang filters are computed after the lock is released.
+        """
+        ql, kinds, langs = _split_filters((query or '').strip().lower())
+        with self._lock:
+            ids = self._search_index.candidates(ql) if ql else None
+            if ids is None:
+                pool = self.items
+            else:
+                pool = [self._items_by_id[i] for i in ids if i in self._items_by_id]
+            out = []
+            for it in pool:
+                if source_app is not None and it.source_app != source_app:
+                    continue
+                if not ql or ql in it.content.lower():
+                    out.append(it)
+        if kinds:
+            out = [it for it in out if it.kind in kinds or it.analysis.kind in kinds]
+        if langs:
+            out = [it for it in out if it.analysis.language in langs]
+        out.sort(key=lambda it: it.timestamp, reverse=True)
+        out.sort(key=lambda it: not getattr(it, 'pinned', False))
+        return out
+
     def pin_item(self, item_id):
         with self._lock:
             item = self._items_by_id.get(item_id)
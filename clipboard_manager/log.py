@@ -0,0 +1,135 @@
+"""Leveled logging for the app, one logger per subsystem.
+
+Modules log through ``get_logger('<subsystem>')`` (``clipboard_manager.<subsystem>``) with
+%-style arguments, so a disabled level costs one cached `isEnabledFor` check and nothing is
+formatted. Expensive debug payloads are built only behind ``log.isEnabledFor(DEBUG)``.
+
+`configure()` (called from main) routes every record through a `QueueHandler`; a
+`QueueListener` thread does the formatting and the writing, so the GUI and capture threads
+never block on stderr or a log file.
+
+- ``CLIP_LOG``: a default level and/or per-subsystem levels, e.g. ``info`` or
+  ``warning,watcher=debug,probes=info``. Without it ``CLIP_DEBUG=1`` means info and
+  ``CLIP_DEBUG=2`` debug for everything; the default is warning.
+- ``CLIP_LOG_FILE``: append to this file instead of stderr.
+- ``CLIP_LOG_FORMAT=json``: one JSON object per line (ts, level, subsystem, thread, msg).
+
+Subsystems: ``watcher``, ``history``, ``probes``, ``gui``, ``capture``.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Dict, Optional, Tuple
+
+ROOT = 'clipboard_manager'
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(subsystem)s [%(threadName)s] %(message)s'
+
+_listener = None
+_handler = None
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    return logging.getLogger('%s.%s' % (ROOT, subsystem))
+
+
+def parse_levels(spec: Optional[str], debug_level: int = 0) -> Tuple[int, Dict[str, int]]:
+    """(default level, {subsystem: level}) from a ``CLIP_LOG`` spec; bad entries are ignored."""
+    default = logging.DEBUG if debug_level >= 2 else logging.INFO if debug_level >= 1 else logging.WARNING
+    per = {}
+    for part in (spec or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, sep, level = part.rpartition('=')
+        value = logging.getLevelName(level.strip().upper())
+        if not isinstance(value, int):
+            continue
+        if sep and name.strip() not in ('', '*'):
+            per[name.strip()] = value
+        else:
+            default = value
+    return default, per
+
+
+class _SubsystemFilter(logging.Filter):
+    def filter(self, record):
+        name = record.name
+        record.subsystem = name[len(ROOT) + 1:] if name.startswith(ROOT + '.') else name
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # hand the record over untouched: the listener thread merges args and formats
+    def prepare(self, record):
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        out = {
+            'ts': round(record.created, 6),
+            'level': record.levelname.lower(),
+            'subsystem': getattr(record, 'subsystem', record.name),
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info:
+            out['exc'] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str)
+
+
+def configure(spec: Optional[str] = None, stream=None, path: Optional[str] = None,
+              fmt: Optional[str] = None) -> None:
+    """Apply levels and start the queue listener; arguments default to the environment."""
+    from clipboard_manager import metrics
+    shutdown()
+    spec = os.environ.get('CLIP_LOG') if spec is None else spec
+    default, per = parse_levels(spec, metrics.debug_level())
+    root = logging.getLogger(ROOT)
+    root.setLevel(default)
+    for name, existing in list(logging.root.manager.loggerDict.items()):
+        if name.startswith(ROOT + '.') and isinstance(existing, logging.Logger):
+            existing.setLevel(logging.NOTSET)
+    for name, level in per.items():
+        get_logger(name).setLevel(level)
+
+    path = path or os.environ.get('CLIP_LOG_FILE')
+    if path:
+        target = logging.FileHandler(path, encoding='utf-8')
+    else:
+        target = logging.StreamHandler(stream)
+    fmt = (fmt or os.environ.get('CLIP_LOG_FORMAT') or 'text').lower()
+    target.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+    target.addFilter(_SubsystemFilter())
+
+    global _listener, _handler
+    q = queue.SimpleQueue()
+    _handler = _QueueHandler(q)
+    root.addHandler(_handler)
+    root.propagate = False
+    _listener = logging.handlers.QueueListener(q, target, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown() -> None:
+    """Flush queued records and detach the queue handler."""
+    global _listener, _handler
+    listener, handler = _listener, _handler
+    _listener = _handler = None
+    root = logging.getLogger(ROOT)
+    if handler is not None:
+        root.removeHandler(handler)
+        root.propagate = True
+    if listener is not None:
+        listener.stop()
+        for h in listener.handlers:
+            try:
+                h.close()
+            except Exception:
+                pass
+
+
+atexit.register(shutdown)
@@ -9,15 +9,27 @@ from PyQt6.QtWidgets import QApplication
 from clipboard_manager.gui import MainWindow
 from clipboard_manager import settings
 
-try:
-    settings.load_settings()
-except Exception:
-    pass
-
 NO_GUI = os.environ.get('CLIP_NO_GUI') == '1' or '--no-gui' in sys.argv
 
 # Prefer explicit env var for DB path, otherwise fall back to settings
 DB_PATH = os.environ.get('CLIP_PERSISTENCE_DB')
+persistence = None
+
+if DB_PATH and settings.backend_name() == 'sqlite':
+    # settings live in the persistence database: open it first, then load everything from it
+    try:
+        from clipboard_manager.storage import Persistence
+        persistence = Persistence(DB_PATH)
+        settings.use_backend(settings.SqliteBackend(persistence))
+    except Exception:
+        persistence = None
+
+if persistence is None:
+    try:
+        settings.load_settings()
+    except Exception:
+        pass
+
 if not DB_PATH:
     try:
         if settings.get('persistence_enabled'):
@@ -25,19 +37,20 @@ if not DB_PATH:
     except Exception:
         DB_PATH = None
 
-if DB_PATH:
+if DB_PATH and persistence is None:
     try:
         from clipboard_manager.storage import Persistence
         persistence = Persistence(DB_PATH)
     except Exception:
         persistence = None
-else:
-    persistence = None
 
 if __name__ == '__main__':
     if NO_GUI:
         print('NO_GUI')
         sys.exit(0)
+    # CLIP_LOG / CLIP_DEBUG levels; records are written by a background listener
+    from clipboard_manager import log
+    log.configure()
     app = QApplication(sys.argv)
     if persistence:
         from clipboard_manager.history import History
@@ -46,7 +59,16 @@ if __name__ == '__main__':
     else:
         window = MainWindow()
     window.show()
+    # CLIP_METRICS_FILE: append a metrics snapshot every CLIP_METRICS_INTERVAL seconds
+    from clipboard_manager import metrics
+    metrics.start_dump()
     rc = app.exec()
+    metrics.stop_dump()
+    log.shutdown()
+    try:
+        settings.flush_pending_saves()
+    except Exception:
+        pass
     try:
         if persistence:
             persistence.close()
@@ -0,0 +1,242 @@
+"""Counters and latency histograms for the capture pipeline.
+
+Recording is off unless ``CLIP_METRICS=1`` (or ``CLIP_DEBUG`` is set); both are read once,
+so the disabled path is a flag check: `incr` and `observe` return immediately and `timer`
+hands back a shared no-op context manager.
+
+- `incr(name)` bumps a counter, `observe(name, seconds)` records a latency and
+  ``with timer(name):`` times a block.
+- Histograms use log-spaced buckets (about 19% wide from 1us up), so p50/p90/p99 cost
+  a fixed amount of memory however many samples arrive.
+- `snapshot()` returns everything as a plain dict; `start_dump(path, interval)` appends
+  one snapshot per interval to a JSON-lines file. ``CLIP_METRICS_FILE`` and
+  ``CLIP_METRICS_INTERVAL`` (seconds, default 60) start it from main.
+
+Names in use: ``probe.<method>``, ``capture.analysis``, ``capture.attribution``,
+``capture.queue_wait``, ``capture.ingest``, ``capture.latency`` (clipboard event to stored
+item), ``history.hash``, ``history.dedupe``, ``history.notify``, ``storage.save_item``,
+``ui.flush.<flag>`` and the ``history.added`` / ``history.deduped`` / ``history.skipped``
+counters.
+"""
+import json
+import math
+import os
+import threading
+import time
+from typing import Optional
+
+DUMP_INTERVAL = 60.0
+# bucket i holds samples up to BUCKET_BASE * 2 ** ((i + 1) / BUCKETS_PER_OCTAVE) seconds
+BUCKET_BASE = 1e-6
+BUCKETS_PER_OCTAVE = 4
+MAX_BUCKETS = 128
+PERCENTILES = (50, 90, 99)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_debug_level = None
+_enabled = None
+_dumper = None
+
+
+def _env_int(name: str) -> int:
+    try:
+        return int(os.environ.get(name, '0') or '0')
+    except ValueError:
+        return 0
+
+
+def debug_level() -> int:
+    """``CLIP_DEBUG`` as an int, parsed on first use and cached."""
+    global _debug_level
+    if _debug_level is None:
+        _debug_level = _env_int('CLIP_DEBUG')
+    return _debug_level
+
+
+def enabled() -> bool:
+    global _enabled
+    if _enabled is None:
+        _enabled = _env_int('CLIP_METRICS') > 0 or debug_level() > 0
+    return _enabled
+
+
+def configure(enable: Optional[bool] = None, debug: Optional[int] = None) -> None:
+    """Override the cached switches (None re-reads the environment on next use)."""
+    global _enabled, _debug_level
+    _enabled = enable
+    _debug_level = debug
+
+
+class Histogram:
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = {}
+
+    def add(self, value: float) -> None:
+        value = max(0.0, float(value))
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        if value <= BUCKET_BASE:
+            i = 0
+        else:
+            i = min(MAX_BUCKETS - 1, int(math.log2(value / BUCKET_BASE) * BUCKETS_PER_OCTAVE))
+        self.buckets[i] = self.buckets.get(i, 0) + 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound of the bucket holding the p-th percentile, clamped to the observed range."""
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(self.count * p / 100.0)))
+        seen = 0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if seen >= rank:
+                upper = BUCKET_BASE * 2 ** ((i + 1) / float(BUCKETS_PER_OCTAVE))
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        out = {'count': self.count, 'sum': self.total, 'min': self.min, 'max': self.max,
+               'mean': self.total / self.count if self.count else None}
+        for p in PERCENTILES:
+            out['p%d' % p] = self.percentile(p)
+        return out
+
+
+def incr(name: str, n: int = 1) -> None:
+    if not (_enabled if _enabled is not None else enabled()):
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def observe(name: str, seconds: float) -> None:
+    if not (_enabled if _enabled is not None else enabled()):
+        return
+    with _lock:
+        h = _histograms.get(name)
+        if h is None:
+            h = _histograms[name] = Histogram()
+        h.add(seconds)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('name', 't0')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+def timer(name: str):
+    """Context manager recording the block's duration under `name` (a no-op when disabled)."""
+    if not (_enabled if _enabled is not None else enabled()):
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {
+            'ts': time.time(),
+            'counters': dict(_counters),
+            'histograms': {name: h.summary() for name, h in _histograms.items()},
+        }
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def dump(path: str) -> None:
+    """Append the current snapshot to `path` as one JSON line."""
+    line = json.dumps(snapshot(), sort_keys=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line + '\n')
+
+
+class _Dumper:
+    def __init__(self, path: str, interval: float):
+        self.path = path
+        self.interval = max(0.05, float(interval))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='metrics-dump', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                dump(self.path)
+            except Exception:
+                pass
+
+    def stop(self, final: bool = True):
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        if final:
+            try:
+                dump(self.path)
+            except Exception:
+                pass
+
+
+def start_dump(path: Optional[str] = None, interval: Optional[float] = None) -> bool:
+    """Dump a snapshot to `path` (default ``CLIP_METRICS_FILE``) every `interval` seconds.
+
+    Returns False when no path is configured. Enables recording if it was off.
+    """
+    global _dumper, _enabled
+    path = path or os.environ.get('CLIP_METRICS_FILE')
+    if not path:
+        return False
+    if interval is None:
+        try:
+            interval = float(os.environ.get('CLIP_METRICS_INTERVAL', DUMP_INTERVAL))
+        except ValueError:
+            interval = DUMP_INTERVAL
+    stop_dump(final=False)
+    _enabled = True
+    _dumper = _Dumper(path, interval)
+    return True
+
+
+def stop_dump(final: bool = True) -> None:
+    """Stop the periodic dump, writing one last snapshot unless `final` is False."""
+    global _dumper
+    d, _dumper = _dumper, None
+    if d is not None:
+        d.stop(final)
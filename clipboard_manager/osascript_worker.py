@@ -0,0 +1,208 @@
+"""Long-lived osascript helper answering frontmost-app queries over a pipe.
+
+Spawning ``osascript`` for every probe costs a fork/exec plus interpreter start-up each
+time. The worker keeps one JavaScript-for-Automation process alive and talks to it with a
+line protocol::
+
+    request:  "<seq> frontmost\n"
+    response: "<seq> <process name>\n"   (or "<seq> !<error>\n")
+
+A helper that does not answer in time is killed and the next query starts a fresh one;
+the first query after a start also gets `START_TIMEOUT` for the helper to come up.
+
+Any executable speaking the same protocol can stand in for osascript, which is how the
+worker is exercised on Linux (see ``CLIP_OSASCRIPT_HELPER`` and the tests).
+"""
+import atexit
+import os
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Optional
+
+# seconds to wait before trying to start the helper again after it failed to launch
+RESTART_COOLDOWN = 30.0
+# extra time the first query after a start allows for the helper to launch
+START_TIMEOUT = 2.0
+
+_JXA_SCRIPT = r'''
+ObjC.import('Foundation');
+var se = Application('System Events');
+var inp = $.NSFileHandle.fileHandleWithStandardInput;
+var out = $.NSFileHandle.fileHandleWithStandardOutput;
+function reply(s) { out.writeData($(s + '\n').dataUsingEncoding($.NSUTF8StringEncoding)); }
+var buf = '';
+while (true) {
+    var data = inp.availableData;
+    if (data.length === 0) { break; }
+    buf += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+    var nl;
+    while ((nl = buf.indexOf('\n')) >= 0) {
+        var seq = buf.slice(0, nl).split(' ')[0];
+        buf = buf.slice(nl + 1);
+        try {
+            reply(seq + ' ' + se.processes.whose({frontmost: true})[0].name());
+        } catch (e) {
+            reply(seq + ' !' + String(e).replace(/\n/g, ' '));
+        }
+    }
+}
+'''
+
+
+class OsascriptUnavailable(RuntimeError):
+    """The helper process could not be started (e.g. osascript is missing)."""
+
+
+class OsascriptError(RuntimeError):
+    """The helper answered with an error or exited mid-query."""
+
+
+class OsascriptTimeout(OsascriptError):
+    """The helper did not answer in time; it has been killed."""
+
+
+def default_command() -> Optional[List[str]]:
+    override = os.environ.get('CLIP_OSASCRIPT_HELPER')
+    if override:
+        return shlex.split(override)
+    if sys.platform != 'darwin':
+        return None
+    return ['osascript', '-l', 'JavaScript', '-e', _JXA_SCRIPT]
+
+
+class OsascriptWorker:
+    def __init__(self, cmd: Optional[List[str]] = None, restart_cooldown: float = RESTART_COOLDOWN,
+                 start_timeout: float = START_TIMEOUT):
+        self.cmd = list(cmd) if cmd else default_command()
+        self.restart_cooldown = float(restart_cooldown)
+        self.start_timeout = float(start_timeout)
+        self._proc = None
+        self._answered = False
+        self._reader = None
+        self._responses = queue.Queue()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._failed_until = 0.0
+        self.starts = 0
+
+    def is_alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _start_locked(self):
+        if self.is_alive():
+            return
+        if not self.cmd:
+            raise OsascriptUnavailable('no helper command for this platform')
+        if time.time() < self._failed_until:
+            raise OsascriptUnavailable('helper failed to start recently')
+        self._stop_locked()
+        try:
+            proc = subprocess.Popen(self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, text=True, bufsize=1)
+        except Exception as exc:
+            self._failed_until = time.time() + self.restart_cooldown
+            raise OsascriptUnavailable(str(exc))
+        self._proc = proc
+        self._answered = False
+        self._responses = queue.Queue()
+        self._reader = threading.Thread(target=self._read_loop, args=(proc, self._responses), daemon=True)
+        self._reader.start()
+        self.starts += 1
+
+    @staticmethod
+    def _read_loop(proc, responses):
+        try:
+            for line in proc.stdout:
+                seq, _, payload = line.rstrip('\n').partition(' ')
+                try:
+                    responses.put((int(seq), payload))
+                except ValueError:
+                    continue
+        except Exception:
+            pass
+        responses.put((None, None))
+
+    def query(self, timeout: float = 0.6) -> Optional[str]:
+        """Return the frontmost process name, or None when the helper has no answer.
+
+        Raises OsascriptTimeout when the helper does not answer in time (it is killed, and
+        the next query starts a fresh one), OsascriptError for an error reply or a helper
+        that exited, and OsascriptUnavailable when the helper cannot be (re)started.
+        """
+        with self._lock:
+            self._start_locked()
+            self._seq += 1
+            seq = self._seq
+            try:
+                self._proc.stdin.write('%d frontmost\n' % seq)
+                self._proc.stdin.flush()
+            except Exception as exc:
+                self._stop_locked()
+                raise OsascriptError('helper pipe closed: %s' % exc)
+            starting = not self._answered
+            deadline = time.monotonic() + float(timeout) + (self.start_timeout if starting else 0.0)
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        raise queue.Empty
+                    got, payload = self._responses.get(timeout=remaining)
+                except queue.Empty:
+                    self._stop_locked()
+                    if starting:
+                        # never answered at all: don't pay the start-up wait on every probe
+                        self._failed_until = time.time() + self.restart_cooldown
+                    raise OsascriptTimeout('no answer within %.2fs' % timeout)
+                if got is None:
+                    # helper exited; the next query starts a fresh one
+                    self._stop_locked()
+                    raise OsascriptError('helper exited')
+                if got != seq:
+                    continue
+                self._answered = True
+                if payload.startswith('!'):
+                    raise OsascriptError(payload[1:].strip())
+                return payload.strip() or None
+
+    def _stop_locked(self):
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            proc.terminate()
+            proc.wait(timeout=1.0)
+        except Exception:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+
+    def close(self):
+        with self._lock:
+            self._stop_locked()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> Optional[OsascriptWorker]:
+    """Return the shared worker, or None when disabled (CLIP_OSASCRIPT_WORKER=0) or unsupported."""
+    global _worker
+    if os.environ.get('CLIP_OSASCRIPT_WORKER', '1') == '0':
+        return None
+    with _worker_lock:
+        if _worker is None:
+            if default_command() is None:
+                return None
+            _worker = OsascriptWorker()
+            atexit.register(_worker.close)
+        return _worker
@@ -0,0 +1,184 @@
+"""Frontmost-app probe backends.
+
+`get_frontmost_app()` and the debugging helpers in utils ask the active backend for raw
+probe results instead of calling AppKit/AX/osascript directly. The live backend talks to
+the OS; the replay backend answers from a recorded `timeline_probes()` trace on a virtual
+clock, so attribution can be measured deterministically on any platform.
+"""
+import bisect
+import json
+import subprocess
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+PROBE_KEYS = ('osascript', 'appkit', 'ax', 'mouse_window_owner')
+
+
+class ProbeBackend:
+    """Interface for frontmost-app probes. Probe methods return a name or None."""
+
+    name = 'base'
+
+    def has_pyobjc(self) -> bool:
+        return False
+
+    def ax_trusted(self) -> bool:
+        return False
+
+    def appkit(self) -> Optional[str]:
+        return None
+
+    def ax(self) -> Optional[str]:
+        return None
+
+    def osascript(self, timeout: float) -> Optional[str]:
+        """May raise subprocess.TimeoutExpired or another exception when osascript fails."""
+        return None
+
+    def mouse_window_owner(self) -> Optional[str]:
+        return None
+
+    def window_owner_by_content(self, snippet: str) -> Optional[str]:
+        return None
+
+    def now(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+class LiveProbeBackend(ProbeBackend):
+    """Probes the running system through the helpers in utils (looked up at call time)."""
+
+    name = 'live'
+
+    def has_pyobjc(self) -> bool:
+        from clipboard_manager import utils
+        return utils._try_load_pyobjc()
+
+    def ax_trusted(self) -> bool:
+        from clipboard_manager import utils
+        return utils.is_ax_trusted()
+
+    def appkit(self) -> Optional[str]:
+        from clipboard_manager import utils
+        return utils._get_app_from_appkit()
+
+    def ax(self) -> Optional[str]:
+        from clipboard_manager import utils
+        return utils._get_app_from_ax()
+
+    def osascript(self, timeout: float) -> Optional[str]:
+        from clipboard_manager import utils
+        return utils._osascript_frontmost(timeout)
+
+    def mouse_window_owner(self) -> Optional[str]:
+        from clipboard_manager import utils
+        return utils._get_app_from_mouse_window()
+
+    def window_owner_by_content(self, snippet: str) -> Optional[str]:
+        from clipboard_manager import utils
+        return utils.find_window_owner_by_content(snippet)
+
+
+def _parse_ts(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+
+class ReplayProbeBackend(ProbeBackend):
+    """Answers probes from a recorded trace on a virtual clock.
+
+    `trace` is a list of `timeline_probes()` dicts (`ts` as ISO string or epoch float plus
+    one key per probe). A probe returns the value of the latest record at or before the
+    virtual clock. `latency` maps probe keys to simulated seconds per call, which advance
+    the clock like `sleep()` does. Recorded values of "!timeout" and "!error" make the
+    osascript probe raise, mimicking a hung or missing osascript.
+    """
+
+    name = 'replay'
+
+    def __init__(self, trace: List[dict], latency: Optional[Dict[str, float]] = None, start: Optional[float] = None):
+        records = sorted(((_parse_ts(r['ts']), r) for r in trace), key=lambda p: p[0])
+        self._times = [t for t, _ in records]
+        self._records = [r for _, r in records]
+        self.latency = dict(latency or {})
+        self.calls = {k: 0 for k in PROBE_KEYS}
+        self._clock = start if start is not None else (self._times[0] if self._times else 0.0)
+        self._pyobjc = any(r.get('appkit') or r.get('ax') for r in self._records)
+        self._ax = any(r.get('ax') for r in self._records)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'ReplayProbeBackend':
+        """Load a trace saved as a JSON list or as JSON lines."""
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = f.read()
+        try:
+            trace = json.loads(raw)
+        except ValueError:
+            trace = [json.loads(line) for line in raw.splitlines() if line.strip()]
+        return cls(trace, **kwargs)
+
+    def seek(self, ts: float) -> None:
+        self._clock = float(ts)
+
+    def now(self) -> float:
+        return self._clock
+
+    def sleep(self, seconds: float) -> None:
+        self._clock += max(0.0, float(seconds))
+
+    def record_at(self, ts: float) -> Optional[dict]:
+        i = bisect.bisect_right(self._times, ts) - 1
+        return self._records[i] if i >= 0 else None
+
+    def _probe(self, key: str) -> Optional[str]:
+        self.calls[key] += 1
+        rec = self.record_at(self._clock)
+        self._clock += self.latency.get(key, 0.0)
+        return rec.get(key) if rec else None
+
+    def has_pyobjc(self) -> bool:
+        return self._pyobjc
+
+    def ax_trusted(self) -> bool:
+        return self._ax
+
+    def appkit(self) -> Optional[str]:
+        return self._probe('appkit')
+
+    def ax(self) -> Optional[str]:
+        return self._probe('ax')
+
+    def osascript(self, timeout: float) -> Optional[str]:
+        val = self._probe('osascript')
+        if val == '!timeout':
+            raise subprocess.TimeoutExpired('osascript', timeout)
+        if val == '!error':
+            raise RuntimeError('osascript unavailable')
+        return val
+
+    def mouse_window_owner(self) -> Optional[str]:
+        return self._probe('mouse_window_owner')
+
+    def window_owner_by_content(self, snippet: str) -> Optional[str]:
+        return None
+
+
+_live = LiveProbeBackend()
+_backend = None
+
+
+def get_backend() -> ProbeBackend:
+    return _backend if _backend is not None else _live
+
+
+def set_backend(backend: Optional[ProbeBackend]) -> ProbeBackend:
+    """Install `backend` (None restores the live one) and return the previous backend."""
+    global _backend
+    prev = get_backend()
+    _backend = backend
+    return prev
@@ -0,0 +1,93 @@
+from typing import Dict, Iterable, Optional, Set
+
+# Only the first INDEX_MAX_CHARS characters of an item are broken into trigrams.
+# Longer items are tracked separately and always verified by a direct scan, so
+# the index stays bounded no matter how large individual clips get.
+INDEX_MAX_CHARS = 4096
+
+
+def trigrams(text: str) -> Set[str]:
+    if not text or len(text) < 3:
+        return set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Incremental lowercase trigram -> item id index used to shortlist substring matches."""
+
+    def __init__(self, max_chars: int = INDEX_MAX_CHARS):
+        self.max_chars = int(max_chars)
+        self._postings: Dict[str, Set[str]] = {}
+        self._ids: Set[str] = set()
+        self._overflow: Set[str] = set()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, item_id):
+        return item_id in self._ids
+
+    def add(self, item_id: str, text: str) -> None:
+        if item_id in self._ids:
+            return
+        self._ids.add(item_id)
+        text = text or ''
+        if len(text) > self.max_chars:
+            self._overflow.add(item_id)
+            return
+        for g in trigrams(text.lower()):
+            ids = self._postings.get(g)
+            if ids is None:
+                self._postings[g] = {item_id}
+            else:
+                ids.add(item_id)
+
+    def remove(self, item_id: str, text: str) -> None:
+        if item_id not in self._ids:
+            return
+        self._ids.discard(item_id)
+        if item_id in self._overflow:
+            self._overflow.discard(item_id)
+            return
+        for g in trigrams((text or '').lower()):
+            ids = self._postings.get(g)
+            if ids is None:
+                continue
+            ids.discard(item_id)
+            if not ids:
+                del self._postings[g]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._ids.clear()
+        self._overflow.clear()
+
+    def candidates(self, query: str) -> Optional[Set[str]]:
+        """Return ids that may contain `query`, or None when the index cannot narrow the search.
+
+        Candidates still need exact verification; items longer than `max_chars` are always included.
+        """
+        q = (query or '').lower()
+        grams = trigrams(q)
+        if not grams:
+            return None
+        postings = []
+        for g in grams:
+            ids = self._postings.get(g)
+            if not ids:
+                return set(self._overflow)
+            postings.append(ids)
+        postings.sort(key=len)
+        result = set(postings[0])
+        for ids in postings[1:]:
+            result &= ids
+            if not result:
+                break
+        if self._overflow:
+            result |= self._overflow
+        return result
+
+    def rebuild(self, pairs: Iterable) -> None:
+        self.clear()
+        for item_id, text in pairs:
+            self.add(item_id, text)
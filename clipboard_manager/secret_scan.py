@@ -0,0 +1,238 @@
+"""Secret and token detection over clipboard text.
+
+Scanning is two-stage so ordinary text costs little:
+
+1. A single character-class regex finds candidate runs (20+ characters of the
+   base64/URL-safe alphabet, plus ``.`` for JWTs). Prose and code are mostly skipped at
+   C speed here.
+2. Each candidate run is matched against the compiled token patterns (one alternation
+   with a named group per kind), then its remaining base64 stretches are checked for
+   entropy. PEM private-key blocks are found by their own regex, which the engine
+   anchors on its literal ``-----BEGIN`` prefix.
+
+The text is processed in `CHUNK_SIZE` chunks that overlap by `CHUNK_OVERLAP` characters,
+so a secret straddling a boundary is still seen whole. Scanning stops after `max_scan`
+characters (``CLIP_SECRET_SCAN_MAX``, default 1 MiB) and, for `contains_secret`, after the
+first chunk with a hit.
+
+Results are `SecretSpan`s (kind, start, end), so callers can redact rather than only
+flag. Kinds:
+
+- ``aws_access_key``, ``aws_secret_key``, ``github_token``, ``slack_token``, ``jwt``,
+  ``private_key`` (PEM block)
+- ``high_entropy``: a 32+ character base64 run mixing upper case, lower case and digits
+  with high Shannon entropy. ``/`` ends a run, so paths and URLs are judged segment by
+  segment. Public data is skipped: line-wrapped base64 (three or more lines of one width,
+  e.g. a certificate, an attachment or an embedded image), URL query values, ``shaNNN-``
+  integrity hashes and SSH public keys
+- ``opaque_token``: the whole (short) text is a single 40+ character base64url token
+"""
+import math
+import os
+import re
+from collections import Counter
+from typing import Iterator, List, Optional
+
+CHUNK_SIZE = 64 * 1024
+# longest secret guaranteed to be found across a chunk boundary (PEM keys included)
+CHUNK_OVERLAP = 8 * 1024
+DEFAULT_MAX_SCAN = 1024 * 1024
+
+# candidate runs longer than this are data (e.g. an embedded base64 image), not secrets
+MAX_TOKEN_LEN = 4096
+# the whole-text opaque-token check only applies to texts up to this long
+OPAQUE_MAX_LEN = 4096
+HIGH_ENTROPY_MIN_LEN = 32
+HIGH_ENTROPY_BITS = 4.5
+
+_RUN_CHARS = r'A-Za-z0-9+/=_.-'
+_CANDIDATE_RE = re.compile(r'[%s]{20,}' % _RUN_CHARS)
+_TOKEN_RE = re.compile('|'.join('(?P<%s>%s)' % kv for kv in (
+    ('aws_access_key', r'\b(?:AKIA|ASIA|AGPA|AIDA|AROA|ANPA|ANVA|AIPA)[0-9A-Z]{16}\b'),
+    ('github_token', r'\b(?:gh[pousr]_[A-Za-z0-9]{36,255}|github_pat_[A-Za-z0-9_]{22,255})\b'),
+    ('slack_token', r'\bxox[abposr]-[A-Za-z0-9-]{10,250}'),
+    ('jwt', r'\beyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]*'),
+)))
+# base64 runs; '=' only as trailing padding so "KEY=value" splits at the '=', and '/' ends
+# a run so path and URL segments are judged one at a time
+_ENTROPY_RE = re.compile(r'(?<![A-Za-z0-9+_-])[A-Za-z0-9+_-]{%d,}={0,2}' % HIGH_ENTROPY_MIN_LEN)
+# an AWS secret access key is 40 base64 characters, '/' included; only reported after its label
+_AWS_SECRET_RE = re.compile(r'(?<![A-Za-z0-9+/])[A-Za-z0-9+/]{40}(?![A-Za-z0-9+/=])')
+_PEM_RE = re.compile(r'-----BEGIN (?:[A-Z0-9]+ )*PRIVATE KEY(?: BLOCK)?-----[\s\S]{16,7000}?'
+                     r'-----END (?:[A-Z0-9]+ )*PRIVATE KEY(?: BLOCK)?-----')
+# a 40-character high-entropy value right after this label is an AWS secret access key
+_AWS_SECRET_LABEL = re.compile(r'(?i)aws_?secret_?access_?key["\']?\s*[:=]\s*["\']?$')
+# candidate line-wrapped base64 blocks; _wrapped_blocks checks the line widths
+_WRAPPED_RE = re.compile(r'^(?:[A-Za-z0-9+/_-]{%d,}={0,2}[ \t]*\r?\n){2,}[A-Za-z0-9+/_-]*={0,2}' % HIGH_ENTROPY_MIN_LEN,
+                         re.MULTILINE)
+# runs that carry public data rather than secrets: a URL query value (the run starts right
+# after '?' or '&'), an integrity hash ("sha512-...") or the body of an SSH public key
+_QUERY_PREFIX = frozenset('?&')
+_INTEGRITY_RE = re.compile(r'sha(?:1|224|256|384|512)-')
+_SSH_KEY_PREFIX_RE = re.compile(r'\b(?:ssh|ecdsa-sha2|sk-ssh|sk-ecdsa-sha2)-[A-Za-z0-9@.-]+[ \t]+$')
+_OPAQUE_RE = re.compile(r'[A-Za-z0-9_-]{40,}')
+_RUN_CHAR_SET = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=_.-')
+
+
+class SecretSpan:
+    __slots__ = ('kind', 'start', 'end')
+
+    def __init__(self, kind: str, start: int, end: int):
+        self.kind = kind
+        self.start = start
+        self.end = end
+
+    def __eq__(self, other):
+        return isinstance(other, SecretSpan) and (self.kind, self.start, self.end) == (other.kind, other.start, other.end)
+
+    def __repr__(self):
+        return 'SecretSpan(%r, %d, %d)' % (self.kind, self.start, self.end)
+
+
+def max_scan_length() -> int:
+    try:
+        return int(os.environ.get('CLIP_SECRET_SCAN_MAX', str(DEFAULT_MAX_SCAN)))
+    except Exception:
+        return DEFAULT_MAX_SCAN
+
+
+def shannon_entropy(s: str) -> float:
+    if not s:
+        return 0.0
+    n = float(len(s))
+    return -sum((c / n) * math.log2(c / n) for c in Counter(s).values())
+
+
+def _is_high_entropy(token: str) -> bool:
+    t = token.rstrip('=')
+    if len(t) < HIGH_ENTROPY_MIN_LEN:
+        return False
+    if not (any(c.isdigit() for c in t) and any(c.islower() for c in t) and any(c.isupper() for c in t)):
+        return False
+    return shannon_entropy(t) >= HIGH_ENTROPY_BITS
+
+
+def _is_public_data(text: str, s: int) -> bool:
+    """True for a candidate run at `s` that is a URL query value, integrity hash or SSH public key."""
+    if s and text[s - 1] in _QUERY_PREFIX:
+        return True
+    if _INTEGRITY_RE.match(text, s):
+        return True
+    return _SSH_KEY_PREFIX_RE.search(text, max(0, s - 64), s) is not None
+
+
+def _wrapped_blocks(text: str, pos: int, end: int) -> List[tuple]:
+    """(start, end) of line-wrapped base64 blocks in text[pos:end]: 3+ lines of one width plus an optional shorter last line."""
+    blocks = []
+    for m in _WRAPPED_RE.finditer(text, pos, end):
+        lines = m.group().split('\n')
+        width = len(lines[0].rstrip())
+        n = 1
+        while n < len(lines) and len(lines[n].rstrip()) == width:
+            n += 1
+        if n < 3:
+            continue
+        # the last line of a wrapped block is usually shorter
+        if n < len(lines) and 0 < len(lines[n].rstrip()) < width:
+            n += 1
+        blocks.append((m.start(), m.start() + len('\n'.join(lines[:n]))))
+    return blocks
+
+
+def _chunk_spans(text: str, pos: int, chunk_end: int, window_end: int) -> List[SecretSpan]:
+    """Secrets starting in [pos, chunk_end); matches may extend up to window_end."""
+    spans = []
+    for m in _PEM_RE.finditer(text, pos, window_end):
+        if m.start() >= chunk_end:
+            break
+        spans.append(SecretSpan('private_key', m.start(), m.end()))
+    pem = list(spans)
+    wrapped = None
+    for run in _CANDIDATE_RE.finditer(text, pos, window_end):
+        s, e = run.span()
+        if s >= chunk_end:
+            break
+        if e - s > MAX_TOKEN_LEN:
+            continue
+        if s == pos and pos > 0 and text[pos - 1] in _RUN_CHAR_SET:
+            # tail of a run the previous chunk already looked at
+            continue
+        if any(p.start <= s < p.end for p in pem):
+            continue
+        found = [SecretSpan(m.lastgroup, m.start(), m.end()) for m in _TOKEN_RE.finditer(text, s, e)]
+        if e - s >= HIGH_ENTROPY_MIN_LEN:
+            if wrapped is None:
+                # looked for once per chunk, and only when a run is long enough to matter
+                wrapped = _wrapped_blocks(text, pos, window_end)
+            if wrapped and any(b0 <= s < b1 for b0, b1 in wrapped) or _is_public_data(text, s):
+                spans.extend(found)
+                continue
+        if e - s >= 40:
+            for m in _AWS_SECRET_RE.finditer(text, s, e):
+                if (_is_high_entropy(m.group())
+                        and _AWS_SECRET_LABEL.search(text, max(0, m.start() - 64), m.start())
+                        and not any(f.start < m.end() and m.start() < f.end for f in found)):
+                    found.append(SecretSpan('aws_secret_key', m.start(), m.end()))
+        for m in _ENTROPY_RE.finditer(text, s, e):
+            if any(f.start < m.end() and m.start() < f.end for f in found):
+                continue
+            if _is_high_entropy(m.group()):
+                found.append(SecretSpan('high_entropy', m.start(), m.end()))
+        if len(found) > 1:
+            found.sort(key=lambda sp: sp.start)
+        spans.extend(found)
+    if pem:
+        spans.sort(key=lambda sp: sp.start)
+    return spans
+
+
+def iter_secrets(text: str, max_scan: Optional[int] = None) -> Iterator[SecretSpan]:
+    """Yield secret spans in order of position, scanning at most `max_scan` characters."""
+    if not text:
+        return
+    limit = min(len(text), max_scan_length() if max_scan is None else max_scan)
+    if limit <= 0:
+        return
+    if len(text) <= min(limit, OPAQUE_MAX_LEN):
+        token = text.strip()
+        if _OPAQUE_RE.fullmatch(token):
+            start = text.index(token)
+            yield SecretSpan('opaque_token', start, start + len(token))
+            return
+    pos = 0
+    while pos < limit:
+        chunk_end = min(limit, pos + CHUNK_SIZE)
+        last_end = chunk_end
+        for span in _chunk_spans(text, pos, chunk_end, min(limit, chunk_end + CHUNK_OVERLAP)):
+            last_end = max(last_end, span.end)
+            yield span
+        pos = last_end
+
+
+def scan(text: str, max_scan: Optional[int] = None) -> List[SecretSpan]:
+    return list(iter_secrets(text, max_scan))
+
+
+def contains_secret(text: str, max_scan: Optional[int] = None) -> bool:
+    """True as soon as a secret is found."""
+    for _span in iter_secrets(text, max_scan):
+        return True
+    return False
+
+
+def redact(text: str, spans: Optional[List[SecretSpan]] = None, mask: str = '[REDACTED:{kind}]') -> str:
+    """Replace each secret span with `mask` (``{kind}`` is filled in)."""
+    if spans is None:
+        spans = scan(text)
+    if not spans:
+        return text
+    out = []
+    pos = 0
+    for span in sorted(spans, key=lambda s: s.start):
+        if span.start < pos:
+            continue
+        out.append(text[pos:span.start])
+        out.append(mask.format(kind=span.kind))
+        pos = span.end
+    out.append(text[pos:])
+    return ''.join(out)
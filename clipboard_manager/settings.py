@@ -1,7 +1,12 @@
+import atexit
 import json
 import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional
 
 DEFAULTS = {
     "version": 1,
@@ -14,15 +19,26 @@ DEFAULTS = {
     "dedupe_strategy": "lru",
     "dedupe_lru_size": 200,
     "dedupe_per_app_window_s": 30,
-    "blocklist_apps": ["1password", "bitwarden", "lastpass", "authenticator", "keychain"],
+    "blocklist_apps": ["1password", "1password 8", "authenticator", "authy", "bitwarden", "dashlane",
+                       "google authenticator", "keepass", "keepassxc", "keychain", "lastpass",
+                       "password manager"],
     "per_app_capture_toggle": {},
+    "capture_queue_size": 64,
+    "capture_overflow_policy": "drop_oldest",
+    "app_aliases": {},
+    "app_categories": {},
     "pause_indicator_enabled": True,
     "debug_level": 0,
 }
 
 _callbacks = []
+_change_callbacks = []
 _settings: Dict[str, Any] = {}
-_save_timer = None
+_lock = threading.RLock()
+_local = threading.local()
+# path -> JSON text last written there, so unchanged settings are not rewritten
+_last_saved: Dict[str, str] = {}
+_MISSING = object()
 
 
 def get_config_dir(app_name: str = "CopyPasteTool") -> Path:
@@ -40,83 +56,417 @@ def get_config_path(app_name: str = "CopyPasteTool") -> Path:
     return get_config_dir(app_name) / "settings.json"
 
 
-def _do_save(path: Path):
-    tmp = path.with_suffix(".tmp")
+def _fsync_dir(path: Path):
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
     try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class JsonBackend:
+    """settings.json in the config directory, written atomically."""
+
+    name = "json"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def __eq__(self, other):
+        return isinstance(other, JsonBackend) and other.path == self.path
+
+    def __hash__(self):
+        return hash((self.name, str(self.path)))
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not self.path.exists():
+            return None
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                loaded = json.load(f)
+            return loaded if isinstance(loaded, dict) else None
+        except Exception:
+            try:
+                backup = self.path.with_suffix('.broken.json')
+                self.path.replace(backup)
+            except Exception:
+                pass
+            return None
+
+    def save(self, data: Dict[str, Any]) -> None:
+        """Temp file, fsync, rename, fsync the directory; skipped when nothing changed."""
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+        key = str(self.path)
+        if _last_saved.get(key) == text and self.path.exists():
+            return
+        tmp = self.path.with_suffix(".tmp")
         with tmp.open("w", encoding="utf-8") as f:
-            json.dump(_settings or DEFAULTS, f, indent=2, ensure_ascii=False)
-        tmp.replace(path)
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self.path)
+        _fsync_dir(self.path.parent)
+        _last_saved[key] = text
+
+
+class SqliteBackend:
+    """The ``settings`` table of a `storage.Persistence` database, one JSON value per key.
+
+    Only keys whose value changed since the last load/save are written, in one transaction.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, persistence):
+        self.persistence = persistence
+        self._written: Dict[str, str] = {}
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        migrate_legacy_settings(self.persistence, apply=False)
+        data = {}
+        self._written = {}
+        for key, raw in self.persistence.load_settings().items():
+            try:
+                data[key] = json.loads(raw)
+            except Exception:
+                continue
+            self._written[key] = raw
+        return data or None
+
+    def save(self, data: Dict[str, Any]) -> None:
+        rows = {k: json.dumps(v, sort_keys=True, ensure_ascii=False) for k, v in data.items()}
+        changed = {k: v for k, v in rows.items() if self._written.get(k) != v}
+        removed = [k for k in self._written if k not in rows]
+        if changed or removed:
+            self.persistence.save_settings(changed, removed)
+        self._written = rows
+
+
+BACKENDS = ("json", "sqlite")
+_backend = None
+
+
+def backend_name() -> str:
+    """Backend requested through ``CLIP_SETTINGS_BACKEND`` (``json``, the default, or ``sqlite``)."""
+    name = os.environ.get("CLIP_SETTINGS_BACKEND", "json").strip().lower()
+    return name if name in BACKENDS else "json"
+
+
+def _backend_for(app_name: str):
+    return _backend if _backend is not None else JsonBackend(get_config_path(app_name))
+
+
+def _do_save(backend):
+    with _lock:
+        data = dict(_settings or DEFAULTS)
+    try:
+        backend.save(data)
     except Exception:
         pass
 
 
 def save_settings(app_name: str = "CopyPasteTool") -> None:
-    """Immediately write settings to disk."""
-    path = get_config_path(app_name)
-    _do_save(path)
+    """Immediately write settings to the active backend."""
+    backend = _backend_for(app_name)
+    _saver.cancel(backend)
+    _do_save(backend)
+
+
+class _DebouncedSaver:
+    """One background thread that saves each scheduled backend once its deadline passes."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._due: Dict[Any, float] = {}
+        self._thread = None
+
+    def schedule(self, backend, delay: float):
+        with self._cond:
+            self._due[backend] = time.monotonic() + max(0.0, float(delay))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="settings-saver", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self, backend):
+        with self._cond:
+            self._due.pop(backend, None)
+
+    def pending(self) -> bool:
+        with self._cond:
+            return bool(self._due)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._due:
+                        # stay around briefly for the next call, then let the thread go
+                        if not self._cond.wait(timeout=5.0) and not self._due:
+                            self._thread = None
+                            return
+                        continue
+                    backend, deadline = min(self._due.items(), key=lambda kv: kv[1])
+                    wait = deadline - time.monotonic()
+                    if wait <= 0:
+                        del self._due[backend]
+                        break
+                    self._cond.wait(timeout=wait)
+            _do_save(backend)
+
+    def flush(self):
+        """Write everything still pending right away."""
+        with self._cond:
+            due, self._due = list(self._due), {}
+        for backend in due:
+            _do_save(backend)
+
+
+_saver = _DebouncedSaver()
+atexit.register(_saver.flush)
 
 
 def save_debounced(delay: float = 0.5, app_name: str = "CopyPasteTool") -> None:
-    """Schedule a debounced save after `delay` seconds. Multiple calls reset the timer."""
-    global _save_timer
+    """Schedule a debounced save after `delay` seconds. Multiple calls push the deadline back."""
     try:
-        if _save_timer is not None:
-            try:
-                _save_timer.cancel()
-            except Exception:
-                pass
-        path = get_config_path(app_name)
-        import threading
-        _save_timer = threading.Timer(delay, _do_save, args=(path,))
-        _save_timer.daemon = True
-        _save_timer.start()
+        _saver.schedule(_backend_for(app_name), delay)
     except Exception:
         save_settings(app_name)
 
 
+def flush_pending_saves() -> None:
+    _saver.flush()
+
+
 def get(key: str, default: Any = None) -> Any:
     return _settings.get(key, DEFAULTS.get(key, default))
 
 
+def _changed(old, new) -> bool:
+    if old is _MISSING:
+        return True
+    if old is new:
+        # the same container object may have been edited in place
+        return isinstance(new, (dict, list, set))
+    return old != new
+
+
+def _pending() -> Optional[dict]:
+    """The current thread's open batch: {key: original value}, or None outside a batch."""
+    return getattr(_local, "batch", None)
+
+
 def set_(key: str, value: Any) -> None:
-    _settings[key] = value
-    for cb in list(_callbacks):
+    """Set a value. Callbacks run now, or once when the enclosing batch() commits."""
+    with _lock:
+        old = _settings.get(key, _MISSING)
+        _settings[key] = value
+    pending = _pending()
+    if pending is not None:
+        pending.setdefault(key, old)
+        return
+    if not _changed(old, value):
+        return
+    _dispatch({key: value})
+
+
+@contextmanager
+def batch():
+    """Group several set_() calls into one change set.
+
+    Callbacks run once when the outermost batch exits, only for keys whose value actually
+    changed. If the block raises, its changes are rolled back and nobody is notified.
+    Batches are per thread.
+    """
+    outer = _pending() is None
+    if outer:
+        _local.batch = {}
+    try:
+        yield
+    except BaseException:
+        if outer:
+            originals, _local.batch = _local.batch, None
+            with _lock:
+                for key, old in originals.items():
+                    if old is _MISSING:
+                        _settings.pop(key, None)
+                    else:
+                        _settings[key] = old
+        raise
+    if outer:
+        originals, _local.batch = _local.batch, None
+        with _lock:
+            changes = {}
+            for key, old in originals.items():
+                new = _settings.get(key, _MISSING)
+                if new is not _MISSING and _changed(old, new):
+                    changes[key] = new
+        if changes:
+            _dispatch(changes)
+
+
+def _dispatch(changes: Dict[str, Any]) -> None:
+    for cb in _live(_change_callbacks):
         try:
-            cb(key, value)
+            cb(dict(changes))
         except Exception:
             pass
+    for cb in _live(_callbacks):
+        for key, value in changes.items():
+            try:
+                cb(key, value)
+            except Exception:
+                pass
+
+
+def _ref(cb):
+    # bound methods are held weakly so a discarded HistoryStore/watcher stops receiving changes
+    if hasattr(cb, "__self__") and hasattr(cb, "__func__"):
+        return weakref.WeakMethod(cb)
+    return lambda: cb
+
+
+def _live(registry):
+    with _lock:
+        refs = list(registry)
+    out = []
+    for ref in refs:
+        cb = ref()
+        if cb is None:
+            with _lock:
+                try:
+                    registry.remove(ref)
+                except ValueError:
+                    pass
+            continue
+        out.append(cb)
+    return out
+
+
+def _register(registry, cb):
+    with _lock:
+        if cb not in [r() for r in registry]:
+            registry.append(_ref(cb))
+
+
+def _unregister(registry, cb):
+    with _lock:
+        for ref in list(registry):
+            if ref() == cb:
+                registry.remove(ref)
 
 
 def register_callback(cb: Callable[[str, Any], None]) -> None:
-    if cb not in _callbacks:
-        _callbacks.append(cb)
+    """Call `cb(key, value)` for each changed key."""
+    _register(_callbacks, cb)
 
 
 def unregister_callback(cb: Callable[[str, Any], None]) -> None:
-    try:
-        _callbacks.remove(cb)
-    except ValueError:
-        pass
+    _unregister(_callbacks, cb)
+
+
+def register_change_callback(cb: Callable[[Dict[str, Any]], None]) -> None:
+    """Call `cb(changes)` once per set_() or committed batch with every changed key."""
+    _register(_change_callbacks, cb)
+
+
+def unregister_change_callback(cb: Callable[[Dict[str, Any]], None]) -> None:
+    _unregister(_change_callbacks, cb)
 
 
 def load_settings(app_name: str = "CopyPasteTool") -> Dict[str, Any]:
+    """Load settings from the active backend (settings.json unless `use_backend` was called)."""
     global _settings
     cfg = DEFAULTS.copy()
-    path = get_config_path(app_name)
-    if path.exists():
+    loaded = _backend_for(app_name).load()
+    if loaded:
+        cfg.update(_upgrade_legacy_values(loaded))
+    with _lock:
+        _settings = cfg
+    return _settings
+
+
+def use_backend(backend) -> Dict[str, Any]:
+    """Make `backend` the one place settings are read from and saved to, and load from it.
+
+    Pass None to go back to settings.json.
+    """
+    global _backend
+    flush_pending_saves()
+    _backend = backend
+    return load_settings()
+
+
+# settings HistoryStore used to keep in the database: legacy key -> (settings key, parser)
+LEGACY_DB_KEYS = {
+    "secret_safe_enabled": ("secret_safe_mode", lambda raw: raw in ("1", "True", "true")),
+    "blocklist_apps": ("blocklist_apps", lambda raw: [x.strip().lower() for x in raw.split("\n") if x.strip()]),
+}
+LEGACY_MIGRATED_META = "settings_migrated"
+# the blocklist every settings file saved before the defaults were unified holds; the app
+# itself blocked HistoryStore's longer built-in list, which DEFAULTS now carries
+LEGACY_DEFAULT_BLOCKLIST = frozenset(("1password", "bitwarden", "lastpass", "authenticator", "keychain"))
+
+
+def _upgrade_legacy_values(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace an untouched legacy default blocklist with the current default."""
+    bl = values.get("blocklist_apps")
+    if isinstance(bl, str):
+        bl = bl.split("\n")
+    if isinstance(bl, (list, tuple)) and {str(x).strip().lower() for x in bl if str(x).strip()} == LEGACY_DEFAULT_BLOCKLIST:
+        values = dict(values)
+        values["blocklist_apps"] = list(DEFAULTS["blocklist_apps"])
+    return values
+
+
+def migrate_legacy_settings(persistence, apply: bool = True) -> Dict[str, Any]:
+    """One-time move of the legacy database settings rows into settings.
+
+    Returns the migrated values ({settings key: value}). With `apply`, they are also set
+    (as one batch) and a save is scheduled. Later calls find the migration marker and do
+    nothing.
+    """
+    try:
+        if persistence.get_meta(LEGACY_MIGRATED_META):
+            return {}
+        rows = persistence.load_settings()
+    except Exception:
+        return {}
+    found = {}
+    for legacy, (key, parse) in LEGACY_DB_KEYS.items():
+        raw = rows.get(legacy)
+        if raw is None:
+            continue
         try:
-            with path.open("r", encoding="utf-8") as f:
-                loaded = json.load(f)
-            if isinstance(loaded, dict):
-                cfg.update(loaded)
+            found[key] = parse(raw)
         except Exception:
-            try:
-                backup = path.with_suffix('.broken.json')
-                path.replace(backup)
-            except Exception:
-                pass
-    _settings = cfg
-    return _settings
+            pass
+    found = _upgrade_legacy_values(found)
+    if apply:
+        writes = {}
+        remove = [k for k in LEGACY_DB_KEYS if k in rows]
+    else:
+        # the database is the settings backend: rewrite the values in its JSON format
+        writes = {k: json.dumps(v, sort_keys=True, ensure_ascii=False) for k, v in found.items()}
+        remove = [k for k in LEGACY_DB_KEYS if k in rows and k not in writes]
+    try:
+        persistence.save_settings(writes, remove, meta={LEGACY_MIGRATED_META: "1"})
+    except Exception:
+        return {}
+    if apply and found:
+        with batch():
+            for key, value in found.items():
+                set_(key, value)
+        save_debounced()
+    return found
+
 
 # Do NOT auto-load persisted settings at module import time. Call load_settings() explicitly
 # from application startup (e.g., clipboard_manager.main) when you want to read persisted config.
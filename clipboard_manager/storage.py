@@ -1,5 +1,6 @@
 import sqlite3
 import os
+import json
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
@@ -11,7 +12,9 @@ CREATE TABLE IF NOT EXISTS items (
     timestamp TEXT,
     is_temporary INTEGER DEFAULT 0,
     expire_at REAL NULL,
-    pinned INTEGER DEFAULT 0
+    pinned INTEGER DEFAULT 0,
+    kind TEXT DEFAULT 'text',
+    blobs TEXT NULL
 );
 
 CREATE TABLE IF NOT EXISTS settings (
@@ -25,6 +28,42 @@ CREATE TABLE IF NOT EXISTS metadata (
 );
 '''
 
+# columns added after the first release; older databases get them via ALTER TABLE
+ITEM_COLUMN_MIGRATIONS = (
+    ('kind', "TEXT DEFAULT 'text'"),
+    ('blobs', 'TEXT NULL'),
+)
+
+def _load_blobs(raw) -> Dict[str, str]:
+    if not raw:
+        return {}
+    try:
+        data = json.loads(raw)
+    except Exception:
+        return {}
+    return {str(k): str(v) for k, v in data.items()} if isinstance(data, dict) else {}
+
+
+def iter_rows(conn, table: str, columns, chunk_size: int = 1000):
+    """Stream rows of `table` in rowid order, `chunk_size` rows per query.
+
+    Each chunk is a fresh keyset query (``rowid > last``), so no cursor stays open between
+    chunks and the caller may update the rows it has already been given. The first
+    column of each row is the rowid.
+    """
+    cols = ', '.join(['rowid'] + list(columns))
+    sql = 'SELECT %s FROM %s WHERE rowid > ? ORDER BY rowid LIMIT ?' % (cols, table)
+    last = 0
+    while True:
+        rows = conn.execute(sql, (last, chunk_size)).fetchall()
+        if not rows:
+            return
+        yield from rows
+        last = rows[-1][0]
+        if len(rows) < chunk_size:
+            return
+
+
 class Persistence:
     def __init__(self, db_path: str):
         self.db_path = os.path.abspath(db_path)
@@ -57,6 +96,10 @@ class Persistence:
     def _ensure_schema(self):
         cur = self.conn.cursor()
         cur.executescript(SCHEMA)
+        cols = {r['name'] for r in cur.execute('PRAGMA table_info(items)').fetchall()}
+        for name, decl in ITEM_COLUMN_MIGRATIONS:
+            if name not in cols:
+                cur.execute('ALTER TABLE items ADD COLUMN %s %s' % (name, decl))
         self.conn.commit()
 
     def load_items(self) -> List[Dict[str, Any]]:
@@ -74,14 +117,16 @@ class Persistence:
                 'is_temporary': bool(r['is_temporary']),
                 'expire_at': r['expire_at'],
                 'pinned': bool(r['pinned']),
+                'kind': r['kind'] or 'text',
+                'blobs': _load_blobs(r['blobs']),
             })
         return items
 
     def save_item(self, item) -> None:
         cur = self.conn.cursor()
         cur.execute('''
-            INSERT OR REPLACE INTO items (id, content, source_app, timestamp, is_temporary, expire_at, pinned)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            INSERT OR REPLACE INTO items (id, content, source_app, timestamp, is_temporary, expire_at, pinned, kind, blobs)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             item.id,
             item.content,
@@ -90,6 +135,8 @@ class Persistence:
             1 if item.is_temporary else 0,
             item.expire_at,
             1 if item.pinned else 0,
+            getattr(item, 'kind', None) or 'text',
+            json.dumps(item.blobs, sort_keys=True) if getattr(item, 'blobs', None) else None,
         ))
         self.conn.commit()
 
@@ -111,6 +158,20 @@ class Persistence:
         cur.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', (key, value))
         self.conn.commit()
 
+    def save_settings(self, values: Dict[str, str], remove=(), meta: Optional[Dict[str, str]] = None) -> None:
+        """Write several settings rows (and optional metadata) in one transaction."""
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', list(values.items()))
+            self.conn.executemany('DELETE FROM settings WHERE key=?', [(k,) for k in remove])
+            if meta:
+                self.conn.executemany('INSERT OR REPLACE INTO metadata (k, v) VALUES (?, ?)', list(meta.items()))
+
+    def get_meta(self, key: str) -> Optional[str]:
+        cur = self.conn.cursor()
+        cur.execute('SELECT v FROM metadata WHERE k=?', (key,))
+        row = cur.fetchone()
+        return row['v'] if row else None
+
     def close(self):
         try:
             self.conn.close()
@@ -1,10 +1,21 @@
-import time
 import subprocess
 import importlib
 import os
 import sys
-from typing import List, Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
 from datetime import datetime, timezone
+import logging
+from clipboard_manager import metrics
+from clipboard_manager.log import get_logger
+from clipboard_manager import osascript_worker as _osascript_worker
+from clipboard_manager import probes as _probes
+from clipboard_manager import window_list as _window_list
+
+_log = get_logger('probes')
+
+_FRONTMOST_SCRIPT = 'tell application "System Events" to get name of first application process whose frontmost is true'
 
 _has_pyobjc = False
 _AppKit = None
@@ -101,29 +112,13 @@ def _get_app_from_mouse_window() -> Optional[str]:
         if not _has_pyobjc:
             return None
         CGEventGetLocation = getattr(_Quartz, 'CGEventGetLocation', None)
-        CGWindowListCopyWindowInfo = getattr(_Quartz, 'CGWindowListCopyWindowInfo', None)
-        kCGWindowListOptionOnScreenOnly = getattr(_Quartz, 'kCGWindowListOptionOnScreenOnly', None)
-        kCGNullWindowID = getattr(_Quartz, 'kCGNullWindowID', None)
-        if not (CGEventGetLocation and CGWindowListCopyWindowInfo and kCGWindowListOptionOnScreenOnly is not None and kCGNullWindowID is not None):
+        if not CGEventGetLocation:
+            return None
+        snap = _window_list.get_snapshot(_Quartz)
+        if snap is None:
             return None
         pt = CGEventGetLocation(None)
-        mx = float(getattr(pt, 'x', 0))
-        my = float(getattr(pt, 'y', 0))
-        wins = CGWindowListCopyWindowInfo(kCGWindowListOptionOnScreenOnly, kCGNullWindowID)
-        for w in wins:
-            try:
-                bounds = w.get('kCGWindowBounds') or {}
-                x = float(bounds.get('X', bounds.get('x', 0)))
-                y = float(bounds.get('Y', bounds.get('y', 0)))
-                w_w = float(bounds.get('Width', bounds.get('width', 0)))
-                w_h = float(bounds.get('Height', bounds.get('height', 0)))
-                if mx >= x and mx <= x + w_w and my >= y and my <= y + w_h:
-                    owner = w.get('kCGWindowOwnerName') or None
-                    if owner:
-                        return str(owner)
-            except Exception:
-                continue
-        return None
+        return snap.owner_at(float(getattr(pt, 'x', 0)), float(getattr(pt, 'y', 0)))
     except Exception:
         return None
 
@@ -138,185 +133,213 @@ def find_window_owner_by_content(snippet: str) -> Optional[str]:
         txt = snippet.strip()
         if not txt:
             return None
-        CGWindowListCopyWindowInfo = getattr(_Quartz, 'CGWindowListCopyWindowInfo', None)
-        kCGWindowListOptionOnScreenOnly = getattr(_Quartz, 'kCGWindowListOptionOnScreenOnly', None)
-        kCGNullWindowID = getattr(_Quartz, 'kCGNullWindowID', None)
-        if not (CGWindowListCopyWindowInfo and kCGWindowListOptionOnScreenOnly is not None and kCGNullWindowID is not None):
-            return None
-        wins = CGWindowListCopyWindowInfo(kCGWindowListOptionOnScreenOnly, kCGNullWindowID)
-        for w in wins:
-            try:
-                title = (w.get('kCGWindowName') or '')
-                owner = (w.get('kCGWindowOwnerName') or '')
-                if not title:
-                    title = owner
-                if not title:
-                    continue
-                if txt.lower() in str(title).lower():
-                    return owner or None
-            except Exception:
-                continue
-        return None
+        snap = _window_list.get_snapshot(_Quartz)
+        return snap.owner_by_title(txt) if snap is not None else None
     except Exception:
         return None
 
 
-def get_frontmost_app(content_snippet: Optional[str] = None) -> str:
-    cl_debug = int(os.environ.get('CLIP_DEBUG', '0') or '0')
+def _osascript_frontmost(timeout: float) -> Optional[str]:
+    """Ask System Events for the frontmost process name.
 
+    Uses the long-lived helper from osascript_worker when available and falls back to a
+    one-off `osascript` process otherwise. Timeouts and errors from either propagate to the
+    caller, which counts them as failed samples.
+    """
+    worker = _osascript_worker.get_worker()
+    if worker is not None:
+        try:
+            return worker.query(timeout)
+        except _osascript_worker.OsascriptUnavailable:
+            pass
+    res = subprocess.run(['osascript', '-e', _FRONTMOST_SCRIPT], capture_output=True, text=True, timeout=timeout)
+    return (res.stdout or '').strip() or None
 
-    try:
-        probe_works = False
-        hard_exceptions = 0
-        attempts = int(os.environ.get('EARLY_PROBE_ATTEMPTS', '3'))
-        for _ in range(attempts):
-            try:
-                _ = subprocess.run(
-                    ['osascript', '-e', 'tell application "System Events" to get name of first application process whose frontmost is true'],
-                    capture_output=True, text=True, timeout=0.12
-                )
-                probe_works = True
-                break
-            except subprocess.TimeoutExpired:
-                continue
-            except Exception:
-                hard_exceptions += 1
-                continue
-        if not probe_works and hard_exceptions >= attempts:
-            if cl_debug >= 1:
-                print("[clip-debug] %s method='early-osascript-check' failed (hard exceptions); returning 'Unknown App'" % (datetime.now(timezone.utc).isoformat(),))
-            return 'Unknown App'
-    except Exception:
-        pass
 
-    def usable(name: Optional[str]):
-        if not name:
-            return False
-        try:
-            nl = name.lower()
-        except Exception:
-            nl = str(name).lower()
-        if 'python' in nl or nl.strip() == '':
-            return False
-        return True
+# first gap between probe samples; gaps double up to the method's *_DELAY setting
+PROBE_MIN_DELAY = 0.002
+# a probe method is skipped for PROBE_FAIL_COOLDOWN seconds after PROBE_FAIL_ROUNDS rounds in
+# a row produced nothing but errors/empty answers; one answer resets the count
+PROBE_FAIL_COOLDOWN = 30.0
+PROBE_FAIL_ROUNDS = 3
+_PROBE_EWMA_ALPHA = 0.2
 
-    if _try_load_pyobjc():
-        appkit_samples = []
-        appkit_attempts = int(os.environ.get('APPKIT_SAMPLES', '5'))
-        appkit_delay = float(os.environ.get('APPKIT_DELAY', '0.02'))
-        for _ in range(appkit_attempts):
-            try:
-                a = _get_app_from_appkit()
-            except Exception:
-                a = None
-            appkit_samples.append(a)
-            time.sleep(appkit_delay)
-        freq = {}
-        for v in appkit_samples:
-            if usable(v):
-                freq[v] = freq.get(v, 0) + 1
-        if freq:
-            sorted_items = sorted(freq.items(), key=lambda x: (-x[1], x[0]))
-            candidate, count = sorted_items[0]
-            if count >= int(os.environ.get('APPKIT_MIN_COUNT', '2')):
-                if cl_debug >= 1:
-                    print("[clip-debug] %s method='appkit-sampled' result='%s' count=%d preview='%s'" % (datetime.now(timezone.utc).isoformat(), candidate, count, (content_snippet or '')[:120]))
-                return candidate
+_probe_stats = {}
+_probe_stats_lock = threading.Lock()
+
+
+def _stat(method: str) -> dict:
+    st = _probe_stats.get(method)
+    if st is None:
+        st = _probe_stats[method] = {'calls': 0, 'latency': None, 'success': None, 'failures': 0,
+                                     'failed_rounds': 0, 'failed_until': 0.0}
+    return st
+
+
+def _record_probe(method: str, latency: float, ok: bool) -> None:
+    metrics.observe('probe.' + method, latency)
+    with _probe_stats_lock:
+        st = _stat(method)
+        st['calls'] += 1
+        a = _PROBE_EWMA_ALPHA
+        st['latency'] = latency if st['latency'] is None else (1 - a) * st['latency'] + a * latency
+        v = 1.0 if ok else 0.0
+        st['success'] = v if st['success'] is None else (1 - a) * st['success'] + a * v
+
+
+def _mark_probe_failed(method: str, now: float) -> None:
+    """Count a round without answers; enough of them in a row start the cooldown."""
+    cooldown = float(os.environ.get('PROBE_FAIL_COOLDOWN', str(PROBE_FAIL_COOLDOWN)))
+    rounds = int(os.environ.get('PROBE_FAIL_ROUNDS', str(PROBE_FAIL_ROUNDS)))
+    with _probe_stats_lock:
+        st = _stat(method)
+        st['failures'] += 1
+        st['failed_rounds'] += 1
+        if st['failed_rounds'] >= rounds:
+            st['failed_until'] = now + cooldown
+
+
+def _mark_probe_answered(method: str) -> None:
+    with _probe_stats_lock:
+        st = _stat(method)
+        st['failed_rounds'] = 0
+        st['failed_until'] = 0.0
+
+
+def _probe_skipped(method: str, now: float) -> bool:
+    with _probe_stats_lock:
+        st = _probe_stats.get(method)
+        return bool(st) and now < st['failed_until']
+
+
+def get_probe_stats() -> dict:
+    """Per-method probe estimates: calls, EWMA latency (s), EWMA success rate, failures, failed_rounds, failed_until."""
+    with _probe_stats_lock:
+        return {k: dict(v) for k, v in _probe_stats.items()}
+
+
+def reset_probe_stats() -> None:
+    with _probe_stats_lock:
+        _probe_stats.clear()
+
+
+def _usable_app(name: Optional[str]) -> bool:
+    if not name:
+        return False
     try:
-        if _try_load_pyobjc() and is_ax_trusted():
-            ax_samples = []
-            ax_attempts = int(os.environ.get('AX_SAMPLES', '5'))
-            ax_delay = float(os.environ.get('AX_DELAY', '0.02'))
-            for _ in range(ax_attempts):
-                try:
-                    a = _get_app_from_ax()
-                except Exception:
-                    a = None
-                ax_samples.append(a)
-                time.sleep(ax_delay)
-            freq = {}
-            for v in ax_samples:
-                if usable(v):
-                    freq[v] = freq.get(v, 0) + 1
-            if freq:
-                sorted_items = sorted(freq.items(), key=lambda x: (-x[1], x[0]))
-                candidate, count = sorted_items[0]
-                if count >= int(os.environ.get('AX_MIN_COUNT', '2')):
-                    if cl_debug >= 1:
-                        print("[clip-debug] %s method='ax-sampled' result='%s' count=%d preview='%s'" % (datetime.now(timezone.utc).isoformat(), candidate, count, (content_snippet or '')[:120]))
-                    return candidate
+        nl = name.lower()
     except Exception:
-        pass
+        nl = str(name).lower()
+    if 'python' in nl or nl.strip() == '':
+        return False
+    return True
 
-    interpreter_names = {os.path.basename(sys.executable).lower(), os.path.splitext(os.path.basename(sys.argv[0]))[0].lower(), 'python', 'python3'}
-    samples = []
-    raw_samples = []
-    max_attempts = int(os.environ.get('OSASCRIPT_SAMPLES', '25'))
-    consecutive_needed = int(os.environ.get('OSASCRIPT_CONSECUTE', '4'))
-    sample_delay = float(os.environ.get('OSASCRIPT_DELAY', '0.02'))
-    last_val = None
-    consecutive = 0
-    for _ in range(max_attempts):
+
+def _adaptive_sample(be, method: str, probe, attempts: int, min_count: int, max_delay: float,
+                     normalize=None, hard_fail_after: int = 0):
+    """Sample `probe` until a usable answer is confidently ahead, then stop.
+
+    An answer wins once it has `min_count` votes and strictly leads every other answer.
+    Gaps between samples start at PROBE_MIN_DELAY and double up to `max_delay`. When the
+    first `hard_fail_after` attempts all raise or return None (a hung osascript helper
+    times out to None), sampling stops early. Rounds without a single answer count toward
+    the method's cooldown (see `_mark_probe_failed`); an answer resets it.
+    Returns (choice or None, raw samples, normalized samples).
+    """
+    raw, samples = [], []
+    freq = {}
+    misses = 0
+    gap = min(PROBE_MIN_DELAY, max_delay)
+    choice = None
+    for i in range(max(0, attempts)):
+        t0 = be.now()
         try:
-            res = subprocess.run(
-                ['osascript', '-e', 'tell application "System Events" to get name of first application process whose frontmost is true'],
-                capture_output=True, text=True, timeout=0.6
-            )
-            val = (res.stdout or '').strip() or None
+            val = probe()
         except Exception:
             val = None
-        raw_samples.append(val)
-        norm = val.lower().strip() if val else None
-        if norm and norm in interpreter_names:
-            norm = None
+        if val is None:
+            misses += 1
+        raw.append(val)
+        norm = normalize(val) if normalize else val
         samples.append(norm)
-        if norm and last_val and norm == last_val:
-            consecutive += 1
-        elif norm:
-            consecutive = 1
-            last_val = norm
-        else:
-            consecutive = 0
-            last_val = None
-        if consecutive >= consecutive_needed and usable(last_val):
-            final = last_val
+        _record_probe(method, be.now() - t0, _usable_app(norm))
+        if _usable_app(norm):
+            freq[norm] = freq.get(norm, 0) + 1
+            count = freq[norm]
+            if count >= min_count and all(c < count for k, c in freq.items() if k != norm):
+                choice = norm
+                break
+        if hard_fail_after and misses == i + 1 and misses >= hard_fail_after:
             break
-        time.sleep(sample_delay)
+        if i + 1 < attempts:
+            be.sleep(gap)
+            gap = min(gap * 2, max_delay)
+    if all(v is None for v in raw):
+        _mark_probe_failed(method, be.now())
     else:
-        freq = {}
-        for s in samples:
-            if not s:
-                continue
-            if usable(s):
-                freq[s] = freq.get(s, 0) + 1
-        if freq:
-            sorted_items = sorted(freq.items(), key=lambda x: (-x[1], x[0]))
-            choice, count = sorted_items[0]
-            if count >= int(os.environ.get('OSASCRIPT_MIN_COUNT', '3')):
-                final = choice
-            else:
-                final = None
-        else:
-            final = None
+        _mark_probe_answered(method)
+    return choice, raw, samples
+
+
+def get_frontmost_app(content_snippet: Optional[str] = None) -> str:
+    be = _probes.get_backend()
+    appkit_samples = ax_samples = None
+    raw_samples, samples = [], []
+    final = None
+    method = None
+
+    if be.has_pyobjc() and not _probe_skipped('appkit', be.now()):
+        final, appkit_samples, _ = _adaptive_sample(
+            be, 'appkit', be.appkit,
+            attempts=int(os.environ.get('APPKIT_SAMPLES', '5')),
+            min_count=int(os.environ.get('APPKIT_MIN_COUNT', '2')),
+            max_delay=float(os.environ.get('APPKIT_DELAY', '0.02')))
+        method = 'appkit-sampled' if final else None
+
+    if not final:
+        try:
+            if be.has_pyobjc() and not _probe_skipped('ax', be.now()) and be.ax_trusted():
+                final, ax_samples, _ = _adaptive_sample(
+                    be, 'ax', be.ax,
+                    attempts=int(os.environ.get('AX_SAMPLES', '5')),
+                    min_count=int(os.environ.get('AX_MIN_COUNT', '2')),
+                    max_delay=float(os.environ.get('AX_DELAY', '0.02')))
+                method = 'ax-sampled' if final else None
+        except Exception:
+            pass
+
+    if final:
+        _log.info('frontmost method=%s result=%s preview=%.120r', method, final, content_snippet or '')
+        return final
+
+    if _probe_skipped('osascript', be.now()):
+        _log.info('frontmost method=osascript skipped (recent hard failure); returning Unknown App')
+        return 'Unknown App'
+
+    interpreter_names = {os.path.basename(sys.executable).lower(), os.path.splitext(os.path.basename(sys.argv[0]))[0].lower(), 'python', 'python3'}
+
+    def normalize(val):
+        norm = val.lower().strip() if val else None
+        return None if norm in interpreter_names else norm
+
+    final, raw_samples, samples = _adaptive_sample(
+        be, 'osascript', lambda: be.osascript(0.6),
+        attempts=int(os.environ.get('OSASCRIPT_SAMPLES', '25')),
+        # OSASCRIPT_CONSECUTE is the pre-adaptive name of the vote threshold
+        min_count=int(os.environ.get('OSASCRIPT_MIN_COUNT') or os.environ.get('OSASCRIPT_CONSECUTE') or '3'),
+        max_delay=float(os.environ.get('OSASCRIPT_DELAY', '0.02')),
+        normalize=normalize,
+        hard_fail_after=int(os.environ.get('EARLY_PROBE_ATTEMPTS', '3')))
 
     resolved = final or 'Unknown App'
 
-    if cl_debug >= 2:
-        dbg = {
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'appkit_samples': appkit_samples if 'appkit_samples' in locals() else None,
-            'ax_samples': ax_samples if 'ax_samples' in locals() else None,
-            'raw_osascript_samples': raw_samples,
-            'normalized_samples': samples,
-            'final_resolved': resolved,
-            'preview': (content_snippet or '')[:200]
-        }
-        print('\n--- clip-debug-verbose ---')
-        for k, v in dbg.items():
-            print("%s: %s" % (k, v))
-        print('--- end ---')
-    elif cl_debug >= 1:
-        print("[clip-debug] %s method='osascript' osascript='%s' resolved='%s' preview='%s'" % (datetime.now(timezone.utc).isoformat(), (raw_samples[0] if raw_samples else None), resolved, (content_snippet or '')[:120]))
+    if _log.isEnabledFor(logging.DEBUG):
+        _log.debug('frontmost method=osascript resolved=%s appkit_samples=%s ax_samples=%s raw_osascript_samples=%s '
+                   'normalized_samples=%s probe_stats=%s preview=%.200r', resolved, appkit_samples, ax_samples,
+                   raw_samples, samples, get_probe_stats(), content_snippet or '')
+    else:
+        _log.info('frontmost method=osascript osascript=%s resolved=%s preview=%.120r',
+                  raw_samples[0] if raw_samples else None, resolved, content_snippet or '')
 
     return resolved
 
@@ -325,39 +348,23 @@ def get_top_window_owners(n: int = 10) -> List[str]:
     """Return a list of top visible window owner names (front-to-back), up to n entries.
     Returns empty list if pyobjc/Quartz not available.
     """
-    out = []
     try:
         if not _has_pyobjc:
-            return out
-        CGWindowListCopyWindowInfo = getattr(_Quartz, 'CGWindowListCopyWindowInfo', None)
-        kCGWindowListOptionOnScreenOnly = getattr(_Quartz, 'kCGWindowListOptionOnScreenOnly', None)
-        kCGNullWindowID = getattr(_Quartz, 'kCGNullWindowID', None)
-        if not (CGWindowListCopyWindowInfo and kCGWindowListOptionOnScreenOnly is not None and kCGNullWindowID is not None):
-            return out
-        wins = CGWindowListCopyWindowInfo(kCGWindowListOptionOnScreenOnly, kCGNullWindowID)
-        for w in wins[:n]:
-            try:
-                owner = w.get('kCGWindowOwnerName') or ''
-                if owner:
-                    out.append(str(owner))
-            except Exception:
-                continue
+            return []
+        snap = _window_list.get_snapshot(_Quartz)
+        return snap.owners(n) if snap is not None else []
     except Exception:
-        pass
-    return out
+        return []
 
 
 def probe_frontmost_methods(content_snippet: Optional[str] = None) -> dict:
     """Return a dictionary with outputs from multiple frontmost-app probes for debugging.
     Keys: osascript_single, osascript_samples, appkit, ax, mouse_window_owner, by_content
     """
+    be = _probes.get_backend()
     result = {}
     try:
-        res = subprocess.run(
-            ['osascript', '-e', 'tell application "System Events" to get name of first application process whose frontmost is true'],
-            capture_output=True, text=True, timeout=0.6
-        )
-        single = (res.stdout or '').strip() or None
+        single = be.osascript(0.6)
     except Exception:
         single = None
     result['osascript_single'] = single
@@ -365,37 +372,33 @@ def probe_frontmost_methods(content_snippet: Optional[str] = None) -> dict:
     samples = []
     for _ in range(7):
         try:
-            r = subprocess.run(
-                ['osascript', '-e', 'tell application "System Events" to get name of first application process whose frontmost is true'],
-                capture_output=True, text=True, timeout=0.6
-            )
-            val = (r.stdout or '').strip() or None
+            val = be.osascript(0.6)
         except Exception:
             val = None
         samples.append(val)
-        time.sleep(0.02)
+        be.sleep(0.02)
     result['osascript_samples'] = samples
 
     try:
-        appkit_name = _get_app_from_appkit()
+        appkit_name = be.appkit()
     except Exception:
         appkit_name = None
     result['appkit'] = appkit_name
 
     try:
-        ax_name = _get_app_from_ax()
+        ax_name = be.ax()
     except Exception:
         ax_name = None
     result['ax'] = ax_name
 
     try:
-        mouse_owner = _get_app_from_mouse_window()
+        mouse_owner = be.mouse_window_owner()
     except Exception:
         mouse_owner = None
     result['mouse_window_owner'] = mouse_owner
 
     try:
-        by_content = find_window_owner_by_content((content_snippet or '')[:200])
+        by_content = be.window_owner_by_content((content_snippet or '')[:200])
     except Exception:
         by_content = None
     result['by_content'] = by_content
@@ -465,8 +468,15 @@ def fuzzy_score(text: str, query: str) -> int:
     return int(ratio * 100)
 
 
-def highlight_match(text: str, query: str) -> str:
+def highlight_match(text: str, query: str, window: Optional[int] = None) -> str:
+    """Return HTML-escaped `text` with the first case-insensitive match of `query` in bold.
+
+    When `window` is given only about that many characters around the match (or from the
+    start when there is no match) are escaped, with an ellipsis marking cut text.
+    """
     import html
+    if window is not None:
+        return _highlight_window(text or '', query, int(window))
     if not query:
         return html.escape(text)
     s = text
@@ -482,38 +492,106 @@ def highlight_match(text: str, query: str) -> str:
     return before + '<b>' + match + '</b>' + after
 
 
+def make_preview(text: str, max_lines: int = 6, max_chars: int = 400):
+    """Return (preview, truncated) holding at most `max_lines` lines / `max_chars` characters of text.
+
+    Only the head of `text` is inspected, so the cost does not depend on the full size.
+    """
+    if not text:
+        return '', False
+    lines = text[:max_chars].split('\n', max_lines)
+    preview = '\n'.join(lines[:max_lines])
+    return preview, len(preview) < len(text)
+
+
+def _highlight_window(text: str, query: str, window: int) -> str:
+    import html
+    import re
+    m = re.search(re.escape(query), text, re.IGNORECASE) if query else None
+    if m is None:
+        start, end = 0, window
+    else:
+        start = max(0, m.start() - window // 3)
+        end = max(start + window, m.end())
+    out = '\u2026' if start > 0 else ''
+    if m is None:
+        out += html.escape(text[start:end])
+    else:
+        out += html.escape(text[start:m.start()]) + '<b>' + html.escape(m.group(0)) + '</b>' + html.escape(text[m.end():end])
+    if end < len(text):
+        out += '\u2026'
+    return out
+
+
+class LRUCache:
+    """Small thread-safe least-recently-used mapping with a fixed capacity."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = max(1, int(maxsize))
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
 def timeline_probes(duration_sec: float = 3.0, interval_sec: float = 0.05) -> List[dict]:
     """Sample multiple frontmost-app probes over duration, returning a list of timestamped dicts.
     Each dict contains: ts, appkit, ax, osascript, mouse_window_owner
     """
+    be = _probes.get_backend()
     out = []
-    end = time.time() + float(duration_sec)
-    while time.time() < end:
-        ts = datetime.now(timezone.utc).isoformat()
+    end = be.now() + float(duration_sec)
+    while be.now() < end:
+        ts = datetime.fromtimestamp(be.now(), timezone.utc).isoformat()
         try:
             osa = None
             try:
-                r = subprocess.run(
-                    ['osascript', '-e', 'tell application "System Events" to get name of first application process whose frontmost is true'],
-                    capture_output=True, text=True, timeout=0.5
-                )
-                osa = (r.stdout or '').strip() or None
+                osa = be.osascript(0.5)
             except Exception:
                 osa = None
             try:
-                ak = _get_app_from_appkit()
+                ak = be.appkit()
             except Exception:
                 ak = None
             try:
-                ax = _get_app_from_ax()
+                ax = be.ax()
             except Exception:
                 ax = None
             try:
-                mw = _get_app_from_mouse_window()
+                mw = be.mouse_window_owner()
             except Exception:
                 mw = None
         except Exception:
             ak = ax = osa = mw = None
         out.append({'ts': ts, 'osascript': osa, 'appkit': ak, 'ax': ax, 'mouse_window_owner': mw})
-        time.sleep(interval_sec)
+        be.sleep(interval_sec)
     return out
@@ -1,11 +1,17 @@
-from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+from PyQt6.QtCore import QObject, QMimeData, QByteArray, pyqtSignal
 from PyQt6.QtWidgets import QApplication
-from clipboard_manager.utils import get_frontmost_app, get_top_window_owners, is_pyobjc_available
+from clipboard_manager.focus import FocusHistory, FocusInfo, get_focus_source
+from clipboard_manager.app_classifier import DEFAULT_ALIASES, DEFAULT_CATEGORIES, get_classifier
+from clipboard_manager.capture import snapshot_mime
+from clipboard_manager import content_analysis
+from clipboard_manager.log import get_logger
+from clipboard_manager import metrics
 from clipboard_manager import settings
+import logging
 import time
-from datetime import datetime
 import os
-from collections import deque
+
+_log = get_logger('watcher')
 
 def _env_float(name: str, default: float) -> float:
     try:
@@ -27,9 +33,13 @@ OWNER_WEIGHT_COMM = _env_int('CP_WEIGHT_COMM', 30)
 OWNER_WEIGHT_IDE = _env_int('CP_WEIGHT_IDE', 20)
 OWNER_CONTENT_BOOST = _env_int('CP_WEIGHT_CONTENT_BOOST', 25)
 OWNER_CODE_BOOST = _env_int('CP_WEIGHT_CODE_BOOST', 30)
+# code copies at least this confident may be attributed to a recently focused IDE
+CODE_ATTRIBUTION_MIN_CONFIDENCE = _env_float('CP_CODE_MIN_CONFIDENCE', 0.6)
 
 class ClipboardWatcher(QObject):
     clipboard_changed = pyqtSignal(str, str, float)
+    # copies carrying HTML/RTF, images or file URLs: (MimeSnapshot, app, ts); see capture.py
+    rich_clipboard_changed = pyqtSignal(object, str, float)
 
     def __init__(self, parent=None):
         super(ClipboardWatcher, self).__init__(parent)
@@ -53,163 +63,77 @@ class ClipboardWatcher(QObject):
         except Exception:
             self._self_names = {'python', 'python3', 'clipboard'}
 
-        self._app_history = deque(maxlen=80)
+        self._app_history = FocusHistory(maxlen=80, classify=self._classify_app)
         self._last_sampled_app = None
 
-        self._use_appkit_notifications = False
+        # focus changes come from an event-driven source (AppKit, xprop) or a polling
+        # fallback; either way the GUI thread never blocks on probes
+        self._focus_cursor = 0.0
         try:
-            if is_pyobjc_available():
-                try:
-                    from AppKit import NSWorkspace, NSWorkspaceDidActivateApplicationNotification
-                    from Foundation import NSObject
-                    import objc
-
-                    class _AppkitObserver(NSObject):
-                        def initWithWatcher_(self, watcher):
-                            self = objc.super(_AppkitObserver, self).init()
-                            if self is None:
-                                return None
-                            self._watcher = watcher
-                            return self
-
-                        def appActivated_(self, notification):
-                            try:
-                                info = notification.userInfo()
-                                app = info.get('NSWorkspaceApplicationKey') if info else None
-                                if app is not None:
-                                    try:
-                                        name = app.localizedName()
-                                    except Exception:
-                                        name = None
-                                    if name:
-                                        self._watcher._record_app(str(name))
-                            except Exception:
-                                pass
-
-                    self._appkit_observer = _AppkitObserver.alloc().initWithWatcher_(self)
-                    nc = NSWorkspace.sharedWorkspace().notificationCenter()
-                    nc.addObserver_selector_name_object_(self._appkit_observer, 'appActivated:', NSWorkspaceDidActivateApplicationNotification, None)
-                    self._use_appkit_notifications = True
-                except Exception:
-                    self._use_appkit_notifications = False
+            self._focus = get_focus_source()
         except Exception:
-            self._use_appkit_notifications = False
-
-        if not self._use_appkit_notifications:
-            self._app_timer = QTimer(self)
-            self._app_timer.timeout.connect(self._capture_active_app)
-            self._app_timer.start(150)
+            self._focus = None
 
-        try:
-            try:
-                initial = get_frontmost_app()
-            except Exception:
-                initial = None
-            if initial and 'python' not in initial.lower():
-                norm_initial = self._normalize_app_name(initial)
-                nl_init = norm_initial.lower() if norm_initial else ''
-                if norm_initial and nl_init.strip() and not any(sn in nl_init for sn in self._self_names) and not any(ign in nl_init for ign in self._IGNORED_OWNERS):
-                    self._app_history.append((time.time(), norm_initial))
-                    self._last_sampled_app = norm_initial
-        except Exception:
-            pass
-
-
-    def _record_app(self, app_name: str):
-        """Record an app activation event from AppKit observer. Respect pause/ignore windows."""
+    def _record_app(self, app_name: str, ts: float = None):
+        """Record an app activation event. Live events (ts=None) respect the pause/ignore window."""
         try:
             if not app_name:
                 return
-            if time.time() < self._ignore_until:
+            if ts is None and time.time() < self._ignore_until:
                 return
             norm = self._normalize_app_name(app_name)
-            nl = norm.lower() if norm else ''
-            if not norm or nl.strip() == '':
-                return
-            if any(sn in nl for sn in self._self_names):
+            if not norm or not norm.strip():
                 return
-            if any(ign in nl for ign in self._IGNORED_OWNERS):
+            info = self._app_history.info(norm)
+            if info.own or info.ignored:
                 return
             if norm != self._last_sampled_app:
                 self._last_sampled_app = norm
-                self._app_history.append((time.time(), norm))
+                self._app_history.append((time.time() if ts is None else ts, norm))
         except Exception:
             pass
 
-
-    def _capture_active_app(self):
-        """Continuously sample the currently-frontmost app (best-effort) and record changes."""
+    def _sync_focus_samples(self):
+        """Pull focus changes buffered by the focus source into the app history."""
+        if self._focus is None:
+            return
         try:
-            app = get_frontmost_app()
+            for ts, name in self._focus.events_since(self._focus_cursor):
+                self._focus_cursor = ts
+                self._record_app(name, ts)
         except Exception:
-            app = None
-        if not app:
-            return
-        norm = self._normalize_app_name(app)
-        nl = norm.lower() if norm else ''
-        if not norm or nl.strip() == '':
-            return
-        if any(sn in nl for sn in self._self_names):
-            return
-        if any(ign in nl for ign in self._IGNORED_OWNERS):
-            return
-        if norm != self._last_sampled_app:
-            self._last_sampled_app = norm
-            self._app_history.append((time.time(), norm))
-
-    _NORMALIZE_MAP = [
-        ("visual studio code", "Visual Studio Code"),
-        ("code -", "Visual Studio Code"),
-        ("code", "Visual Studio Code"),
-        ("pycharm", "PyCharm"),
-        ("brave", "Brave Browser"),
-        ("chrome", "Chrome"),
-        ("safari", "Safari"),
-        ("firefox", "Firefox"),
-        ("discord", "Discord"),
-        ("notion", "Notion"),
-        ("outlook", "Microsoft Outlook"),
-        ("whatsapp", "WhatsApp"),
-        ("slack", "Slack"),
-        ("teams", "Microsoft Teams"),
-    ]
-
-    _IGNORED_OWNERS = [
-        'window server', 'grace', 'displaylink', 'display link', 'control center', 'grizzly', 'grap', 'grm', 'gr', 'dock',
-        'fontd', 'kernel_task'
-    ]
+            pass
+
+
+    # kept for callers that read the keyword tables; classification goes through app_classifier
+    _NORMALIZE_MAP = DEFAULT_ALIASES
+    _IGNORED_OWNERS = DEFAULT_CATEGORIES['ignored']
 
     def _normalize_app_name(self, name: str) -> str:
         if not name:
             return name
-        n = name.strip()
-        nl = n.lower()
-        for k, v in self._NORMALIZE_MAP:
-            if k in nl:
-                return v
-        return n
+        return get_classifier().canonical(name)
 
     def score_owner(self, owner_name: str, text_lower: str, allow_ide: bool, code_like: bool) -> int:
         """Score a top-window owner name based on heuristics and tunables."""
         if not owner_name:
             return -999
-        n = owner_name.lower()
-        if any(k in n for k in ('clipboard', 'copy-paste-tool', 'python', 'python3', 'terminal', 'iterm')):
-            return -999
-        if any(ign in n for ign in self._IGNORED_OWNERS):
+        cls = get_classifier().classify(owner_name)
+        if cls.is_self or cls.ignored:
             return -999
+        n = owner_name.lower()
         score = 0
-        if any(k in n for k in ('brave', 'chrome', 'safari', 'firefox', 'edge', 'opera')):
+        if cls.is_browser:
             score += OWNER_WEIGHT_BROWSER
-        if any(k in n for k in ('discord', 'slack', 'teams')):
+        if cls.is_comm:
             score += OWNER_WEIGHT_COMM
-        if any(k in n for k in ('pycharm', 'intellij', 'vscode', 'sublime', 'atom', 'webstorm', 'visual studio code')):
+        if cls.is_ide:
             score += OWNER_WEIGHT_IDE
         score += 1
         if text_lower:
-            if any(tok in text_lower for tok in ('http://', 'https://', 'www.')) and any(k in n for k in ('brave', 'chrome', 'safari', 'firefox', 'edge', 'opera')):
+            if cls.is_browser and any(tok in text_lower for tok in ('http://', 'https://', 'www.')):
                 score += OWNER_CONTENT_BOOST
-            if code_like and any(k in n for k in ('pycharm', 'intellij', 'vscode', 'sublime')):
+            if code_like and cls.is_ide:
                 score += OWNER_CODE_BOOST
             try:
                 for part in text_lower.split():
@@ -219,99 +143,69 @@ class ClipboardWatcher(QObject):
                 pass
         return score
 
+    # attribution weight of a focus event by app category
+    _CATEGORY_WEIGHTS = {'browser': 0.6, 'ide': 0.4, 'comm': 0.1}
+
+    def _classify_app(self, name: str) -> FocusInfo:
+        """Classify an app name once; FocusHistory caches the result per name."""
+        cls = get_classifier().classify(name or '')
+        nl = (name or '').lower()
+        try:
+            self_names = self._self_names
+        except (AttributeError, RuntimeError):
+            self_names = ()
+        return FocusInfo(
+            name or '', nl,
+            is_ide=cls.is_ide,
+            is_browser=cls.is_browser,
+            is_comm=cls.is_comm,
+            is_self=cls.is_self,
+            ignored=cls.ignored,
+            own=any(sn in nl for sn in self_names),
+            weight=self._CATEGORY_WEIGHTS.get(cls.category, 0.2),
+        )
+
     def _pick_recent_source_app(self, ts: float, *, allow_ide: bool, code_like: bool = False, language_hint: str | None = None) -> str | None:
         """Pick the most likely source app from recent focus history using recency+frequency scoring.
 
         Returns canonicalized app name or None.
         """
-        LOOKBACK = DEFAULT_LOOKBACK
-
-        def is_browser_name(n: str) -> bool:
-            nl = n.lower()
-            return any(k in nl for k in ('brave', 'chrome', 'safari', 'firefox', 'edge', 'opera'))
-
-        def is_comm_name(n: str) -> bool:
-            nl = n.lower()
-            return any(k in nl for k in ('discord', 'slack', 'teams', 'whatsapp', 'notion', 'outlook'))
-
-        def is_ide(name: str) -> bool:
-            n = name.lower()
-            return any(k in n for k in ('pycharm', 'intellij', 'idea', 'webstorm', 'goland', 'clion', 'rider', 'vscode', 'visual studio code', 'sublime', 'atom'))
-
-        def is_self(name: str) -> bool:
-            n = name.lower()
-            return any(k in n for k in ('clipboard', 'copy-paste-tool', 'python', 'python3', 'terminal', 'iterm'))
-
-        if not self._app_history:
+        hist = self._app_history
+        if not hist:
             return None
 
-        cutoff = ts - LOOKBACK
+        cutoff = ts - DEFAULT_LOOKBACK
+        recent = [(t, name, info) for t, name, info in hist.window(cutoff)
+                  if name and not info.is_self and not info.ignored]
+        canonical_map = {
+            'python': 'PyCharm',
+            'javascript': 'Visual Studio Code',
+            'js': 'Visual Studio Code',
+        }
         if code_like:
             lang_map = {
                 'python': ('pycharm', 'intellij'),
                 'javascript': ('vscode', 'visual studio code', 'webstorm'),
                 'js': ('vscode', 'visual studio code', 'webstorm'),
             }
-            preferred_ides = ()
-            if language_hint and language_hint in lang_map:
-                preferred_ides = lang_map[language_hint]
-            if language_hint:
-                canonical_map = {
-                    'python': 'PyCharm',
-                    'javascript': 'Visual Studio Code',
-                    'js': 'Visual Studio Code',
-                }
-                target = canonical_map.get(language_hint)
-                if target:
-                    freq_cutoff = ts - DEFAULT_FREQ_LOOKBACK
-                    for t, name in reversed(self._app_history):
-                        if t < freq_cutoff:
-                            break
-                        if not name:
-                            continue
-                        if is_self(name):
-                            continue
-                        if any(ign in name.lower() for ign in self._IGNORED_OWNERS):
-                            continue
-                        if target.lower() in name.lower():
-                            return self._normalize_app_name(name)
+            preferred_ides = lang_map.get(language_hint, ()) if language_hint else ()
+            target = canonical_map.get(language_hint) if language_hint else None
+            if target:
+                tl = target.lower()
+                for t, name, info in reversed(hist.window(ts - DEFAULT_FREQ_LOOKBACK)):
+                    if name and not info.is_self and not info.ignored and tl in info.lower:
+                        return self._normalize_app_name(name)
             if preferred_ides:
-                for t, name in reversed(self._app_history):
-                    if t < cutoff:
-                        break
-                    if not name:
-                        continue
-                    if is_self(name):
-                        continue
-                    if any(ign in name.lower() for ign in self._IGNORED_OWNERS):
-                        continue
-                    nl = name.lower()
-                    if any(pid in nl for pid in preferred_ides):
+                for t, name, info in reversed(recent):
+                    if any(pid in info.lower for pid in preferred_ides):
                         return self._normalize_app_name(name)
-            for t, name in reversed(self._app_history):
-                if t < cutoff:
-                    break
-                if not name:
-                    continue
-                if is_self(name):
-                    continue
-                if any(ign in name.lower() for ign in self._IGNORED_OWNERS):
-                    continue
-                if is_ide(name):
+            for t, name, info in reversed(recent):
+                if info.is_ide:
                     return self._normalize_app_name(name)
 
         freq = {}
         last_seen = {}
-        for t, name in self._app_history:
-            if not name:
-                continue
-            if t < cutoff:
-                continue
-            nl = name.lower()
-            if is_self(name):
-                continue
-            if any(ign in nl for ign in self._IGNORED_OWNERS):
-                continue
+        for t, name, info in recent:
             key = self._normalize_app_name(name)
             freq[key] = freq.get(key, 0) + 1
             last_seen[key] = max(last_seen.get(key, 0), t)
@@ -320,27 +214,14 @@ class ClipboardWatcher(QObject):
             return None
 
         if language_hint:
-            canonical_map = {
-                'python': 'PyCharm',
-                'javascript': 'Visual Studio Code',
-                'js': 'Visual Studio Code',
-            }
             tgt = canonical_map.get(language_hint)
             if tgt:
                 for k in freq.keys():
                     if tgt.lower() in k.lower() or k.lower() in tgt.lower():
                         return tgt
 
-        for t, name in reversed(self._app_history):
-            if t < cutoff:
-                break
-            if not name:
-                continue
-            if is_self(name):
-                continue
-            if any(ign in name.lower() for ign in self._IGNORED_OWNERS):
-                continue
-            if not is_ide(name):
+        for t, name, info in reversed(recent):
+            if not info.is_ide:
                 return self._normalize_app_name(name)
 
         best = None
@@ -351,7 +232,7 @@ class ClipboardWatcher(QObject):
             recency = now - last_seen.get(name, now)
             recency_score = 1.0 / (1.0 + recency)
             score = recency_score * 0.7 + (count / max(1, total)) * 0.3
-            if is_ide(name) and allow_ide:
+            if hist.info(name).is_ide and allow_ide:
                 score += 0.15 + (0.6 if code_like else 0.0)
             if score > best_score:
                 best_score = score
@@ -359,110 +240,111 @@ class ClipboardWatcher(QObject):
 
         return best
 
+    def attribute_source(self, ts: float, analysis=None) -> str:
+        """Return the app a copy at `ts` is attributed to, from the recorded focus history.
+
+        With a code-like `analysis` (see content_analysis) a recently focused IDE wins over
+        a non-IDE app that merely had focus closest to the copy.
+        """
+        pre_ms = int(os.environ.get('CP_PRE_MARGIN_MS', '500') or '500')
+        post_ms = int(os.environ.get('CP_POST_MARGIN_MS', '50') or '50')
+        pre_margin = float(pre_ms) / 1000.0
+        post_margin = float(post_ms) / 1000.0
+        chosen = None
+        try:
+            best_score = None
+            for t, name, info in self._app_history.window(ts - pre_margin, ts + post_margin):
+                if not name or not name.strip():
+                    continue
+                score = 1.0 / (1.0 + abs(t - ts)) + info.weight
+                if best_score is None or score > best_score:
+                    best_score = score
+                    chosen = name
+        except Exception:
+            pass
+
+        if analysis is not None and analysis.code_like and analysis.confidence >= CODE_ATTRIBUTION_MIN_CONFIDENCE:
+            if not chosen or not self._app_history.info(chosen).is_ide:
+                try:
+                    ide = self._pick_recent_source_app(ts, allow_ide=True, code_like=True,
+                                                       language_hint=analysis.language)
+                except Exception:
+                    ide = None
+                if ide and self._app_history.info(ide).is_ide:
+                    return self._normalize_app_name(ide)
+        if chosen:
+            return self._normalize_app_name(chosen)
+        if self._last_sampled_app:
+            return self._normalize_app_name(self._last_sampled_app)
+        return 'Unknown App'
+
     def _on_clipboard_change(self):
         try:
             now = time.time()
             if now < self._ignore_until:
                 return
         except RuntimeError:
-            if os.environ.get('CLIP_DEBUG') == '2':
-                print('[clip-debug] _on_clipboard_change called on uninitialized watcher; ignoring')
+            _log.debug('clipboard change on an uninitialized watcher; ignoring')
             return
         except Exception:
             return
 
-        text = self.clipboard.text()
-        if not text:
-            return
+        snap = self._snapshot_mime()
+        if snap is not None:
+            text = snap.text
+        else:
+            text = self.clipboard.text()
+            if not text:
+                return
         ts = now
+        # a polling source may be backed off after an idle spell; wake it without probing here
+        if self._focus is not None:
+            try:
+                self._focus.poke()
+            except Exception:
+                pass
+        self._sync_focus_samples()
+
+        if _log.isEnabledFor(logging.DEBUG):
+            try:
+                _log.debug('clipboard change ts=%.3f last_sampled_app=%s focus_history=%s',
+                          ts, self._last_sampled_app, list(self._app_history)[-6:])
+            except Exception:
+                pass
 
+        self._ignore_until = ts + 0.1
+        # cached by content (keyed on a bounded prefix, see analysis_key); HistoryStore reuses it
         try:
-            if os.environ.get('CLIP_DEBUG') == '2':
-                print('--- clip-debug-verbose ---')
-                print('timestamp:', datetime.fromtimestamp(ts).isoformat())
-                print('frontmost_probe: <skipped in debug to avoid blocking>')
-                print('last_sampled_app:', self._last_sampled_app)
-                try:
-                    owners_preview = get_top_window_owners(6)
-                except Exception:
-                    owners_preview = []
-                try:
-                    history_preview = list(self._app_history)[-6:]
-                except Exception:
-                    history_preview = []
-                print('owners_preview:', owners_preview)
-                print('history_preview:', history_preview)
-                print('emitting placeholder: Unknown App')
-                print('--- end ---')
+            with metrics.timer('capture.analysis'):
+                analysis = content_analysis.analyze(text) if text else None
         except Exception:
-            pass
+            analysis = None
+        with metrics.timer('capture.attribution'):
+            final_app = self.attribute_source(ts, analysis)
+
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug('emit app=%s ts=%.3f analysis=%r preview=%r', final_app, ts, analysis, (text or '')[:200])
 
-        pre_ms = int(os.environ.get('CP_PRE_MARGIN_MS', '500') or '500')
-        post_ms = int(os.environ.get('CP_POST_MARGIN_MS', '50') or '50')
-        pre_margin = float(pre_ms) / 1000.0
-        post_margin = float(post_ms) / 1000.0
-        chosen = None
         try:
-            candidates = []
-            for t, name in self._app_history:
-                try:
-                    if not name or not name.strip():
-                        continue
-                    if t >= (ts - pre_margin) and t <= (ts + post_margin):
-                        candidates.append((t, name))
-                except Exception:
-                    continue
-            if candidates:
-                def type_weight(name):
-                    nl = name.lower()
-                    if any(k in nl for k in ('brave', 'chrome', 'safari', 'firefox', 'edge', 'opera')):
-                        return 0.6
-                    if any(k in nl for k in ('pycharm', 'intellij', 'vscode', 'visual studio code', 'sublime', 'atom', 'webstorm')):
-                        return 0.4
-                    if any(k in nl for k in ('discord', 'slack', 'teams', 'whatsapp')):
-                        return 0.1
-                    return 0.2
-
-                best_score = None
-                best_candidate = None
-                for (t, name) in candidates:
-                    try:
-                        dt = abs(t - ts)
-                        recency_score = 1.0 / (1.0 + dt)
-                        weight = type_weight(name)
-                        score = recency_score + weight
-                        if best_score is None or score > best_score:
-                            best_score = score
-                            best_candidate = name
-                    except Exception:
-                        continue
-                chosen = best_candidate
+            if snap is not None:
+                self.rich_clipboard_changed.emit(snap, final_app, ts)
+            else:
+                self.clipboard_changed.emit(text, final_app, ts)
         except Exception:
             pass
 
-        self._ignore_until = ts + 0.1
-        final_app = None
-        if chosen:
-            final_app = self._normalize_app_name(chosen)
-        elif self._last_sampled_app:
-            final_app = self._normalize_app_name(self._last_sampled_app)
-        else:
-            final_app = 'Unknown App'
-
-        if os.environ.get('CLIP_DEBUG') == '2':
-            print("[clip-debug] %s final_emit app=%s" % (datetime.fromtimestamp(ts).isoformat(), final_app))
-
-        if os.environ.get('CLIP_DEBUG') == '2':
-            try:
-                preview = (text or '')[:200].replace('\n', '\\n')
-            except Exception:
-                preview = ''
-            print("[clip-debug] emitting text_preview=\"%s\" app=%s ts=%s" % (preview, final_app, datetime.fromtimestamp(ts).isoformat()))
-
+    def _snapshot_mime(self):
+        """MimeSnapshot of the clipboard when it holds more than plain text, else None."""
+        get_mime = getattr(self.clipboard, 'mimeData', None)
+        if get_mime is None:
+            return None
         try:
-            self.clipboard_changed.emit(text, final_app, ts)
+            snap = snapshot_mime(get_mime())
         except Exception:
-            pass
+            return None
+        if snap is None or not snap.is_rich():
+            return None
+        return snap
 
     def pause(self, ms=None):
         if ms is None:
@@ -490,10 +372,29 @@ class ClipboardWatcher(QObject):
                 except Exception:
                     pause_ms = 500
             self.pause(pause_ms)
-            if os.environ.get('CLIP_DEBUG') == '2':
-                print("[clip-debug] set_text called; paused for %d ms" % (pause_ms,))
+            _log.debug('set_text: capture paused for %d ms', pause_ms)
+        except Exception:
+            pass
+
+    def set_mime_data(self, formats: dict, text: str = None, pause_ms: int = None):
+        """Put raw `{mime format: bytes}` payloads (plus optional text) on the clipboard."""
+        try:
+            mime = QMimeData()
+            for fmt, data in (formats or {}).items():
+                if data is not None:
+                    mime.setData(fmt, QByteArray(data))
+            if text:
+                mime.setText(str(text))
+            cb = getattr(self, 'clipboard', None) or QApplication.clipboard()
+            cb.setMimeData(mime)
         except Exception:
             pass
+        if pause_ms is None:
+            try:
+                pause_ms = int(getattr(self, '_default_pause_ms', settings.get('pause_after_set_ms', 500)))
+            except Exception:
+                pause_ms = 500
+        self.pause(pause_ms)
 
     def _on_setting_changed(self, key, value):
         try:
@@ -0,0 +1,147 @@
+"""Shared, short-lived snapshot of the on-screen window list.
+
+`CGWindowListCopyWindowInfo` enumerates every window and returns loosely-typed dicts.
+The top-owner, title-search and mouse-window probes used to enumerate and re-parse the
+list each on their own. They now share one parsed snapshot per TTL tick:
+owner, title (and its lower-case form) and float bounds per window, front to back, plus a
+coarse grid index for point lookups.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# seconds a snapshot is reused; override with CP_WINDOW_LIST_TTL
+DEFAULT_TTL = 0.25
+# grid cell size (points) for the mouse-position lookup
+GRID_CELL = 256.0
+# window bounds are clamped to this range before indexing, to keep the grid small
+_GRID_LIMIT = 16384.0
+
+
+class WindowInfo:
+    __slots__ = ('owner', 'title', 'title_lower', 'x', 'y', 'w', 'h')
+
+    def __init__(self, owner: str, title: str, x: float, y: float, w: float, h: float):
+        self.owner = owner
+        self.title = title
+        self.title_lower = title.lower()
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+
+    def contains(self, px: float, py: float) -> bool:
+        return self.x <= px <= self.x + self.w and self.y <= py <= self.y + self.h
+
+
+def _bound(bounds: dict, key: str) -> float:
+    try:
+        return float(bounds.get(key, bounds.get(key.lower(), 0)))
+    except Exception:
+        return 0.0
+
+
+def parse_window(raw) -> Optional[WindowInfo]:
+    try:
+        owner = str(raw.get('kCGWindowOwnerName') or '')
+        title = str(raw.get('kCGWindowName') or '')
+        bounds = raw.get('kCGWindowBounds') or {}
+        return WindowInfo(owner, title, _bound(bounds, 'X'), _bound(bounds, 'Y'),
+                          _bound(bounds, 'Width'), _bound(bounds, 'Height'))
+    except Exception:
+        return None
+
+
+class WindowSnapshot:
+    """Parsed window list (front to back) with a grid index over window bounds."""
+
+    def __init__(self, windows: List[WindowInfo], taken_at: float = 0.0, cell: float = GRID_CELL):
+        self.windows = windows
+        self.taken_at = taken_at
+        self._cell = float(cell)
+        self._grid: Optional[Dict[Tuple[int, int], List[int]]] = None
+
+    def owners(self, n: int) -> List[str]:
+        return [w.owner for w in self.windows[:n] if w.owner]
+
+    def owner_by_title(self, snippet: str) -> Optional[str]:
+        """Owner of the front-most window whose title (or owner, if untitled) contains snippet."""
+        needle = snippet.lower()
+        for w in self.windows:
+            hay = w.title_lower or w.owner.lower()
+            if hay and needle in hay:
+                return w.owner or None
+        return None
+
+    def _build_grid(self):
+        grid = {}
+        c = self._cell
+        lim = _GRID_LIMIT
+
+        def span(lo, size):
+            a = min(max(lo, -lim), lim)
+            b = min(max(lo + size, -lim), lim)
+            return range(int(a // c), int(b // c) + 1)
+
+        for i, w in enumerate(self.windows):
+            if not w.owner or w.w < 0 or w.h < 0:
+                continue
+            for gx in span(w.x, w.w):
+                for gy in span(w.y, w.h):
+                    grid.setdefault((gx, gy), []).append(i)
+        self._grid = grid
+
+    def owner_at(self, px: float, py: float) -> Optional[str]:
+        """Owner of the front-most window containing the point."""
+        if self._grid is None:
+            self._build_grid()
+        lim = _GRID_LIMIT
+        key = (int(min(max(px, -lim), lim) // self._cell), int(min(max(py, -lim), lim) // self._cell))
+        for i in self._grid.get(key, ()):
+            w = self.windows[i]
+            if w.contains(px, py):
+                return w.owner
+        return None
+
+
+def ttl() -> float:
+    try:
+        return float(os.environ.get('CP_WINDOW_LIST_TTL', str(DEFAULT_TTL)))
+    except Exception:
+        return DEFAULT_TTL
+
+
+_lock = threading.Lock()
+_cached: Optional[Tuple[object, WindowSnapshot]] = None
+
+
+def get_snapshot(quartz) -> Optional[WindowSnapshot]:
+    """Return the window-list snapshot for `quartz`, enumerating at most once per TTL.
+
+    A different Quartz module object (e.g. after reloading pyobjc) invalidates the cache.
+    Returns None when the Quartz window APIs are unavailable.
+    """
+    global _cached
+    if quartz is None:
+        return None
+    now = time.monotonic()
+    with _lock:
+        if _cached is not None and _cached[0] is quartz and now - _cached[1].taken_at < ttl():
+            return _cached[1]
+        copy_info = getattr(quartz, 'CGWindowListCopyWindowInfo', None)
+        opt = getattr(quartz, 'kCGWindowListOptionOnScreenOnly', None)
+        null_id = getattr(quartz, 'kCGNullWindowID', None)
+        if not (copy_info and opt is not None and null_id is not None):
+            return None
+        raw = copy_info(opt, null_id) or []
+        windows = [w for w in (parse_window(r) for r in raw) if w is not None]
+        snap = WindowSnapshot(windows, now)
+        _cached = (quartz, snap)
+        return snap
+
+
+def invalidate() -> None:
+    global _cached
+    with _lock:
+        _cached = None
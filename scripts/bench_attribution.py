@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Replay a frontmost-app probe trace and measure attribution latency and accuracy.
+
+Without --trace a synthetic trace is generated: focus sessions of random length, sampled
+every 50 ms, with occasional glitches (interpreter names, empty probes). Copy events are
+dropped at random points in each session and the app that owned the session is the ground
+truth. Each event is attributed three ways:
+
+- get_frontmost_app() against the replay backend (virtual latency = simulated probe time)
+- ClipboardWatcher.attribute_source() fed with the focus changes seen so far
+- ClipboardWatcher._pick_recent_source_app()
+
+Usage: scripts/bench_attribution.py [--events N] [--seed S] [--trace FILE] [--osascript-only]
+"""
+import os, sys
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+import argparse
+import random
+import time
+from clipboard_manager.focus import FocusHistory
+
+from clipboard_manager import probes, utils
+from clipboard_manager.watcher import ClipboardWatcher
+
+APPS = ['Safari', 'Chrome', 'Slack', 'PyCharm', 'Visual Studio Code', 'Notes', 'Mail', 'Discord']
+LATENCY = {'appkit': 0.001, 'ax': 0.002, 'osascript': 0.08, 'mouse_window_owner': 0.003}
+
+
+def synth_trace(events, seed, interval=0.05, glitch=0.05):
+    rnd = random.Random(seed)
+    trace, copies = [], []
+    t = 1_700_000_000.0
+    for _ in range(events):
+        app = rnd.choice(APPS)
+        length = rnd.uniform(0.8, 6.0)
+        copies.append((t + rnd.uniform(0.3, length - 0.1), app))
+        end = t + length
+        while t < end:
+            def noisy():
+                r = rnd.random()
+                if r < glitch:
+                    return 'Python'
+                if r < glitch * 2:
+                    return None
+                return app
+            trace.append({'ts': t, 'appkit': noisy(), 'ax': noisy(), 'osascript': noisy(),
+                          'mouse_window_owner': rnd.choice(APPS)})
+            t += interval
+    return trace, copies
+
+
+def copies_from_trace(trace, events, seed):
+    """Without ground truth, use the majority of probes around each sampled instant."""
+    rnd = random.Random(seed)
+    be = probes.ReplayProbeBackend(trace)
+    lo, hi = be._times[0], be._times[-1]
+    out = []
+    for _ in range(events):
+        ts = rnd.uniform(lo, hi)
+        rec = be.record_at(ts) or {}
+        votes = [rec.get(k) for k in ('appkit', 'ax', 'osascript') if rec.get(k)]
+        if votes:
+            out.append((ts, max(set(votes), key=votes.count)))
+    return sorted(out)
+
+
+def make_watcher():
+    w = ClipboardWatcher.__new__(ClipboardWatcher)
+    w._app_history = FocusHistory(maxlen=80, classify=w._classify_app)
+    w._last_sampled_app = None
+    w._ignore_until = 0.0
+    w._self_names = {'python', 'python3', 'clipboard'}
+    return w
+
+
+def pct(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def report(label, latencies, correct, total):
+    print('%-28s acc=%6.2f%%  p50=%8.3fms  p95=%8.3fms  max=%8.3fms' % (
+        label, 100.0 * correct / max(1, total), pct(latencies, 0.5) * 1000, pct(latencies, 0.95) * 1000,
+        (max(latencies) if latencies else 0.0) * 1000))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--events', type=int, default=2000)
+    ap.add_argument('--seed', type=int, default=1)
+    ap.add_argument('--trace', help='recorded timeline_probes() trace (JSON list or JSON lines)')
+    ap.add_argument('--osascript-only', action='store_true', help='drop AppKit/AX columns from the trace')
+    args = ap.parse_args()
+
+    if args.trace:
+        backend = probes.ReplayProbeBackend.from_file(args.trace, latency=LATENCY)
+        trace = [dict(r) for r in backend._records]
+        copies = copies_from_trace(trace, args.events, args.seed)
+    else:
+        trace, copies = synth_trace(args.events, args.seed)
+    if args.osascript_only:
+        for r in trace:
+            r['appkit'] = r['ax'] = None
+    backend = probes.ReplayProbeBackend(trace, latency=LATENCY)
+    print('trace records=%d copy events=%d' % (len(trace), len(copies)))
+
+    prev = probes.set_backend(backend)
+    try:
+        virt, wall, ok = [], [], 0
+        for ts, truth in copies:
+            backend.seek(ts)
+            t0 = time.perf_counter()
+            got = utils.get_frontmost_app()
+            wall.append(time.perf_counter() - t0)
+            virt.append(backend.now() - ts)
+            # the osascript path reports lower-cased names
+            ok += (got.lower() == truth.lower())
+        report('get_frontmost_app (virtual)', virt, ok, len(copies))
+        report('get_frontmost_app (cpu)', wall, ok, len(copies))
+    finally:
+        probes.set_backend(prev)
+
+    # feed the watcher the focus changes an AppKit observer would have seen
+    w = make_watcher()
+    changes, last = [], None
+    for r in trace:
+        name = r.get('appkit') or r.get('osascript')
+        if name and name != last:
+            changes.append((probes._parse_ts(r['ts']), name))
+            last = name
+    i = 0
+    lat_attr, lat_pick, ok_attr, ok_pick = [], [], 0, 0
+    for ts, truth in copies:
+        while i < len(changes) and changes[i][0] <= ts:
+            w._record_app(changes[i][1], changes[i][0])
+            i += 1
+        t0 = time.perf_counter()
+        got = w.attribute_source(ts)
+        lat_attr.append(time.perf_counter() - t0)
+        ok_attr += (got == truth)
+        t0 = time.perf_counter()
+        got = w._pick_recent_source_app(ts, allow_ide=True)
+        lat_pick.append(time.perf_counter() - t0)
+        ok_pick += (got == truth)
+    report('watcher.attribute_source', lat_attr, ok_attr, len(copies))
+    report('watcher._pick_recent_source', lat_pick, ok_pick, len(copies))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Measure BoardRouter throughput (routes/s) on large clipboard items.
+
+Items of several sizes (prose, code, a URL buried at the end, shell output) are routed
+with a mix of source apps through the compiled plan. The rule-by-rule evaluation the
+router used before (each predicate stripping and lower-casing the item again) is timed
+alongside for reference.
+
+Usage: scripts/bench_router.py [--sizes KB,KB,...] [--routes N] [--seed S]
+"""
+import os, sys
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+import argparse
+import random
+import string
+import time
+
+from clipboard_manager.boards import Board, BoardRouter
+
+APPS = ['Google Chrome', 'iTerm2', 'Visual Studio Code', 'Slack', 'Notes', 'Terminal', 'Firefox']
+
+
+def legacy_route(rules, app, content):
+    for r in rules:
+        try:
+            if r.matches(app, content):
+                return r.board
+        except Exception:
+            continue
+    return Board.OTHER
+
+
+def items(size, seed):
+    rnd = random.Random(seed)
+    words = [''.join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(2, 10))) for _ in range(3000)]
+    prose = ' '.join(rnd.choice(words) for _ in range(size // 5))[:size]
+    line = "    result = compute_value(items[idx], key='name', limit=42)  # adjust\n"
+    code = ('def f():\n' + line * (size // len(line) + 1))[:size - 1] + '{'
+    url_tail = prose[:size - 30] + ' https://example.com/page'
+    shell = ''.join('$ ls -la /tmp/%s\n' % rnd.choice(words) for _ in range(size // 20))[:size]
+    return [('prose', prose), ('code', code), ('url-at-end', url_tail), ('shell', shell)]
+
+
+def rate(fn, routes, cases):
+    t0 = time.perf_counter()
+    for i in range(routes):
+        app, text = cases[i % len(cases)]
+        fn(app, text)
+    return routes / (time.perf_counter() - t0)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--sizes', default='1,64,1024', help='item sizes in KB, comma separated')
+    ap.add_argument('--routes', type=int, default=2000, help='routes per measurement')
+    ap.add_argument('--seed', type=int, default=7)
+    args = ap.parse_args(argv)
+
+    router = BoardRouter()
+    rules = router._rules
+    print('%-12s %8s %14s %14s %8s' % ('corpus', 'KB', 'plan route/s', 'legacy route/s', 'speedup'))
+    for kb in [int(x) for x in args.sizes.split(',') if x.strip()]:
+        for name, text in items(kb * 1024, args.seed):
+            cases = [(app, text) for app in APPS]
+            plan = rate(router.route, args.routes, cases)
+            legacy_routes = max(20, args.routes // max(1, kb // 16))
+            legacy = rate(lambda a, c: legacy_route(rules, a, c), legacy_routes, cases)
+            print('%-12s %8d %14.0f %14.0f %7.1fx' % (name, kb, plan, legacy, plan / legacy))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
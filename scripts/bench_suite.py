@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""Benchmark the capture, dedupe, search, storage and render hot paths against a baseline.
+
+Synthetic histories of each size are generated with a realistic content mix: mostly short
+snippets and URLs, some code and paragraphs, a few multi-KB logs and rare 64-256 KB dumps,
+spread over a dozen apps with ~5% repeated copies. Each case is warmed up, then run
+--repeat times, and the best time per operation is kept.
+
+Cases: HistoryStore.add_item (new and duplicate copies), get_items_by_app, search,
+fuzzy_score, Persistence.save_item/load_items, ClipboardWatcher._pick_recent_source_app,
+and MainWindow.update_list (all rows of the busiest app, then a search filter) rendered
+with an offscreen Qt platform. Storage, fuzzy and render cases are capped at --io-max
+items per size.
+
+Results are printed as a table and can be written as JSON (--out). With a baseline
+(--baseline, default scripts/bench_baseline.json when it exists) every case slower than
+the baseline by more than --threshold is reported and the exit status is 1. A fixed
+pure-Python calibration loop is timed with every run and ratios are scaled by it, so a
+uniformly slower or busier machine is not reported as a regression. Baselines are still
+machine specific: record one with --save-baseline before comparing.
+
+Usage: scripts/bench_suite.py [--sizes N,N,...] [--repeat N] [--warmup N] [--only SUBSTR] [--out FILE]
+                              [--baseline FILE] [--threshold F] [--save-baseline] [--no-gui]
+"""
+import os, sys
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+# never probe the real desktop from a benchmark
+os.environ.setdefault('CLIP_FOCUS_SOURCE', 'none')
+os.environ.setdefault('CLIP_OSASCRIPT_WORKER', '0')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import argparse
+import json
+import platform
+import random
+import string
+import tempfile
+import time
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+DEFAULT_SIZES = '1000,10000'
+DEFAULT_THRESHOLD = 0.25
+IO_MAX = 10000
+
+APPS = [('Google Chrome', 20), ('Visual Studio Code', 15), ('iTerm2', 12), ('Slack', 10), ('PyCharm', 8),
+        ('Notes', 8), ('Safari', 7), ('Terminal', 6), ('Mail', 5), ('Firefox', 4), ('Xcode', 3), ('Preview', 2)]
+# (share, kind, min chars, max chars)
+CONTENT_MIX = [
+    (0.55, 'snippet', 10, 120),
+    (0.15, 'url', 20, 120),
+    (0.13, 'code', 200, 4000),
+    (0.147, 'paragraph', 500, 5000),
+    (0.02, 'log', 4 * 1024, 32 * 1024),
+    (0.003, 'dump', 64 * 1024, 256 * 1024),
+]
+REPEAT_SHARE = 0.05
+SEARCH_QUERIES = ['import', 'https://', 'error', 'the', 'def ', 'zq', 'return value', 'localhost']
+
+
+class Corpus:
+    """`n` synthetic copies as (content, app, ts), reproducible from `seed`."""
+
+    def __init__(self, n, seed=7):
+        rnd = random.Random(seed)
+        words = [''.join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(2, 9))) for _ in range(4000)]
+        words += ['the', 'error', 'return', 'value', 'import', 'localhost']
+        prose = ' '.join(rnd.choice(words) for _ in range(60000))
+        line = "    result = compute(items[idx], key='name', limit=42)  # return value\n"
+        code = ''.join('def f%d(x):\n%s' % (i, line * rnd.randint(1, 6)) for i in range(2000))
+        log = ''.join('2026-02-07 12:%02d:%02d ERROR worker-%d failed: %s\n' % (
+            i % 60, i % 59, i % 7, ' '.join(rnd.choice(words) for _ in range(8))) for i in range(4000))
+        sources = {'snippet': prose, 'paragraph': prose, 'code': code, 'log': log, 'dump': log + code}
+        apps = [a for a, w in APPS for _ in range(w)]
+        cumulative, acc = [], 0.0
+        for share, kind, lo, hi in CONTENT_MIX:
+            acc += share
+            cumulative.append((acc, kind, lo, hi))
+
+        self.items = []
+        ts = 1.7e9
+        for i in range(n):
+            ts += rnd.uniform(0.5, 30.0)
+            if self.items and rnd.random() < REPEAT_SHARE:
+                content, app, _ = self.items[rnd.randrange(len(self.items))]
+                self.items.append((content, app, ts))
+                continue
+            r = rnd.random() * acc
+            kind, lo, hi = next((k, lo, hi) for c, k, lo, hi in cumulative if r <= c)
+            size = int(lo * (hi / float(lo)) ** rnd.random())  # log-uniform within the range
+            if kind == 'url':
+                content = 'https://example.com/%s/%d?q=%s' % (rnd.choice(words), i, rnd.choice(words))
+            else:
+                src = sources[kind]
+                start = rnd.randrange(max(1, len(src) - size))
+                # the index keeps copies unique apart from the deliberate repeats
+                content = '%d %s' % (i, src[start:start + size])
+            self.items.append((content, rnd.choice(apps), ts))
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _label(n):
+    return '%dk' % (n // 1000) if n >= 1000 and n % 1000 == 0 else str(n)
+
+
+def _best(fn, repeat, warmup=1):
+    """Run `fn` (returns (seconds, ops)) `warmup` times unmeasured, then `repeat` times; best seconds per op."""
+    for _ in range(max(0, warmup)):
+        fn()
+    best = None
+    for _ in range(max(1, repeat)):
+        seconds, ops = fn()
+        per_op = seconds / max(1, ops)
+        if best is None or per_op < best[0]:
+            best = (per_op, seconds, ops)
+    return {'per_op_us': best[0] * 1e6, 'seconds': best[1], 'ops': best[2]}
+
+
+def calibrate(rounds=7):
+    """Best time (us) of a fixed pure-Python workload; scales comparisons to the machine's current speed."""
+    best = None
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        d = {}
+        for i in range(20000):
+            k = 'k%d' % (i % 500)
+            d[k] = d.get(k, 0) + len(k)
+        sorted(d.items())
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6
+
+
+def _filled_history(corpus, limit=None):
+    from clipboard_manager.history import History
+    h = History()
+    for content, app, ts in corpus.items[:limit]:
+        h.add_item(content, source_app=app, timestamp=ts)
+    return h
+
+
+def case_add_item(corpus):
+    from clipboard_manager.history import History
+    h = History()
+    t0 = time.perf_counter()
+    for content, app, ts in corpus.items:
+        h.add_item(content, source_app=app, timestamp=ts)
+    return time.perf_counter() - t0, len(corpus)
+
+
+def case_add_item_dupe(corpus, history):
+    sample = corpus.items[-1000:]
+    t0 = time.perf_counter()
+    for content, app, ts in sample:
+        history.add_item(content, source_app=app, timestamp=ts)
+    return time.perf_counter() - t0, len(sample)
+
+
+def case_items_by_app(history):
+    t0 = time.perf_counter()
+    for app, _w in APPS:
+        history.get_items_by_app(app)
+    return time.perf_counter() - t0, len(APPS)
+
+
+def case_search(history):
+    t0 = time.perf_counter()
+    for q in SEARCH_QUERIES:
+        history.search(q)
+    return time.perf_counter() - t0, len(SEARCH_QUERIES)
+
+
+def case_fuzzy(corpus, limit):
+    from clipboard_manager.utils import fuzzy_score
+    previews = [content[:200] for content, _app, _ts in corpus.items[:limit]]
+    t0 = time.perf_counter()
+    for text in previews:
+        fuzzy_score(text, 'retrn valu')
+    return time.perf_counter() - t0, len(previews)
+
+
+def case_save_items(corpus, limit, db_path):
+    from clipboard_manager.clipboard_item import ClipboardItem
+    from clipboard_manager.storage import Persistence
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    items = [ClipboardItem(content, app) for content, app, _ts in corpus.items[:limit]]
+    p = Persistence(db_path)
+    try:
+        t0 = time.perf_counter()
+        for item in items:
+            p.save_item(item)
+        return time.perf_counter() - t0, len(items)
+    finally:
+        p.close()
+
+
+def case_load_items(db_path):
+    from clipboard_manager.storage import Persistence
+    p = Persistence(db_path)
+    try:
+        t0 = time.perf_counter()
+        rows = p.load_items()
+        return time.perf_counter() - t0, len(rows)
+    finally:
+        p.close()
+
+
+def _watcher_with_focus(events=400, seed=7):
+    from clipboard_manager.focus import FocusHistory
+    from clipboard_manager.watcher import ClipboardWatcher
+    w = ClipboardWatcher.__new__(ClipboardWatcher)
+    w._app_history = FocusHistory(classify=w._classify_app)
+    w._last_sampled_app = None
+    rnd = random.Random(seed)
+    ts = 1000.0
+    for _ in range(events):
+        ts += rnd.uniform(0.05, 1.5)
+        w._app_history.append((ts, rnd.choice(APPS)[0]))
+    return w, ts
+
+
+def case_pick_source(watcher, end_ts, calls=5000):
+    rnd = random.Random(3)
+    queries = [(end_ts - rnd.uniform(0, 60), rnd.random() < 0.3) for _ in range(calls)]
+    t0 = time.perf_counter()
+    for ts, code in queries:
+        watcher._pick_recent_source_app(ts, allow_ide=True, code_like=code, language_hint='python' if code else None)
+    return time.perf_counter() - t0, calls
+
+
+def case_render(window, query=''):
+    """Rebuild the list of the busiest app (optionally filtered); cost per rendered row."""
+    window.search_box.blockSignals(True)
+    window.search_box.setText(query)
+    window.search_box.blockSignals(False)
+    t0 = time.perf_counter()
+    window.update_list()
+    return time.perf_counter() - t0, window.list_widget.count()
+
+
+def run(sizes, repeat=3, only=None, gui=True, io_max=IO_MAX, warmup=1):
+    results = {}
+
+    def record(name, fn):
+        if only and only not in name:
+            return
+        results[name] = _best(fn, repeat, warmup)
+        r = results[name]
+        print('%-28s %12.2f us/op %10d ops %9.3f s' % (name, r['per_op_us'], r['ops'], r['seconds']))
+
+    app = None
+    if gui and not (only and 'render' not in only):
+        try:
+            from PyQt6.QtWidgets import QApplication
+            app = QApplication.instance() or QApplication([])
+        except Exception as e:
+            print('render cases skipped: %s' % (e,))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        for n in sizes:
+            corpus = Corpus(n)
+            tag = _label(n)
+            io_n = min(n, io_max)
+            record('add_item/%s' % tag, lambda: case_add_item(corpus))
+            history = _filled_history(corpus)
+            record('add_item_dupe/%s' % tag, lambda: case_add_item_dupe(corpus, history))
+            record('get_items_by_app/%s' % tag, lambda: case_items_by_app(history))
+            record('search/%s' % tag, lambda: case_search(history))
+            record('fuzzy_score/%s' % _label(io_n), lambda: case_fuzzy(corpus, io_n))
+            record('save_item/%s' % _label(io_n), lambda: case_save_items(corpus, io_n, db_path))
+            record('load_items/%s' % _label(io_n), lambda: case_load_items(db_path))
+            if app is not None:
+                from clipboard_manager.gui import MainWindow
+                window = MainWindow(history=history if io_n == n else _filled_history(corpus, io_n))
+                try:
+                    window.update_apps_dropdown()
+                    window._select_app(APPS[0][0])
+                    record('render.update_list/%s' % _label(io_n), lambda: case_render(window))
+                    record('render.filtered/%s' % _label(io_n), lambda: case_render(window, 'return value'))
+                finally:
+                    window.close()
+                    window.deleteLater()
+                    app.processEvents()
+            del history
+        watcher, end_ts = _watcher_with_focus()
+        record('pick_recent_source_app', lambda: case_pick_source(watcher, end_ts))
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, speed=1.0):
+    """[(name, baseline us/op, current us/op, ratio)] for cases slower than `threshold` allows.
+
+    `speed` is current calibration time / baseline calibration time; ratios are divided by it
+    so a uniformly slower (throttled, busier) machine does not read as a regression.
+    """
+    regressions = []
+    for name, cur in sorted(results.items()):
+        base = baseline.get(name)
+        if not base or not base.get('per_op_us'):
+            continue
+        ratio = cur['per_op_us'] / base['per_op_us'] / (speed or 1.0)
+        if ratio > 1.0 + threshold:
+            regressions.append((name, base['per_op_us'], cur['per_op_us'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--sizes', default=DEFAULT_SIZES, help='history sizes, comma separated (e.g. 1000,10000,100000)')
+    ap.add_argument('--repeat', type=int, default=3, help='runs per case; the best is kept')
+    ap.add_argument('--warmup', type=int, default=1, help='unmeasured runs before each case')
+    ap.add_argument('--only', help='run only cases whose name contains this')
+    ap.add_argument('--io-max', type=int, default=IO_MAX, help='cap on items for storage, fuzzy and render cases')
+    ap.add_argument('--no-gui', action='store_true', help='skip the offscreen render cases')
+    ap.add_argument('--out', help='write results JSON here')
+    ap.add_argument('--baseline', default=None, help='baseline JSON (default scripts/bench_baseline.json)')
+    ap.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='allowed slowdown, 0.25 = 25%%')
+    ap.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    args = ap.parse_args(argv)
+
+    sizes = [int(x) for x in args.sizes.split(',') if x.strip()]
+    calibration = calibrate()
+    results = run(sizes, repeat=args.repeat, only=args.only, gui=not args.no_gui, io_max=args.io_max,
+                  warmup=args.warmup)
+    doc = {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                 'machine': platform.machine(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 'sizes': sizes, 'repeat': args.repeat, 'warmup': args.warmup,
+                 'calibration_us': calibration},
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=2, sort_keys=True)
+
+    baseline_path = args.baseline or DEFAULT_BASELINE
+    if args.save_baseline:
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=2, sort_keys=True)
+        print('baseline written to %s' % (baseline_path,))
+        return 0
+    if not os.path.exists(baseline_path):
+        if args.baseline:
+            print('baseline %s not found' % (baseline_path,))
+            return 2
+        return 0
+    with open(baseline_path, encoding='utf-8') as f:
+        base_doc = json.load(f)
+    base_cal = base_doc.get('meta', {}).get('calibration_us')
+    # re-measure after the run too and keep the faster reading, like the cases themselves
+    calibration = min(calibration, calibrate())
+    speed = calibration / base_cal if base_cal else 1.0
+    print('machine speed vs baseline: %.2fx slower' % (speed,) if speed >= 1 else
+          'machine speed vs baseline: %.2fx faster' % (1.0 / speed,))
+    regressions = compare(results, base_doc.get('results', {}), args.threshold, speed)
+    for name, base, cur, ratio in regressions:
+        print('REGRESSION %-28s %10.2f -> %10.2f us/op (%.2fx)' % (name, base, cur, ratio))
+    if not regressions:
+        print('no regressions beyond %.0f%% against %s' % (args.threshold * 100, baseline_path))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,18 +9,24 @@ Usage:
   python scripts/migrate_boards.py --db ./.local/persistence.db --apply
   python scripts/migrate_boards.py --db ./.local/persistence.db
 
+Rows are streamed in chunks and routed with `BoardRouter.route_many` (in a process pool
+once the table has at least --parallel-min rows); with --apply each chunk's changes are
+written with one executemany, so memory stays bounded for large histories.
+
 The script prints a summary and can optionally apply updates in-place.
 """
 import sqlite3
 import argparse
 import os
 import sys
+from itertools import chain, islice
 _repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if _repo_root not in sys.path:
     sys.path.insert(0, _repo_root)
 
 try:
-    from clipboard_manager.boards import BoardRouter
+    from clipboard_manager.boards import BoardRouter, ROUTE_CHUNK_SIZE
+    from clipboard_manager.storage import iter_rows
 except Exception as exc:
     print('\nERROR: Failed to import package `clipboard_manager`.', file=sys.stderr)
     print('Exception:', repr(exc), file=sys.stderr)
@@ -39,12 +45,8 @@ def open_db(path):
     return conn
 
 
-def compute_board(router, source_app, content):
-    try:
-        b = router.route(source_app, content)
-        return b.name if hasattr(b, 'name') else str(b)
-    except Exception:
-        return 'OTHER'
+def _row_key(row):
+    return (row['source_app'] or '', row['content'] or '')
 
 
 def main():
@@ -52,50 +54,58 @@ def main():
     p.add_argument('--db', default='./.local/persistence.db', help='Path to SQLite DB')
     p.add_argument('--debug', action='store_true', help='Print debug info (first rows and computed values)')
     p.add_argument('--apply', action='store_true', help='Apply updates to DB')
+    p.add_argument('--chunk-size', type=int, default=ROUTE_CHUNK_SIZE, help='Rows read, routed and written per chunk')
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes for large tables')
+    p.add_argument('--parallel-min', type=int, default=50000, help='Use worker processes from this many rows on')
     args = p.parse_args()
 
     conn = open_db(args.db)
-    cur = conn.cursor()
-    cur.execute('SELECT id, source_app, content, board FROM items')
-    rows = cur.fetchall()
+    total_rows = conn.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+    rows = iter_rows(conn, 'items', ('id', 'source_app', 'content', 'board'), args.chunk_size)
     if args.debug:
+        head = list(islice(rows, 5))
         print('\nDEBUG: first 5 rows from DB:')
-        for r in rows[:5]:
+        for r in head:
             print('  id=', r['id'], 'board=', r['board'], 'app=', r['source_app'], 'preview=', (r['content'] or '')[:80].replace('\n','\\n'))
+        rows = chain(head, rows)
     router = BoardRouter()
+    workers = args.workers if total_rows >= args.parallel_min else 0
 
     changed = 0
     total = 0
-    updates = []
-    for r in rows:
+    sample = []
+    batch = []
+    for r, board in router.route_many(rows, key=_row_key, workers=workers, chunk_size=args.chunk_size):
         total += 1
-        sid = r['id']
-        src = r['source_app'] if r['source_app'] is not None else ''
-        content = r['content'] if r['content'] is not None else ''
         stored = (r['board'] or 'OTHER')
-        computed = compute_board(router, src, content)
-        if computed != stored:
-            changed += 1
-            updates.append((computed, sid, stored, src, content[:80].replace('\n','\\n')))
-
-    print(f'Total rows: {total}, would change: {changed}')
+        if board.name == stored:
+            continue
+        changed += 1
+        if len(sample) < 50:
+            sample.append((board.name, r['id'], stored, r['source_app'] or '', (r['content'] or '')[:80].replace('\n', '\\n')))
+        if args.apply:
+            batch.append((board.name, r[0]))
+            if len(batch) >= args.chunk_size:
+                _write(conn, batch)
+                batch = []
+    if args.apply and batch:
+        _write(conn, batch)
+
+    print(f'Total rows: {total}, {"changed" if args.apply else "would change"}: {changed}')
     if changed:
         print('\nSample changes (computed -> stored)')
-        for new, sid, old, src, preview in updates[:50]:
+        for new, sid, old, src, preview in sample:
             print(f'{new:10} <- {old:10}  id={sid} app={src} preview="{preview}"')
-
     if args.apply and changed:
-        print('\nApplying updates...')
-        for new, sid, old, src, preview in updates:
-            try:
-                cur.execute('UPDATE items SET board=? WHERE id=?', (new, sid))
-            except Exception as e:
-                print('ERROR updating', sid, e)
-        conn.commit()
         print('Applied updates:', changed)
 
     conn.close()
 
+
+def _write(conn, batch):
+    with conn:
+        conn.executemany('UPDATE items SET board=? WHERE rowid=?', batch)
+
 if __name__ == '__main__':
     main()
 
@@ -3,11 +3,11 @@
 Seeds history and runs pick/score logic, printing results.
 """
 import time
-from collections import deque
+from clipboard_manager.focus import FocusHistory
 from clipboard_manager.watcher import ClipboardWatcher
 
 w = object.__new__(ClipboardWatcher)
-w._app_history = deque()
+w._app_history = FocusHistory(maxlen=1000, classify=w._classify_app)
 w._last_sampled_app = None
 w._ignore_until = 0.0
 
@@ -5,13 +5,13 @@ if repo_root not in sys.path:
     sys.path.insert(0, repo_root)
 
 import time
-from collections import deque
+from clipboard_manager.focus import FocusHistory
 from clipboard_manager.watcher import ClipboardWatcher
 
 out = []
 
 w = ClipboardWatcher.__new__(ClipboardWatcher)
-w._app_history = deque()
+w._app_history = FocusHistory(maxlen=1000, classify=w._classify_app)
 w._last_sampled_app = None
 w._ignore_until = 0.0
 
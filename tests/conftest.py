@@ -1,3 +1,28 @@
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# probes in the unit tests mock subprocess.run; keep the long-lived osascript helper out of the way
+os.environ.setdefault('CLIP_OSASCRIPT_WORKER', '0')
+# tests drive focus events explicitly (ManualFocusSource) instead of watching the desktop
+os.environ.setdefault('CLIP_FOCUS_SOURCE', 'none')
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _reset_probe_stats():
+    # probe failures put a method on cooldown; don't let that leak between tests
+    from clipboard_manager import utils
+    utils.reset_probe_stats()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _restore_settings():
+    # HistoryStore setters write the shared settings; keep one test's toggles out of the next
+    from clipboard_manager import settings
+    with settings._lock:
+        saved = dict(settings._settings)
+    yield
+    with settings._lock:
+        settings._settings = saved
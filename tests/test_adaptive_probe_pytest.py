@@ -0,0 +1,84 @@
+from clipboard_manager import probes, utils
+
+
+class FakeBackend(probes.ProbeBackend):
+    def __init__(self, appkit=(), osascript=(), pyobjc=True):
+        self._appkit = list(appkit)
+        self._osa = list(osascript)
+        self._pyobjc = pyobjc
+        self.clock = 0.0
+        self.calls = {'appkit': 0, 'osascript': 0}
+
+    def has_pyobjc(self):
+        return self._pyobjc
+
+    def appkit(self):
+        self.calls['appkit'] += 1
+        return self._appkit.pop(0) if self._appkit else None
+
+    def osascript(self, timeout):
+        self.calls['osascript'] += 1
+        val = self._osa.pop(0) if self._osa else None
+        if isinstance(val, Exception):
+            raise val
+        return val
+
+    def now(self):
+        return self.clock
+
+    def sleep(self, seconds):
+        self.clock += seconds
+
+
+def _with(be):
+    prev = probes.set_backend(be)
+    try:
+        return utils.get_frontmost_app()
+    finally:
+        probes.set_backend(prev)
+
+
+def test_stops_once_two_samples_agree():
+    be = FakeBackend(appkit=['Safari'] * 5)
+    assert _with(be) == 'Safari'
+    assert be.calls['appkit'] == 2
+    assert be.clock < 0.005
+    assert be.calls['osascript'] == 0
+
+
+def test_disagreement_keeps_sampling_with_backoff():
+    be = FakeBackend(appkit=['Safari', 'Mail', 'Mail'])
+    assert _with(be) == 'Mail'
+    assert be.calls['appkit'] == 3
+    assert abs(be.clock - (utils.PROBE_MIN_DELAY + 2 * utils.PROBE_MIN_DELAY)) < 1e-9
+
+
+def test_osascript_hard_failure_is_remembered():
+    be = FakeBackend(osascript=[RuntimeError('no osascript')] * 50, pyobjc=False)
+    for rounds in range(1, utils.PROBE_FAIL_ROUNDS + 1):
+        assert _with(be) == 'Unknown App'
+        assert be.calls['osascript'] == 3 * rounds
+    assert utils.get_probe_stats()['osascript']['failed_until'] > be.clock
+    assert _with(be) == 'Unknown App'
+    assert be.calls['osascript'] == 3 * utils.PROBE_FAIL_ROUNDS
+
+
+def test_hung_osascript_stops_early_and_one_bad_round_is_forgiven():
+    # timeouts come back as None: they count toward the early stop like raised errors
+    be = FakeBackend(osascript=[None] * 3 + ['Mail'] * 3, pyobjc=False)
+    assert _with(be) == 'Unknown App'
+    assert be.calls['osascript'] == 3
+    st = utils.get_probe_stats()['osascript']
+    assert st['failed_rounds'] == 1 and st['failed_until'] == 0.0
+    assert _with(be) == 'mail'
+    assert utils.get_probe_stats()['osascript']['failed_rounds'] == 0
+
+
+def test_probe_stats_track_latency_and_success():
+    be = FakeBackend(appkit=['Notes', 'Python', 'Notes'])
+    _with(be)
+    st = utils.get_probe_stats()['appkit']
+    assert st['calls'] == 3
+    assert 0.0 < st['success'] < 1.0
+    utils.reset_probe_stats()
+    assert utils.get_probe_stats() == {}
@@ -0,0 +1,39 @@
+import random
+from clipboard_manager import app_classifier, settings
+from clipboard_manager.app_classifier import AppClassifier, KeywordMatcher
+
+
+def test_keyword_matcher_matches_naive_substring_scan():
+    kws = ['gr', 'grace', 'grap', 'code', 'code -', 'visual studio code', 'python', 'python3', 'idea']
+    m = KeywordMatcher(kws)
+    rnd = random.Random(3)
+    alphabet = 'grace visualstudio-pythn3ide'
+    for _ in range(500):
+        text = ''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 30)))
+        assert m.find(text) == {k for k in kws if k in text}
+
+
+def test_canonical_name_and_categories():
+    c = AppClassifier()
+    vs = c.classify('Code - main.py')
+    assert vs.canonical == 'Visual Studio Code' and vs.category == 'ide'
+    assert c.classify('Google Chrome').canonical == 'Chrome'
+    assert c.classify('Google Chrome').is_browser
+    assert c.classify('Window Server').ignored
+    assert c.classify('Terminal').category == 'self'
+    assert c.classify('  Notes ').canonical == 'Notes'
+    assert c.classify('Notes').category == 'other'
+    assert c.classify('Slack') is c.classify('Slack')
+
+
+def test_settings_extend_aliases_and_categories():
+    try:
+        settings.set_('app_aliases', {'arc': 'Arc'})
+        settings.set_('app_categories', {'browser': ['arc'], 'ignored': 'screensaver'})
+        arc = app_classifier.classify('Arc Browser')
+        assert arc.canonical == 'Arc' and arc.is_browser
+        assert app_classifier.classify('ScreenSaverEngine').ignored
+    finally:
+        settings.set_('app_aliases', {})
+        settings.set_('app_categories', {})
+    assert app_classifier.classify('Arc Browser').canonical == 'Arc Browser'
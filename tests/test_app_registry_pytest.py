@@ -0,0 +1,53 @@
+import time
+from PyQt6.QtWidgets import QApplication
+from clipboard_manager.history import HistoryStore
+from clipboard_manager.gui import MainWindow
+
+
+def test_app_stats_counts_and_recency():
+    hs = HistoryStore()
+    v0 = hs.get_apps_version()
+    hs.add_item('one', source_app='Old', timestamp=time.time() - 60)
+    hs.add_item('two', source_app='New')
+    hs.add_item('three', source_app='New')
+    v1 = hs.get_apps_version()
+    assert v1 == v0 + 2
+    stats = hs.get_app_stats()
+    assert [(a, c) for a, c, _ in stats] == [('New', 2), ('Old', 1)]
+    assert hs.get_apps() == ['New', 'Old']
+    hs.add_item('four', source_app='New')
+    assert hs.get_apps_version() == v1
+
+
+def test_app_disappears_when_last_item_expires():
+    import clipboard_manager.history as hmod
+    orig = hmod.TEMPORARY_TOKEN_SECONDS
+    try:
+        hmod.TEMPORARY_TOKEN_SECONDS = 1
+        hs = HistoryStore()
+        hs.add_item('eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.abc.def', source_app='Vault')
+        v = hs.get_apps_version()
+        time.sleep(2)
+        assert hs.get_apps() == []
+        assert hs.get_apps_version() == v + 1
+    finally:
+        hmod.TEMPORARY_TOKEN_SECONDS = orig
+
+
+def test_dropdown_shows_counts_and_updates_in_place(qtbot):
+    app = QApplication.instance() or QApplication([])
+    w = MainWindow()
+    qtbot.addWidget(w)
+    w.history.add_item('a', source_app='Alpha')
+    w.update_apps_dropdown()
+    assert w.app_dropdown.itemText(0) == 'Alpha (1)'
+    assert w._current_app() == 'Alpha'
+    w.history.add_item('b', source_app='Alpha')
+    w.update_apps_dropdown()
+    assert w.app_dropdown.count() == 1
+    assert w.app_dropdown.itemText(0) == 'Alpha (2)'
+    w.history.add_item('c', source_app='Beta')
+    w.update_apps_dropdown()
+    assert w.app_dropdown.count() == 2
+    assert w._current_app() == 'Alpha'
+    w.close()
@@ -0,0 +1,77 @@
+import random
+
+from clipboard_manager.boards import Board, BoardRouter, _Rule, _literal_prefix
+
+
+def _rule_by_rule(rules, app, content):
+    for r in rules:
+        try:
+            if r.matches(app, content):
+                return r.board
+        except Exception:
+            continue
+    return Board.OTHER
+
+
+def test_plan_matches_rule_by_rule_evaluation():
+    specs = BoardRouter._default_rules_spec[:-1] + [
+        {'predicates': [{'type': 'startswith', 'value': '#!', 'field': 'content'}], 'board': 'COMMANDS'},
+        {'predicates': [{'type': 'app_regex', 'pattern': r'^sl'}, {'type': 'content_contains', 'value': 'HELLO'}], 'board': 'NOTES'},
+        {'predicates': [{'type': 'content_regex', 'pattern': r'(ab)\1'}], 'board': 'CODE'},
+        {'predicates': [{'type': 'bogus'}], 'board': 'CODE'},
+        {'predicates': [], 'board': 'CODE'},
+    ]
+    router = BoardRouter(specs)
+    rules = [_Rule(s) for s in specs]
+    rnd = random.Random(3)
+    apps = ['Google Chrome', ' iTerm2 ', 'Visual Studio Code', 'Slack', '', None]
+    frags = ['HTTPS://x', 'http:/', '$ ls', '{', 'hello', '#!', '  ', 'abAB', 'é']
+    for _ in range(3000):
+        app = rnd.choice(apps)
+        content = ''.join(rnd.choice(frags) for _ in range(rnd.randint(0, 4)))
+        assert router.route(app, content) == _rule_by_rule(rules, app, content), (app, content)
+
+
+def test_content_scan_is_capped():
+    router = BoardRouter(max_scan=100)
+    assert router.route('Notes', 'x' * 50 + ' https://a.b') == Board.LINKS
+    assert router.route('Notes', 'x' * 200 + ' https://a.b') == Board.NOTES
+
+
+def test_literal_prefix():
+    assert _literal_prefix(r'https?://') == 'http'
+    assert _literal_prefix(r'http|ftp') is None
+    assert _literal_prefix(r'\bword') is None
+
+
+def test_route_many_keeps_order_in_process_and_pool():
+    router = BoardRouter()
+    rows = [(i, app, text) for i, (app, text) in enumerate(
+        [('Google Chrome', 'https://x'), ('iTerm2', '$ ls'), ('Notes', 'plain'), ('Code', 'a { b')] * 25)]
+    expected = [(row, router.route(row[1], row[2])) for row in rows]
+    key = lambda row: (row[1], row[2])
+    assert list(router.route_many(rows, key=key)) == expected
+    assert list(router.route_many(iter(rows), key=key, workers=2, chunk_size=7)) == expected
+
+
+def test_iter_rows_streams_while_updating(tmp_path):
+    import sqlite3
+    from clipboard_manager.storage import iter_rows
+    conn = sqlite3.connect(str(tmp_path / 'b.db'))
+    conn.row_factory = sqlite3.Row
+    conn.execute('CREATE TABLE items (id TEXT PRIMARY KEY, content TEXT, source_app TEXT, board TEXT)')
+    conn.executemany('INSERT INTO items VALUES (?, ?, ?, ?)',
+                     [(str(i), 'https://a/%d' % i if i % 2 else 'note', 'Chrome', None) for i in range(25)])
+    router = BoardRouter()
+    rows = iter_rows(conn, 'items', ('id', 'source_app', 'content'), chunk_size=4)
+    updates = []
+    for row, board in router.route_many(rows, key=lambda r: (r['source_app'], r['content'])):
+        updates.append((board.name, row[0]))
+        if len(updates) == 10:
+            # writing between chunks must not disturb the stream
+            conn.executemany('UPDATE items SET board=? WHERE rowid=?', updates[-10:])
+    conn.executemany('UPDATE items SET board=? WHERE rowid=?', updates[10:])
+    assert len(updates) == 25
+    boards = dict(conn.execute('SELECT id, board FROM items').fetchall())
+    assert boards['1'] == 'LINKS' and boards['2'] == 'NOTES'
+    conn.close()
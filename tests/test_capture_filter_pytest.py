@@ -0,0 +1,50 @@
+from clipboard_manager import settings
+from clipboard_manager.capture_filter import CaptureFilter, BLOCKED, DISABLED
+from clipboard_manager.history import HistoryStore
+
+
+def test_filter_matches_like_substring_loop():
+    entries = ['1password', 'keychain', 'pass', 'Bitwarden ']
+    f = CaptureFilter(entries, {'Muted': False})
+    for app in ('1Password 8', 'Keychain Access', 'Passport', 'bitwarden', 'Safari', ''):
+        expected = any(e.strip().lower() in app.lower() for e in entries) if app else False
+        assert f.is_blocked(app) is expected, app
+    assert f.decide('Muted') == DISABLED and f.decide('KeyChain') == BLOCKED and f.decide('Safari') is None
+    assert not CaptureFilter(entries, secret_safe=False).is_blocked('1Password')
+    assert not CaptureFilter([]).is_blocked('anything')
+
+
+def test_decision_cache_follows_filter_version():
+    h = HistoryStore()
+    h.set_blocklist(['vault'])
+    assert h.add_item('a', source_app='Vault App') is None
+    v = h._filter.version
+    h.set_secret_safe_enabled(False)
+    assert h._filter.version > v
+    assert h.add_item('a', source_app='Vault App') is not None
+    h.set_app_capture_enabled('Vault App', False)
+    assert h.add_item('b', source_app='Vault App') is None
+    assert h.is_app_capture_enabled('Other')
+
+
+def test_per_app_toggle_setting_applies():
+    h = HistoryStore()
+    try:
+        settings.set_('per_app_capture_toggle', {'Notes': False})
+        assert not h.is_app_capture_enabled('Notes')
+        assert h.add_item('x', source_app='Notes') is None
+    finally:
+        settings.set_('per_app_capture_toggle', {})
+    assert h.is_app_capture_enabled('Notes')
+
+
+def test_runtime_toggle_survives_a_settings_map_save():
+    h = HistoryStore()
+    h.set_app_capture_enabled('Preview', False)
+    assert settings.get('per_app_capture_toggle') == {'Preview': False}
+    # the Settings dialog edits the stored map and saves it back
+    toggles = dict(settings.get('per_app_capture_toggle') or {})
+    toggles['Mail'] = False
+    settings.set_('per_app_capture_toggle', toggles)
+    assert not h.is_app_capture_enabled('Preview')
+    assert not h.is_app_capture_enabled('Mail')
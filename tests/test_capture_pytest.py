@@ -0,0 +1,111 @@
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QMimeData, QUrl
+from PyQt6.QtGui import QColor, QImage
+from PyQt6.QtWidgets import QApplication
+
+from clipboard_manager.blobs import BlobStore, blob_digest
+from clipboard_manager.capture import build_capture, snapshot_mime, image_digest, is_image_label
+from clipboard_manager.history import History
+from clipboard_manager.storage import Persistence
+from clipboard_manager.watcher import ClipboardWatcher
+
+
+def _png(w=320, h=200):
+    img = QImage(w, h, QImage.Format.Format_RGB32)
+    img.fill(QColor('red'))
+    buf = QBuffer()
+    buf.open(QIODevice.OpenModeFlag.WriteOnly)
+    img.save(buf, 'PNG')
+    return bytes(buf.data())
+
+
+def test_blob_store_disk_roundtrip(tmp_path):
+    store = BlobStore(str(tmp_path / 'blobs'))
+    d = store.put(b'payload')
+    assert d == blob_digest(b'payload')
+    assert store.get(d) == b'payload' and d in store
+    store.flush()
+    assert store.path(d) and open(store.path(d), 'rb').read() == b'payload'
+    assert BlobStore(str(tmp_path / 'blobs')).get(d) == b'payload'
+    store.delete(d)
+    assert d not in store and store.get(d) is None
+    store.close()
+
+
+def test_build_capture_kinds():
+    store = BlobStore()
+    mime = QMimeData()
+    mime.setText('hello')
+    mime.setHtml('<b>hello</b>')
+    res = build_capture(snapshot_mime(mime), store)
+    assert res.kind == 'rich' and res.content == 'hello'
+    assert store.get(res.blobs['text/html']) == b'<b>hello</b>'
+
+    png = _png()
+    mime = QMimeData()
+    mime.setData('image/png', QByteArray(png))
+    res = build_capture(snapshot_mime(mime), store)
+    assert res.kind == 'image' and is_image_label(res.content)
+    assert store.get(image_digest(res.blobs)) == png
+
+    mime = QMimeData()
+    mime.setUrls([QUrl.fromLocalFile('/tmp/a b.txt')])
+    res = build_capture(snapshot_mime(mime), store)
+    assert res.kind == 'files' and res.content == '/tmp/a b.txt'
+
+    mime = QMimeData()
+    mime.setText('plain')
+    assert not snapshot_mime(mime).is_rich()
+
+
+def test_history_persists_kind_and_blobs(tmp_path):
+    p = Persistence(str(tmp_path / 'db.sqlite'))
+    h = History(persistence=p)
+    d = h.blobs.put(b'img')
+    it = h.add_item('Image (PNG, 3 B)', source_app='Preview', kind='image', blobs={'image/png': d})
+    # same text with different payloads is a different copy
+    other = h.add_item('Image (PNG, 3 B)', source_app='Preview', kind='image', blobs={'image/png': h.blobs.put(b'gif')})
+    assert other is not it
+    h.blobs.flush()
+    p2 = Persistence(str(tmp_path / 'db.sqlite'))
+    h2 = History(persistence=p2)
+    loaded = h2.get_item_by_id(it.id)
+    assert loaded.kind == 'image' and loaded.blobs == {'image/png': d}
+    assert h2.blobs.get(d) == b'img'
+    p.close()
+    p2.close()
+
+
+def test_watcher_emits_rich_snapshot(monkeypatch, qtbot):
+    QApplication.instance() or QApplication([])
+    watcher = ClipboardWatcher()
+    rich, plain = [], []
+    watcher.rich_clipboard_changed.connect(lambda snap, app, ts: rich.append(snap))
+    watcher.clipboard_changed.connect(lambda text, app, ts: plain.append(text))
+
+    class FakeClipboard:
+        def __init__(self, mime):
+            self._mime = mime
+        def mimeData(self):
+            return self._mime
+        def text(self):
+            return self._mime.text()
+
+    mime = QMimeData()
+    mime.setData('image/png', QByteArray(_png()))
+    monkeypatch.setattr(watcher, 'clipboard', FakeClipboard(mime))
+    watcher._on_clipboard_change()
+    assert len(rich) == 1 and rich[0].image_format == 'image/png' and not plain
+
+
+def test_thumbnail_decoded_on_worker(qtbot):
+    from clipboard_manager.gui import ThumbnailLoader, decode_thumbnail
+    QApplication.instance() or QApplication([])
+    img = decode_thumbnail(_png(320, 200), 48)
+    assert img.width() == 48 and img.height() == 30
+    store = BlobStore()
+    d = store.put(_png())
+    loader = ThumbnailLoader(store)
+    assert loader.pixmap(d) is None
+    with qtbot.waitSignal(loader.loaded, timeout=5000):
+        pass
+    assert loader.pixmap(d).width() == 48
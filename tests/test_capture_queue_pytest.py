@@ -0,0 +1,102 @@
+import os
+import threading
+
+from clipboard_manager import settings
+from clipboard_manager.capture_queue import CaptureQueue, CaptureRequest, make_ingest
+from clipboard_manager.history import History
+
+
+def _blocked_queue(**kw):
+    """Queue whose worker is parked on the first capture until `gate` is set."""
+    gate = threading.Event()
+    started = threading.Event()
+    seen = []
+
+    def ingest(req):
+        started.set()
+        gate.wait(5)
+        seen.append(req.content)
+    q = CaptureQueue(ingest, **kw)
+    q.submit(CaptureRequest('first', 'App', 0.0))
+    assert started.wait(5)
+    return q, gate, seen
+
+
+def test_coalesces_consecutive_identical():
+    q, gate, seen = _blocked_queue(maxsize=10)
+    for _ in range(5):
+        q.submit(CaptureRequest('same', 'App', 1.0))
+    q.submit(CaptureRequest('same', 'Other', 1.0))
+    gate.set()
+    assert q.drain(5)
+    assert seen == ['first', 'same', 'same']
+    st = q.stats()
+    assert st['coalesced'] == 4 and st['processed'] == 3 and st['depth'] == 0
+    q.stop()
+
+
+def test_overflow_policies():
+    expected = {
+        'drop_oldest': ['first', 'c', 'd'],
+        'drop_newest': ['first', 'a', 'b'],
+        'merge': ['first', 'a', 'd'],
+    }
+    for policy, want in expected.items():
+        q, gate, seen = _blocked_queue(maxsize=2, policy=policy)
+        for c in 'abcd':
+            q.submit(CaptureRequest(c, 'App', 1.0))
+        assert q.depth() == 2
+        gate.set()
+        assert q.drain(5)
+        assert seen == want, policy
+        st = q.stats()
+        assert st['dropped' if policy != 'merge' else 'merged'] == 2
+        q.stop()
+
+
+def test_policy_follows_settings():
+    q = CaptureQueue(lambda req: None)
+    settings.set_('capture_overflow_policy', 'merge')
+    settings.set_('capture_queue_size', 3)
+    try:
+        assert q.policy == 'merge' and q.maxsize == 3
+    finally:
+        settings.set_('capture_overflow_policy', 'drop_oldest')
+        settings.set_('capture_queue_size', 64)
+
+
+def test_ingest_adds_to_history_off_thread():
+    h = History()
+    results = []
+    q = CaptureQueue(make_ingest(h), on_result=lambda req, item: results.append((threading.current_thread().name, item)))
+    q.submit(CaptureRequest('hello queue', 'Editor', 1.0))
+    assert q.drain(5)
+    assert results[0][0] == 'capture-queue' and results[0][1].content == 'hello queue'
+    assert h.search('hello queue', source_app='Editor')
+    q.stop()
+
+
+def _blob_files(root):
+    return [f for _d, _s, files in os.walk(str(root)) for f in files]
+
+
+def test_blocked_and_disabled_apps_leave_no_blobs(tmp_path):
+    from clipboard_manager.blobs import BlobStore
+    from clipboard_manager.capture import MimeSnapshot
+    root = tmp_path / 'blobs'
+    h = History(blobs=BlobStore(str(root)))
+    h.set_app_capture_enabled('Preview', False)
+    q = CaptureQueue(make_ingest(h))
+    q.submit(CaptureRequest('secret', '1Password 8', 1.0, snapshot=MimeSnapshot('secret', html=b'<b>secret</b>')))
+    q.submit(CaptureRequest('', 'Preview', 2.0, snapshot=MimeSnapshot(image_format='image/png', image=b'png')))
+    assert q.drain(5)
+    h.blobs.flush()
+    assert h.items == [] and _blob_files(root) == []
+
+    # anything else add_item turns down releases the payloads it was handed
+    h.add_item = lambda *a, **k: None
+    q.submit(CaptureRequest('kept?', 'Editor', 3.0, snapshot=MimeSnapshot('kept?', html=b'<i>kept?</i>')))
+    assert q.drain(5)
+    h.blobs.flush()
+    assert _blob_files(root) == []
+    q.stop()
@@ -0,0 +1,82 @@
+from clipboard_manager import content_analysis
+from clipboard_manager.boards import Board, BoardRouter
+from clipboard_manager.content_analysis import ContentAnalysis, ContentAnalyzer, analysis_key, classify
+from clipboard_manager.focus import FocusHistory
+from clipboard_manager.history import History
+from clipboard_manager.watcher import ClipboardWatcher
+
+
+def test_classify_kinds_and_languages():
+    assert classify('https://example.com/a?b=1').kind == 'url'
+    assert classify('see https://example.com').kind == 'text'
+    assert classify('{"a": [1, 2]}').kind == 'json'
+    assert classify('$ ls -la').kind == 'command'
+    py = classify('def f(x):\n    return x + 1\n')
+    assert py.kind == 'code' and py.language == 'python' and py.code_like
+    assert classify('const a = 1;\nlet b = a + 2;').language == 'javascript'
+    assert classify('Lunch at noon?\nSure.').kind == 'text'
+
+
+def test_analyzer_is_a_bounded_lru():
+    a = ContentAnalyzer(maxsize=2)
+    first = a.analyze('x = 1')
+    assert a.analyze('x = 1') is first and a.hits == 1
+    a.analyze('two')
+    a.analyze('three')
+    a.analyze('x = 1')
+    assert a.misses == 4
+
+
+def test_analysis_key_is_bounded_for_large_copies():
+    big = 'log line\n' * 500000
+    assert analysis_key(big + 'tail one') == analysis_key(big + 'tail two')
+    assert analysis_key(big) != analysis_key('other\n' + big)
+    # short JSON-looking text is parsed in full, so all of it is part of the key
+    doc = '{"items": [' + '1, ' * 5000
+    assert analysis_key(doc + '2]}') != analysis_key(doc + '2,')
+    assert classify(doc + '2]}').kind == 'json' and classify(doc + '2,').kind != 'json'
+
+
+def test_capture_reuses_watcher_analysis_and_search_filters():
+    analyzer = content_analysis.get_analyzer()
+    analyzer.clear()
+    code = 'def handler(event):\n    return event\n'
+    analyzer.analyze(code)  # what the watcher does before emitting
+    hits = analyzer.hits
+    h = History()
+    it = h.add_item(code, source_app='PyCharm')
+    assert analyzer.hits == hits + 1
+    assert it.analysis.kind == 'code' and it.analysis.language == 'python'
+    h.add_item('https://example.com/docs', source_app='Safari')
+    h.add_item('notes about the handler', source_app='Notes')
+    assert [i.content for i in h.search('kind:code')] == [code]
+    assert [i.content for i in h.search('kind:url example')] == ['https://example.com/docs']
+    assert [i.content for i in h.search('lang:python handler')] == [code]
+    assert len(h.search('handler')) == 2
+
+
+def test_code_copy_attributed_to_recent_ide():
+    w = ClipboardWatcher.__new__(ClipboardWatcher)
+    w._app_history = FocusHistory(classify=w._classify_app)
+    w._last_sampled_app = None
+    for ts, name in [(8.0, 'PyCharm'), (9.5, 'Brave Browser')]:
+        w._app_history.append((ts, name))
+    assert w.attribute_source(9.6) == 'Brave Browser'
+    assert w.attribute_source(9.6, ContentAnalysis('text')) == 'Brave Browser'
+    assert w.attribute_source(9.6, ContentAnalysis('code', 'python', 0.9)) == 'PyCharm'
+    assert w.attribute_source(9.6, ContentAnalysis('code', 'python', 0.3)) == 'Brave Browser'
+    # the IDE is reported under its canonical name, like any other attribution
+    w._pick_recent_source_app = lambda ts, **kw: 'pycharm community edition'
+    assert w.attribute_source(9.6, ContentAnalysis('code', 'python', 0.9)) == 'PyCharm'
+
+
+def test_router_content_kind_predicate():
+    router = BoardRouter([
+        {'predicates': [{'type': 'content_kind', 'value': 'json'}], 'board': 'CODE'},
+        {'predicates': [{'type': 'content_language', 'value': 'python'}], 'board': 'CODE'},
+        {'predicates': [{'type': 'always', 'value': True}], 'board': 'NOTES'},
+    ])
+    assert router.route('Any', '{"k": 1}') == Board.CODE
+    assert router.route('Any', 'import os\nimport sys') == Board.CODE
+    assert router.route('Any', 'plain words') == Board.NOTES
+    assert router.route('Any', 'plain words', ContentAnalysis('json', 'json', 0.9)) == Board.CODE
@@ -0,0 +1,48 @@
+from clipboard_manager.focus import FocusHistory, FocusInfo
+from clipboard_manager.watcher import ClipboardWatcher
+
+
+def test_ring_buffer_keeps_latest_and_iterates_as_tuples():
+    h = FocusHistory(maxlen=3)
+    for i in range(10):
+        h.append((float(i), 'App%d' % i))
+    assert len(h) == 3
+    assert list(h) == [(7.0, 'App7'), (8.0, 'App8'), (9.0, 'App9')]
+    assert list(reversed(h))[0] == (9.0, 'App9')
+
+
+def test_window_query_and_out_of_order_insert():
+    h = FocusHistory(maxlen=10)
+    for ts, name in [(1.0, 'A'), (2.0, 'B'), (4.0, 'D')]:
+        h.add(ts, name)
+    h.add(3.0, 'C')
+    assert [n for _, n, _ in h.window(2.0, 3.5)] == ['B', 'C']
+    assert [n for _, n, _ in h.window(3.5)] == ['D']
+    assert h.window(5.0) == []
+
+
+def test_classification_runs_once_per_name():
+    seen = []
+
+    def classify(name):
+        seen.append(name)
+        return FocusInfo(name)
+
+    h = FocusHistory(classify=classify)
+    for i in range(20):
+        h.add(float(i), 'Safari' if i % 2 else 'Slack')
+    assert sorted(seen) == ['Safari', 'Slack']
+
+
+def test_watcher_classifies_and_picks_from_window():
+    w = ClipboardWatcher.__new__(ClipboardWatcher)
+    w._app_history = FocusHistory(classify=w._classify_app)
+    w._last_sampled_app = None
+    info = w._app_history.info('Brave Browser')
+    assert info.is_browser and info.weight == 0.6 and not info.is_ide
+    assert w._app_history.info('Window Server').ignored
+    for ts, name in [(0.0, 'Notes'), (8.0, 'PyCharm'), (9.0, 'Python'), (9.5, 'Brave Browser')]:
+        w._app_history.append((ts, name))
+    assert w._pick_recent_source_app(10.0, allow_ide=True) == 'Brave Browser'
+    assert w._pick_recent_source_app(10.0, allow_ide=True, code_like=True) == 'PyCharm'
+    assert w.attribute_source(9.6) == 'Brave Browser'
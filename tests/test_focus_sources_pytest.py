@@ -0,0 +1,131 @@
+import sys
+import time
+from PyQt6.QtWidgets import QApplication
+from clipboard_manager.focus import ManualFocusSource, PollingFocusSource, XpropFocusSource
+from clipboard_manager.watcher import ClipboardWatcher
+
+
+def test_polling_records_only_changes():
+    names = iter(['Safari', 'Safari', 'Unknown App', None, 'Terminal', 'Terminal'])
+    s = PollingFocusSource(probe=lambda: next(names))
+    for _ in range(6):
+        s.sample_once()
+    assert [n for _, n in s.events_since(0)] == ['Safari', 'Terminal']
+    assert s.latest()[1] == 'Terminal'
+
+
+def test_polling_backs_off_while_idle_and_resets_on_change():
+    current = ['Safari']
+    s = PollingFocusSource(probe=lambda: current[0], min_interval=0.1, max_interval=1.0)
+    s.sample_once()
+    assert s.interval == 0.1
+    for _ in range(20):
+        s.sample_once()
+    assert s.interval == 1.0
+    current[0] = 'Mail'
+    s.sample_once()
+    assert s.interval == 0.1
+
+
+def test_events_since_returns_newer_events_only():
+    s = ManualFocusSource()
+    s.emit('A', ts=1.0)
+    s.emit('B', ts=2.0)
+    s.emit('C', ts=3.0)
+    assert s.events_since(1.5) == [(2.0, 'B'), (3.0, 'C')]
+    assert s.events_since(3.0) == []
+
+
+def test_polling_thread_does_not_block_caller():
+    def slow_probe():
+        time.sleep(0.05)
+        return 'Slow App'
+
+    s = PollingFocusSource(probe=slow_probe, min_interval=0.01)
+    t0 = time.perf_counter()
+    s.start()
+    assert time.perf_counter() - t0 < 0.05
+    deadline = time.time() + 2
+    while not s.events_since(0) and time.time() < deadline:
+        time.sleep(0.01)
+    s.stop()
+    assert not s.is_running()
+    assert s.latest()[1] == 'Slow App'
+
+
+def test_xprop_source_reads_spy_events(tmp_path):
+    script = tmp_path / 'spy.py'
+    script.write_text(
+        'import sys, time\n'
+        'for wid in ("0x1", "0x0", "0x2", "0x2"):\n'
+        '    print("_NET_ACTIVE_WINDOW(WINDOW): window id # " + wid, flush=True)\n'
+        'time.sleep(5)\n')
+    classes = {'0x1': 'Firefox', '0x2': 'Code'}
+    s = XpropFocusSource(cmd=[sys.executable, str(script)], resolve=classes.get)
+    s.start()
+    try:
+        deadline = time.time() + 5
+        while len(s.events_since(0)) < 2 and time.time() < deadline:
+            time.sleep(0.02)
+        assert [n for _, n in s.events_since(0)] == ['Firefox', 'Code']
+    finally:
+        s.stop()
+    assert not s.is_running()
+
+
+def test_watcher_pulls_events_from_focus_source():
+    app = QApplication.instance() or QApplication([])
+    w = ClipboardWatcher(app.clipboard())
+    s = ManualFocusSource()
+    w._focus = s
+    now = time.time()
+    s.emit('Notes', ts=now - 1.0)
+    s.emit('Mail', ts=now - 0.5)
+    w._sync_focus_samples()
+    assert [n for _, n in list(w._app_history)[-2:]] == ['Notes', 'Mail']
+    assert w._last_sampled_app == 'Mail'
+    w._sync_focus_samples()
+    assert len([n for _, n in w._app_history if n == 'Mail']) == 1
+
+
+def test_copy_after_idle_pokes_backed_off_polling_source():
+    import threading
+    app = QApplication.instance() or QApplication([])
+    current = ['Safari']
+    probed_on = []
+
+    def probe():
+        probed_on.append(threading.current_thread())
+        return current[0]
+
+    s = PollingFocusSource(probe=probe, min_interval=0.05, max_interval=5.0)
+    s.start()
+    try:
+        deadline = time.time() + 2
+        while s.samples < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        # idle long enough to back off: the poll thread now sleeps for max_interval
+        s.interval = s.max_interval
+        time.sleep(0.3)
+        samples = s.samples
+
+        w = ClipboardWatcher()
+        w._focus = s
+
+        class FakeClipboard:
+            def text(self):
+                return 'copied in slack'
+
+        w.clipboard = FakeClipboard()
+        current[0] = 'Slack'
+        del probed_on[:]
+        w._on_clipboard_change()
+        assert threading.main_thread() not in probed_on
+        # the poll thread catches up well before its backed-off interval would have run out
+        deadline = time.time() + 1.0
+        while s.latest()[1] != 'Slack' and time.time() < deadline:
+            time.sleep(0.01)
+        assert s.latest()[1] == 'Slack'
+        assert s.samples > samples and s.interval == s.min_interval
+    finally:
+        s.stop()
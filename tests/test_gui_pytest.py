@@ -39,3 +39,18 @@ def test_search_focus_hotkey(app, qtbot, monkeypatch):
     qtbot.wait(200)
     assert called['v'] or w.search_box.hasFocus()
     w.close()
+
+def test_search_lists_literal_hits_before_fuzzy_hits(app, qtbot):
+    w = MainWindow()
+    qtbot.addWidget(w)
+    fuzzy = w.history.add_item('help me', source_app='SearchRank')
+    old = w.history.add_item('hello there', source_app='SearchRank')
+    new = w.history.add_item('say hello world', source_app='SearchRank')
+    w.update_apps_dropdown()
+    w._select_app('SearchRank')
+    w.search_box.setText('hello')
+    w.update_list()
+    ids = [w.list_widget.item(i).data(int(Qt.ItemDataRole.UserRole)) for i in range(w.list_widget.count())]
+    assert set(ids[:2]) == {old.id, new.id}
+    assert fuzzy.id in ids[2:]
+    w.close()
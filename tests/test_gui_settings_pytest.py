@@ -6,9 +6,9 @@ from clipboard_manager import settings
 pytest_plugins = ['pytestqt.qtbot']
 
 
-def test_settings_dialog_apply(qtbot):
+def test_settings_dialog_apply(qtbot, tmp_path):
     tmp = os.environ.get('XDG_CONFIG_HOME')
-    os.environ['XDG_CONFIG_HOME'] = os.path.join(os.getcwd(), 'tmp_test_config')
+    os.environ['XDG_CONFIG_HOME'] = str(tmp_path / 'config')
     try:
         settings.load_settings('CopyPasteTool')
         dlg = SettingsDialog()
@@ -0,0 +1,52 @@
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from clipboard_manager import log
+
+
+@pytest.fixture
+def stream():
+    buf = io.StringIO()
+    yield buf
+    # back to the default levels
+    log.configure('warning', stream=io.StringIO())
+    log.shutdown()
+
+
+def test_parse_levels():
+    assert log.parse_levels(None) == (logging.WARNING, {})
+    assert log.parse_levels(None, debug_level=2) == (logging.DEBUG, {})
+    assert log.parse_levels('info, watcher=debug,probes=ERROR,bogus=loud,*=warning') == (
+        logging.WARNING, {'watcher': logging.DEBUG, 'probes': logging.ERROR})
+
+
+def test_per_subsystem_levels(stream):
+    log.configure('warning,watcher=debug', stream=stream)
+    log.get_logger('watcher').debug('watcher detail %d', 1)
+    log.get_logger('history').debug('history detail')
+    log.get_logger('history').warning('history warning')
+    assert not log.get_logger('history').isEnabledFor(logging.DEBUG)
+    log.shutdown()
+    out = stream.getvalue()
+    assert 'DEBUG watcher' in out and 'watcher detail 1' in out
+    assert 'history detail' not in out and 'WARNING history' in out
+
+
+def test_formatting_happens_on_the_listener_thread(stream):
+    seen = []
+
+    class Arg:
+        def __str__(self):
+            seen.append(threading.current_thread())
+            return 'arg'
+
+    log.configure('debug', stream=stream, fmt='json')
+    log.get_logger('gui').debug('value=%s', Arg())
+    log.shutdown()
+    assert seen and threading.current_thread() not in seen
+    record = json.loads(stream.getvalue().strip())
+    assert record['subsystem'] == 'gui' and record['level'] == 'debug' and record['msg'] == 'value=arg'
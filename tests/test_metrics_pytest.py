@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from clipboard_manager import metrics
+from clipboard_manager.capture_queue import CaptureQueue, CaptureRequest, make_ingest
+from clipboard_manager.history import History
+
+
+@pytest.fixture
+def recording():
+    metrics.configure(enable=True)
+    metrics.reset()
+    yield
+    metrics.stop_dump(final=False)
+    metrics.reset()
+    metrics.configure()
+
+
+def test_disabled_path_records_nothing():
+    metrics.configure(enable=False)
+    try:
+        metrics.reset()
+        metrics.incr('x')
+        metrics.observe('y', 0.1)
+        with metrics.timer('z') as t:
+            pass
+        assert t is metrics.timer('other')
+        assert metrics.snapshot()['counters'] == {} and metrics.snapshot()['histograms'] == {}
+    finally:
+        metrics.configure()
+
+
+def test_debug_level_is_read_once(monkeypatch):
+    monkeypatch.setenv('CLIP_DEBUG', '2')
+    metrics.configure()
+    assert metrics.debug_level() == 2
+    monkeypatch.setenv('CLIP_DEBUG', '0')
+    assert metrics.debug_level() == 2
+    metrics.configure()
+    assert metrics.debug_level() == 0
+
+
+def test_histogram_percentiles(recording):
+    for i in range(1, 1001):
+        metrics.observe('lat', i / 1000.0)
+    h = metrics.snapshot()['histograms']['lat']
+    assert h['count'] == 1000 and h['min'] == 0.001 and h['max'] == 1.0
+    # log buckets are ~19% wide
+    assert 0.5 <= h['p50'] <= 0.6
+    assert 0.99 <= h['p99'] <= 1.0
+
+
+def test_capture_pipeline_is_instrumented(recording, tmp_path):
+    from clipboard_manager.storage import Persistence
+    p = Persistence(str(tmp_path / 'm.db'))
+    h = History(persistence=p)
+    q = CaptureQueue(make_ingest(h))
+    q.submit(CaptureRequest('one', 'Notes', 1.0))
+    q.submit(CaptureRequest('two', 'Notes', 2.0))
+    assert q.drain(5)
+    h.add_item('two', source_app='Notes')
+    snap = metrics.snapshot()
+    assert snap['counters']['history.added'] == 2
+    assert snap['counters']['history.deduped'] == 1
+    for name in ('capture.queue_wait', 'capture.ingest', 'capture.latency', 'history.hash',
+                 'history.dedupe', 'storage.save_item', 'history.notify'):
+        assert snap['histograms'][name]['count'] >= 1, name
+    q.stop()
+    p.close()
+
+
+def test_periodic_dump_writes_json_lines(recording, tmp_path):
+    path = str(tmp_path / 'metrics.jsonl')
+    metrics.incr('ticks', 3)
+    assert metrics.start_dump(path, interval=0.05)
+    import time
+    time.sleep(0.2)
+    metrics.stop_dump()
+    lines = [json.loads(l) for l in open(path)]
+    assert len(lines) >= 2
+    assert lines[-1]['counters']['ticks'] == 3
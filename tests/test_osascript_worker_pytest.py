@@ -0,0 +1,137 @@
+import sys
+import subprocess
+import textwrap
+import pytest
+from clipboard_manager import utils
+from clipboard_manager import osascript_worker
+from clipboard_manager.osascript_worker import OsascriptWorker, OsascriptUnavailable, OsascriptError, OsascriptTimeout
+
+
+FAKE_HELPER = textwrap.dedent('''
+    import sys
+    name = sys.argv[1] if len(sys.argv) > 1 else 'FakeApp'
+    for line in sys.stdin:
+        seq = line.split(' ')[0]
+        if name == 'EXIT':
+            sys.exit(0)
+        if name == 'SILENT':
+            continue
+        if name == 'ERROR':
+            sys.stdout.write('%s !not allowed assistive access\\n' % seq)
+            sys.stdout.flush()
+            continue
+        sys.stdout.write('%s %s\\n' % (seq, name))
+        sys.stdout.flush()
+''')
+
+
+@pytest.fixture
+def helper(tmp_path):
+    path = tmp_path / 'fake_osascript.py'
+    path.write_text(FAKE_HELPER)
+    return lambda name: [sys.executable, str(path), name]
+
+
+def test_worker_answers_many_queries_with_one_process(helper):
+    w = OsascriptWorker(cmd=helper('Safari'))
+    try:
+        for _ in range(20):
+            assert w.query(timeout=5.0) == 'Safari'
+        assert w.starts == 1 and w.is_alive()
+    finally:
+        w.close()
+    assert not w.is_alive()
+
+
+def test_worker_timeout_kills_the_helper(helper):
+    w = OsascriptWorker(cmd=helper('SILENT'), start_timeout=0.0)
+    try:
+        with pytest.raises(OsascriptTimeout):
+            w.query(timeout=0.2)
+        assert not w.is_alive()
+    finally:
+        w.close()
+
+
+def test_worker_restarts_a_wedged_helper(tmp_path):
+    flag = tmp_path / 'wedged'
+    flag.write_text('1')
+    script = tmp_path / 'wedging_helper.py'
+    # answers the first query, then hangs while the flag file exists
+    script.write_text(textwrap.dedent('''
+        import os, sys, time
+        first = True
+        for line in sys.stdin:
+            if not first and os.path.exists(sys.argv[1]):
+                time.sleep(60)
+            first = False
+            sys.stdout.write(line.split(' ')[0] + ' Safari\\n')
+            sys.stdout.flush()
+    '''))
+    w = OsascriptWorker(cmd=[sys.executable, str(script), str(flag)])
+    try:
+        assert w.query(timeout=5.0) == 'Safari'
+        with pytest.raises(OsascriptTimeout):
+            w.query(timeout=0.2)
+        flag.unlink()
+        assert w.query(timeout=5.0) == 'Safari'
+        assert w.starts == 2
+    finally:
+        w.close()
+
+
+def test_worker_error_reply_and_exit_raise(helper):
+    w = OsascriptWorker(cmd=helper('ERROR'))
+    try:
+        with pytest.raises(OsascriptError) as exc:
+            w.query(timeout=5.0)
+        assert not isinstance(exc.value, OsascriptTimeout)
+        assert w.is_alive()
+    finally:
+        w.close()
+    w = OsascriptWorker(cmd=helper('EXIT'))
+    try:
+        with pytest.raises(OsascriptError):
+            w.query(timeout=5.0)
+        with pytest.raises(OsascriptError):
+            w.query(timeout=5.0)
+        assert w.starts == 2
+    finally:
+        w.close()
+
+
+def test_first_query_allows_for_start_up(tmp_path):
+    script = tmp_path / 'slow_start.py'
+    script.write_text(textwrap.dedent('''
+        import sys, time
+        time.sleep(0.5)
+        for line in sys.stdin:
+            sys.stdout.write(line.split(' ')[0] + ' Notes\\n')
+            sys.stdout.flush()
+    '''))
+    w = OsascriptWorker(cmd=[sys.executable, str(script)], start_timeout=5.0)
+    try:
+        assert w.query(timeout=0.2) == 'Notes'
+        assert w.query(timeout=0.2) == 'Notes'
+        assert w.starts == 1
+    finally:
+        w.close()
+
+
+def test_worker_unavailable_is_remembered(tmp_path):
+    w = OsascriptWorker(cmd=[str(tmp_path / 'missing-helper')], restart_cooldown=60)
+    with pytest.raises(OsascriptUnavailable):
+        w.query(timeout=0.1)
+    with pytest.raises(OsascriptUnavailable):
+        w.query(timeout=0.1)
+    assert w.starts == 0
+
+
+def test_utils_prefers_worker_over_subprocess(monkeypatch, helper):
+    w = OsascriptWorker(cmd=helper('Mail'))
+    monkeypatch.setattr(osascript_worker, 'get_worker', lambda: w)
+    monkeypatch.setattr(subprocess, 'run', lambda *a, **k: (_ for _ in ()).throw(AssertionError('spawned')))
+    try:
+        assert utils._osascript_frontmost(5.0) == 'Mail'
+    finally:
+        w.close()
@@ -0,0 +1,43 @@
+from PyQt6.QtWidgets import QApplication
+from clipboard_manager.clipboard_item import ClipboardItem, PREVIEW_MAX_LINES, PREVIEW_MAX_CHARS
+from clipboard_manager.gui import MainWindow, ContentDetailView
+from clipboard_manager.utils import make_preview
+
+
+def test_make_preview_limits_lines_and_chars():
+    assert make_preview('a\nb\nc', 2, 100) == ('a\nb', True)
+    assert make_preview('abc', 2, 100) == ('abc', False)
+    assert make_preview('x' * 50, 5, 10) == ('x' * 10, True)
+
+
+def test_item_preview_is_bounded_and_cached():
+    big = '\n'.join('line %d' % i for i in range(100000))
+    it = ClipboardItem(big, source_app='Logs')
+    p = it.preview
+    assert p.count('\n') < PREVIEW_MAX_LINES and len(p) <= PREVIEW_MAX_CHARS
+    assert it.preview_truncated
+    assert it.preview is p
+
+
+def test_row_html_uses_preview_for_large_items(qtbot):
+    app = QApplication.instance() or QApplication([])
+    w = MainWindow()
+    qtbot.addWidget(w)
+    it = w.history.add_item('head line\n' + 'y' * 2000000, source_app='Huge')
+    html = w._row_html(it, '', w._theme_key())
+    assert 'head line<br>' in html and len(html) < 1000
+    w.close()
+
+
+def test_detail_view_streams_large_content(qtbot):
+    app = QApplication.instance() or QApplication([])
+    view = ContentDetailView()
+    qtbot.addWidget(view)
+    content = 'abcdefghij\n' * 50000
+    view.show_item(ClipboardItem(content, source_app='Logs'))
+    assert view.is_loading()
+    assert len(view.toPlainText()) < len(content)
+    qtbot.waitUntil(lambda: not view.is_loading(), timeout=5000)
+    assert view.toPlainText() == content
+    view.show_item(None)
+    assert view.toPlainText() == '' and view.item_id() is None
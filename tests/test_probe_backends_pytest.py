@@ -0,0 +1,66 @@
+import subprocess
+import pytest
+from clipboard_manager import probes, utils
+from clipboard_manager.focus import FocusHistory
+from clipboard_manager.watcher import ClipboardWatcher
+
+
+def _trace():
+    return [
+        {'ts': '2026-01-01T00:00:00+00:00', 'osascript': 'Safari', 'appkit': 'Safari', 'ax': None, 'mouse_window_owner': 'Safari'},
+        {'ts': '2026-01-01T00:00:01+00:00', 'osascript': 'Slack', 'appkit': 'Slack', 'ax': None, 'mouse_window_owner': 'Mail'},
+        {'ts': '2026-01-01T00:00:02+00:00', 'osascript': '!timeout', 'appkit': None, 'ax': None, 'mouse_window_owner': None},
+    ]
+
+
+@pytest.fixture
+def replay():
+    be = probes.ReplayProbeBackend(_trace(), latency={'appkit': 0.01})
+    prev = probes.set_backend(be)
+    yield be
+    probes.set_backend(prev)
+
+
+def test_replay_answers_from_latest_record_on_virtual_clock(replay):
+    t0 = replay.now()
+    assert replay.appkit() == 'Safari'
+    assert replay.now() == pytest.approx(t0 + 0.01)
+    replay.sleep(1.0)
+    assert replay.osascript(0.5) == 'Slack'
+    assert replay.mouse_window_owner() == 'Mail'
+    replay.seek(t0 + 2.5)
+    with pytest.raises(subprocess.TimeoutExpired):
+        replay.osascript(0.5)
+    assert replay.calls['appkit'] == 1
+
+
+def test_get_frontmost_app_uses_active_backend(replay, monkeypatch):
+    monkeypatch.setenv('APPKIT_DELAY', '0.02')
+    replay.seek(replay.now() + 1.2)
+    start = replay.now()
+    assert utils.get_frontmost_app() == 'Slack'
+    assert replay.now() > start
+
+
+def test_timeline_probes_replays_trace(replay):
+    out = utils.timeline_probes(duration_sec=1.5, interval_sec=0.5)
+    assert [r['appkit'] for r in out] == ['Safari', 'Safari', 'Slack']
+
+
+def test_set_backend_none_restores_live():
+    prev = probes.set_backend(probes.ReplayProbeBackend([]))
+    assert isinstance(probes.set_backend(None), probes.ReplayProbeBackend)
+    assert isinstance(probes.get_backend(), probes.LiveProbeBackend)
+    probes.set_backend(prev)
+
+
+def test_attribute_source_prefers_recent_focus():
+    w = ClipboardWatcher.__new__(ClipboardWatcher)
+    w._app_history = FocusHistory(classify=w._classify_app)
+    w._app_history.append((9.0, 'Notes'))
+    w._app_history.append((9.8, 'Safari'))
+    w._last_sampled_app = 'Safari'
+    assert w.attribute_source(10.0) == 'Safari'
+    assert w.attribute_source(100.0) == 'Safari'
+    w._last_sampled_app = None
+    assert w.attribute_source(100.0) == 'Unknown App'
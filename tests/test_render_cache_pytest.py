@@ -0,0 +1,42 @@
+from PyQt6.QtWidgets import QApplication
+from clipboard_manager.utils import highlight_match, LRUCache
+from clipboard_manager.gui import MainWindow
+
+
+def test_highlight_window_limits_escaped_text():
+    text = 'a' * 10000 + '<Needle>' + 'b' * 10000
+    out = highlight_match(text, 'needle', window=60)
+    assert '<b>Needle</b>' in out
+    assert out.startswith('…') and out.endswith('…')
+    assert '&lt;' in out
+    assert len(out) < 200
+
+
+def test_highlight_window_without_match_shows_head():
+    out = highlight_match('x' * 500, 'zzz', window=20)
+    assert out == 'x' * 20 + '…'
+    assert highlight_match('short', '', window=20) == 'short'
+
+
+def test_lru_cache_evicts_oldest():
+    c = LRUCache(2)
+    c.put('a', 1)
+    c.put('b', 2)
+    assert c.get('a') == 1
+    c.put('c', 3)
+    assert 'b' not in c and c.get('a') == 1 and c.get('c') == 3
+    assert len(c) == 2
+
+
+def test_row_html_cached_and_pin_aware(qtbot):
+    app = QApplication.instance() or QApplication([])
+    w = MainWindow()
+    qtbot.addWidget(w)
+    it = w.history.add_item('cached row content', source_app='CacheApp')
+    theme = w._theme_key()
+    first = w._row_html(it, '', theme)
+    assert w._row_html(it, '', theme) is first
+    it.pinned = True
+    pinned = w._row_html(it, '', theme)
+    assert '[PIN]' in pinned and '[PIN]' not in first
+    w.close()
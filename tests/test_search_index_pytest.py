@@ -0,0 +1,72 @@
+import time
+from clipboard_manager.search_index import TrigramIndex
+from clipboard_manager.history import HistoryStore
+
+
+def test_index_candidates_add_remove():
+    idx = TrigramIndex()
+    idx.add('a', 'Hello World')
+    idx.add('b', 'another thing')
+    assert idx.candidates('WORLD') == {'a'}
+    assert idx.candidates('xyz') == set()
+    assert idx.candidates('he') is None
+    idx.remove('a', 'Hello World')
+    assert idx.candidates('world') == set()
+    assert len(idx) == 1
+
+
+def test_index_overflow_items_always_candidates():
+    idx = TrigramIndex(max_chars=10)
+    idx.add('long', 'x' * 50 + 'needle')
+    idx.add('short', 'needle')
+    assert idx.candidates('needle') == {'long', 'short'}
+    assert 'long' in idx.candidates('qqq')
+
+
+def test_history_search_verifies_and_filters_app():
+    hs = HistoryStore()
+    hs.add_item('The quick brown fox', source_app='A')
+    hs.add_item('quick sort in python', source_app='B')
+    hs.add_item('nothing here', source_app='A')
+    assert [it.content for it in hs.search('QUICK', source_app='A')] == ['The quick brown fox']
+    assert len(hs.search('quick')) == 2
+    assert hs.search('quick fox') == []
+    assert len(hs.search('', source_app='A')) == 2
+
+
+def test_history_search_drops_expired_items():
+    import clipboard_manager.history as hmod
+    orig = hmod.TEMPORARY_TOKEN_SECONDS
+    try:
+        hmod.TEMPORARY_TOKEN_SECONDS = 1
+        hs = HistoryStore()
+        tkn = 'eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.abc.def'
+        hs.add_item(tkn, source_app='Terminal')
+        assert hs.search('eyJhbGci')
+        time.sleep(2)
+        assert hs.search('eyJhbGci') == []
+        assert len(hs._search_index) == 0
+    finally:
+        hmod.TEMPORARY_TOKEN_SECONDS = orig
+
+
+def test_kind_filter_analyzes_items_outside_the_history_lock(monkeypatch):
+    import threading
+    from clipboard_manager import content_analysis
+    h = HistoryStore()
+    h.add_item('def f(x):\n    return x\n', source_app='Editor')
+    h.add_item('plain notes', source_app='Editor')
+    for it in h.items:
+        it.analysis = None  # e.g. loaded from disk, not analyzed yet
+    free = []
+    orig = content_analysis.analyze
+
+    def analyze(text):
+        t = threading.Thread(target=lambda: free.append(h._lock.acquire(timeout=1.0) and (h._lock.release() or True)))
+        t.start()
+        t.join()
+        return orig(text)
+
+    monkeypatch.setattr(content_analysis, 'analyze', analyze)
+    assert [i.content for i in h.search('kind:code')] == ['def f(x):\n    return x\n']
+    assert free and all(free)
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from clipboard_manager import settings
+from clipboard_manager.history import History
+from clipboard_manager.storage import Persistence
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path))
+    p = Persistence(str(tmp_path / 'db.sqlite'))
+    yield p
+    settings.use_backend(None)
+    p.close()
+
+
+def _legacy_rows(p):
+    p.save_setting('secret_safe_enabled', '0')
+    p.save_setting('blocklist_apps', 'Vault\nKeePassXC')
+
+
+def test_sqlite_backend_roundtrip_writes_changed_keys_only(db):
+    settings.use_backend(settings.SqliteBackend(db))
+    settings.set_('pause_after_set_ms', 321)
+    settings.save_settings()
+    rows = db.load_settings()
+    assert json.loads(rows['pause_after_set_ms']) == 321
+    assert json.loads(rows['blocklist_apps']) == settings.DEFAULTS['blocklist_apps']
+
+    writes = []
+    orig = db.save_settings
+    db.save_settings = lambda values, remove=(), meta=None: (writes.append(dict(values)), orig(values, remove, meta))
+    settings.set_('dedupe_lru_size', 12)
+    settings.save_settings()
+    settings.save_settings()
+    assert writes == [{'dedupe_lru_size': '12'}]
+
+    settings.use_backend(None)
+    assert settings.get('pause_after_set_ms') == settings.DEFAULTS['pause_after_set_ms']
+    assert settings.use_backend(settings.SqliteBackend(db))['pause_after_set_ms'] == 321
+
+
+def test_sqlite_backend_migrates_legacy_rows(db):
+    _legacy_rows(db)
+    cfg = settings.use_backend(settings.SqliteBackend(db))
+    assert cfg['secret_safe_mode'] is False
+    assert cfg['blocklist_apps'] == ['vault', 'keepassxc']
+    rows = db.load_settings()
+    assert 'secret_safe_enabled' not in rows
+    assert json.loads(rows['blocklist_apps']) == ['vault', 'keepassxc']
+    assert db.get_meta(settings.LEGACY_MIGRATED_META) == '1'
+
+
+def test_history_migrates_legacy_rows_into_json_settings(db):
+    settings.load_settings('CopyPasteTool')
+    _legacy_rows(db)
+    h = History(persistence=db)
+    assert h.get_secret_safe_enabled() is False
+    assert h.get_blocklist() == ['keepassxc', 'vault']
+    assert settings.get('secret_safe_mode') is False
+    assert db.load_settings() == {}
+    settings.flush_pending_saves()
+    saved = json.loads(settings.get_config_path().read_text())
+    assert saved['secret_safe_mode'] is False
+    # the migration runs once; the store no longer writes settings rows itself
+    h.set_blocklist(['other'])
+    assert History(persistence=db).get_blocklist() == ['other']
+    assert db.load_settings() == {}
+
+
+def test_legacy_settings_json_keeps_the_builtin_blocklist(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path))
+    # what every settings.json written before the defaults were unified holds
+    legacy = dict(settings.DEFAULTS, blocklist_apps=['1password', 'bitwarden', 'lastpass', 'authenticator', 'keychain'])
+    path = settings.get_config_path('CopyPasteTool')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(legacy))
+    settings.load_settings('CopyPasteTool')
+    blocked = set(History().get_blocklist())
+    for app in ('1password 8', 'dashlane', 'keepass', 'keepassxc', 'authy', 'google authenticator', 'password manager'):
+        assert app in blocked, app
+    assert History().capture_decision('Dashlane') == 'blocked'
+
+
+def test_customized_blocklist_is_kept(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path))
+    path = settings.get_config_path('CopyPasteTool')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({'blocklist_apps': ['vault']}))
+    settings.load_settings('CopyPasteTool')
+    assert History().get_blocklist() == ['vault']
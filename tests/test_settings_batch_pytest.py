@@ -0,0 +1,117 @@
+import json
+import threading
+import time
+
+import pytest
+
+from clipboard_manager import settings
+from clipboard_manager.history import History
+
+
+@pytest.fixture
+def cfg(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path))
+    settings.load_settings('BatchApp')
+    yield 'BatchApp'
+    settings.flush_pending_saves()
+
+
+def test_batch_dispatches_one_change_set(cfg):
+    seen, per_key = [], []
+
+    def on_changes(changes):
+        seen.append(dict(changes))
+    settings.register_change_callback(on_changes)
+    cb = lambda k, v: per_key.append(k)
+    settings.register_callback(cb)
+    try:
+        current = settings.get('pause_after_set_ms')
+        with settings.batch():
+            settings.set_('dedupe_lru_size', 77)
+            settings.set_('dedupe_per_app_window_s', 9)
+            settings.set_('pause_after_set_ms', current)  # unchanged: not reported
+            assert settings.get('dedupe_lru_size') == 77
+            assert seen == []
+        assert seen == [{'dedupe_lru_size': 77, 'dedupe_per_app_window_s': 9}]
+        assert sorted(per_key) == ['dedupe_lru_size', 'dedupe_per_app_window_s']
+        settings.set_('dedupe_lru_size', 77)
+        assert len(seen) == 1
+    finally:
+        settings.unregister_change_callback(on_changes)
+        settings.unregister_callback(cb)
+
+
+def test_batch_rolls_back_on_error(cfg):
+    seen = []
+    cb = lambda changes: seen.append(changes)
+    settings.register_change_callback(cb)
+    before = settings.get('dedupe_lru_size')
+    try:
+        with pytest.raises(RuntimeError):
+            with settings.batch():
+                settings.set_('dedupe_lru_size', before + 1)
+                settings.set_('brand_new_key', 1)
+                raise RuntimeError('boom')
+        assert settings.get('dedupe_lru_size') == before
+        assert settings.get('brand_new_key') is None
+        assert seen == []
+    finally:
+        settings.unregister_change_callback(cb)
+
+
+def test_history_refreshes_once_per_batch(cfg):
+    h = History(persistence=None)
+    calls = []
+    h.add_change_listener(lambda: calls.append(1))
+    version = h._filter.version
+    with settings.batch():
+        settings.set_('secret_safe_mode', not h.get_secret_safe_enabled())
+        settings.set_('blocklist_apps', ['Vault', 'KeePassXC'])
+        settings.set_('per_app_capture_toggle', {'Slack': False})
+    assert calls == [1]
+    assert h._filter.version == version + 1
+    assert h.get_blocklist() == ['keepassxc', 'vault']
+    assert not h.is_app_capture_enabled('Slack')
+    # re-applying the same values changes nothing
+    with settings.batch():
+        settings.set_('blocklist_apps', ['Vault', 'KeePassXC'])
+    assert calls == [1]
+
+
+def test_callbacks_do_not_keep_owners_alive(cfg):
+    import gc
+    import weakref
+    h = History(persistence=None)
+    ref = weakref.ref(h)
+    del h
+    gc.collect()
+    assert ref() is None
+    settings.set_('secret_safe_mode', not settings.get('secret_safe_mode'))
+
+
+def test_debounced_saves_share_one_thread(cfg):
+    path = settings.get_config_path(cfg)
+    for i in range(20):
+        settings.set_('dedupe_lru_size', 100 + i)
+        settings.save_debounced(0.05, cfg)
+    assert [t.name for t in threading.enumerate()].count('settings-saver') == 1
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        if path.exists() and json.loads(path.read_text())['dedupe_lru_size'] == 119:
+            break
+        time.sleep(0.02)
+    assert json.loads(path.read_text())['dedupe_lru_size'] == 119
+    assert not path.with_suffix('.tmp').exists()
+
+
+def test_save_skips_unchanged_content(cfg):
+    path = settings.get_config_path(cfg)
+    settings.set_('dedupe_lru_size', 555)
+    settings.save_settings(cfg)
+    mtime = path.stat().st_mtime_ns
+    time.sleep(0.01)
+    settings.save_settings(cfg)
+    assert path.stat().st_mtime_ns == mtime
+    settings.set_('dedupe_lru_size', 556)
+    settings.save_settings(cfg)
+    assert json.loads(path.read_text())['dedupe_lru_size'] == 556
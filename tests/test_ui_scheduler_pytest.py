@@ -0,0 +1,43 @@
+from PyQt6.QtWidgets import QApplication
+from clipboard_manager.gui import MainWindow, UiUpdateScheduler
+
+
+def test_scheduler_coalesces_marks_into_one_flush(qtbot):
+    app = QApplication.instance() or QApplication([])
+    calls = []
+    sched = UiUpdateScheduler({'list': lambda d: calls.append('list') or True,
+                               'status': lambda d: calls.append('status') or True},
+                              ('list', 'status'))
+    for _ in range(5):
+        sched.mark('list')
+    sched.mark('status', 'list')
+    qtbot.waitUntil(lambda: not sched.is_dirty(), timeout=1000)
+    assert calls == ['list', 'status']
+
+
+def test_scheduler_defers_unfinished_work(qtbot):
+    app = QApplication.instance() or QApplication([])
+    remaining = [3]
+
+    def step(deadline):
+        remaining[0] -= 1
+        return remaining[0] <= 0
+
+    sched = UiUpdateScheduler({'rows': step}, ('rows',))
+    sched.mark('rows')
+    qtbot.waitUntil(lambda: remaining[0] <= 0, timeout=1000)
+    assert not sched.is_dirty()
+
+
+def test_history_changes_render_list_once_per_frame(qtbot):
+    app = QApplication.instance() or QApplication([])
+    w = MainWindow()
+    qtbot.addWidget(w)
+    renders = []
+    orig = w._begin_list_render
+    w._begin_list_render = lambda: (renders.append(1), orig())
+    for i in range(20):
+        w.history.add_item('burst %d' % i, source_app='Burst')
+    qtbot.waitUntil(lambda: w.list_widget.count() == 20, timeout=2000)
+    assert len(renders) <= 2
+    w.close()
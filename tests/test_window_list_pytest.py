@@ -0,0 +1,61 @@
+import random
+import types
+from clipboard_manager import utils, window_list
+from clipboard_manager.window_list import WindowInfo, WindowSnapshot
+
+
+def _quartz(windows, calls):
+    q = types.SimpleNamespace()
+
+    def copy_info(opt, null_id):
+        calls.append(1)
+        return windows
+
+    q.CGWindowListCopyWindowInfo = copy_info
+    q.CGEventGetLocation = lambda _: types.SimpleNamespace(x=150, y=150)
+    q.kCGWindowListOptionOnScreenOnly = 1
+    q.kCGNullWindowID = 0
+    return q
+
+
+def test_probes_share_one_enumeration_per_ttl(monkeypatch):
+    monkeypatch.setenv('CP_WINDOW_LIST_TTL', '60')
+    calls = []
+    wins = [
+        {'kCGWindowOwnerName': 'Dock', 'kCGWindowBounds': {'X': 0, 'Y': 900, 'Width': 1000, 'Height': 50}},
+        {'kCGWindowOwnerName': 'Safari', 'kCGWindowName': 'Release Notes',
+         'kCGWindowBounds': {'X': 100, 'Y': 100, 'Width': 800, 'Height': 600}},
+        {'kCGWindowOwnerName': 'Finder', 'kCGWindowBounds': {'X': 0, 'Y': 0, 'Width': 2000, 'Height': 2000}},
+    ]
+    monkeypatch.setattr(utils, '_has_pyobjc', True)
+    monkeypatch.setattr(utils, '_Quartz', _quartz(wins, calls))
+    assert utils.get_top_window_owners(2) == ['Dock', 'Safari']
+    assert utils.find_window_owner_by_content('release') == 'Safari'
+    assert utils._get_app_from_mouse_window() == 'Safari'
+    assert len(calls) == 1
+
+    # a different Quartz object invalidates the snapshot
+    other = []
+    monkeypatch.setattr(utils, '_Quartz', _quartz(wins[2:], other))
+    assert utils.get_top_window_owners(5) == ['Finder']
+    assert len(other) == 1
+
+
+def test_snapshot_expires_after_ttl(monkeypatch):
+    monkeypatch.setenv('CP_WINDOW_LIST_TTL', '0')
+    calls = []
+    q = _quartz([{'kCGWindowOwnerName': 'Notes'}], calls)
+    window_list.get_snapshot(q)
+    window_list.get_snapshot(q)
+    assert len(calls) == 2
+
+
+def test_grid_lookup_matches_linear_scan():
+    rnd = random.Random(5)
+    wins = [WindowInfo('App%d' % i, '', rnd.uniform(-500, 3000), rnd.uniform(-500, 2000),
+                       rnd.uniform(10, 1500), rnd.uniform(10, 1000)) for i in range(60)]
+    snap = WindowSnapshot(wins)
+    for _ in range(500):
+        px, py = rnd.uniform(-600, 3500), rnd.uniform(-600, 2500)
+        expected = next((w.owner for w in wins if w.contains(px, py)), None)
+        assert snap.owner_at(px, py) == expected